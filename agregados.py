@@ -0,0 +1,293 @@
+#-------------------
+# CUBO DE AGREGADOS
+#-------------------
+
+# Tabelas pré-calculadas no pré-processamento com os indicadores de cada ciclo
+# e as médias por habilidade, indexadas por (Município, Etapa, Componente
+# Curricular, Ciclos). O app consulta essas tabelas por chave em vez de
+# filtrar e agrupar o df_final a cada interação.
+#
+# Cada edição do CNCA (ano da avaliação) fica em suas próprias partições
+# (Edição/Componente Curricular/Ciclos) na pasta cubo/: o app carrega só as
+# partições da edição escolhida, e a comparação entre edições lê só as linhas
+# da visão.
+#
+# As médias por habilidade guardam só a chave da visão, o ciclo, um id inteiro
+# da habilidade e o percentual: o texto de cada habilidade (componente,
+# descritor, descrição, etapa e código) fica uma única vez na dimensão de
+# habilidades (cubo/dimensoes/habilidades), montada a partir da matriz de
+# referência, e é juntado às linhas só na consulta de uma visão.
+#
+# As consultas do app leem só as linhas do escopo do município consultado
+# (ver escopo): a sessão de um município não carrega as linhas dos demais, e
+# cada partição guarda um grupo de linhas por município, que a leitura
+# filtrada pula sem decodificar.
+
+import hashlib
+import os
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from dados import assinatura_recente, carregar_particoes
+
+# Conjuntos Parquet particionados gerados pelo pré-processamento
+PASTA_CUBO = "cubo"
+PASTA_INDICADORES = os.path.join(PASTA_CUBO, "indicadores")
+PASTA_HABILIDADES = os.path.join(PASTA_CUBO, "habilidades")
+PASTA_DIMENSAO_HABILIDADES = os.path.join(PASTA_CUBO, "dimensoes", "habilidades")
+
+# Chave inteira da dimensão de habilidades
+ID_HABILIDADE = "id_habilidade"
+
+# Colunas de partição do cubo (ano da avaliação, componente e ciclo)
+EDICAO = "Edição"
+COLUNAS_PARTICAO = [EDICAO, "Componente Curricular", "Ciclos"]
+
+# Coluna que define o escopo de leitura de cada sessão (ver escopo)
+COLUNA_ESCOPO = "Município"
+
+# Nome usado para a linha agregada de toda a CREDE
+CREDE = "Crede 01"
+
+# Municípios da CREDE 01
+MUNICIPIOS_CREDE = ['AQUIRAZ', 'CAUCAIA', 'EUSEBIO', 'GUAIUBA', 'ITAITINGA', 'MARACANAU', 'MARANGUAPE', 'PACATUBA']
+
+# Código IBGE de cada município (usado nas exportações por escola)
+CODIGOS_MUNICIPIOS = {
+    "2301000": "AQUIRAZ",
+    "2303709": "CAUCAIA",
+    "2304285": "EUSEBIO",
+    "2304954": "GUAIUBA",
+    "2306256": "ITAITINGA",
+    "2307650": "MARACANAU",
+    "2307700": "MARANGUAPE",
+    "2309706": "PACATUBA",
+}
+
+# Chave de consulta do cubo
+CHAVE = ["Município", "Etapa", "Componente Curricular"]
+
+COLUNAS_INDICADORES = ["Previstos", "Avaliados", "Participação", "Defasagem",
+                       "Aprendizado intermediário", "Aprendizado adequado", "Acerto Total"]
+
+COLUNAS_HABILIDADES = ["Componente Curricular", "Descritor", "Descrição da Habilidade ", "Etapa", "Habilidades"]
+
+# Percentuais agregados na CREDE ponderando pelo número de avaliados
+COLUNAS_PONDERADAS = ["Defasagem", "Aprendizado intermediário", "Aprendizado adequado", "Acerto Total"]
+
+
+#-------------------
+# CONSTRUÇÃO (pré-processamento)
+#-------------------
+
+def _media_ponderada(valores, pesos):
+    """ Média ponderada ignorando valores ausentes """
+    validos = valores.notna() & (pesos > 0)
+    if not validos.any():
+        return float("nan")
+    return (valores[validos] * pesos[validos]).sum() / pesos[validos].sum()
+
+
+def _indicadores(df):
+    """ Um registro por (Município, Etapa, Componente, Ciclo) """
+    # Os indicadores se repetem em todas as linhas de habilidade do mesmo ciclo
+    municipios = df.groupby(CHAVE + ["Ciclos"], observed=True)[COLUNAS_INDICADORES].first().reset_index()
+
+    linhas = []
+    for chave, grupo in municipios.groupby(["Etapa", "Componente Curricular", "Ciclos"], observed=True):
+        linha = dict(zip(["Etapa", "Componente Curricular", "Ciclos"], chave))
+        linha["Município"] = CREDE
+        linha["Previstos"] = grupo["Previstos"].sum()
+        linha["Avaliados"] = grupo["Avaliados"].sum()
+        linha["Participação"] = round(100 * linha["Avaliados"] / linha["Previstos"]) if linha["Previstos"] else 0
+        for coluna in COLUNAS_PONDERADAS:
+            linha[coluna] = round(_media_ponderada(grupo[coluna], grupo["Avaliados"]))
+        linhas.append(linha)
+
+    crede = pd.DataFrame(linhas, columns=municipios.columns)
+    return pd.concat([municipios.astype({"Município": str}), crede], ignore_index=True)
+
+
+def _habilidades(df):
+    """ Média de acertos por habilidade em cada (Município, Etapa, Componente, Ciclo) """
+    chaves = ["Município", "Ciclos"] + COLUNAS_HABILIDADES
+    municipios = df.groupby(chaves, observed=True)["Percentual de acertos"].mean().reset_index()
+
+    # Pesos: avaliados do município naquele ciclo
+    avaliados = df.groupby(CHAVE + ["Ciclos"], observed=True)["Avaliados"].first().rename("peso").reset_index()
+    ponderado = municipios.merge(avaliados, on=CHAVE + ["Ciclos"], how="left")
+    crede = (
+        ponderado.groupby(["Ciclos"] + COLUNAS_HABILIDADES, observed=True)
+        .apply(lambda g: _media_ponderada(g["Percentual de acertos"], g["peso"]), include_groups=False)
+        .round()
+        .rename("Percentual de acertos")
+        .reset_index()
+    )
+    crede["Município"] = CREDE
+
+    habilidades = pd.concat([municipios.astype({"Município": str}), crede[municipios.columns]], ignore_index=True)
+    return habilidades.sort_values(["Município", "Ciclos"] + COLUNAS_HABILIDADES, ignore_index=True)
+
+
+def construir_cubo(df):
+    """ Gera as tabelas (indicadores, habilidades) a partir do df_final tipado """
+    return _indicadores(df), _habilidades(df)
+
+
+def dimensao_habilidades(matriz):
+    """ Uma linha por habilidade da matriz de referência, com o id em ordem de COLUNAS_HABILIDADES """
+    dimensao = (matriz.dropna(subset=["Descritor", "Habilidades"])[COLUNAS_HABILIDADES].astype(str)
+                .drop_duplicates().sort_values(COLUNAS_HABILIDADES, ignore_index=True))
+    dimensao.insert(0, ID_HABILIDADE, pd.to_numeric(pd.Series(range(len(dimensao))), downcast="integer"))
+    return dimensao
+
+
+def fato_habilidades(habilidades, dimensao):
+    """ Médias por habilidade (ver _habilidades) com o texto da habilidade trocado pelo id da dimensão """
+    fato = habilidades.astype({coluna: str for coluna in COLUNAS_HABILIDADES}).merge(
+        dimensao, on=COLUNAS_HABILIDADES, how="left")
+    ausentes = fato[fato[ID_HABILIDADE].isna()]
+    if not ausentes.empty:
+        raise ValueError("Habilidades ausentes da matriz de referência: "
+                         + ", ".join(sorted(set(ausentes["Descritor"]))))
+    colunas = CHAVE + ["Ciclos", ID_HABILIDADE, "Percentual de acertos"]
+    return fato[colunas].astype({ID_HABILIDADE: dimensao[ID_HABILIDADE].dtype})
+
+
+#-------------------
+# CONSULTA (app)
+#-------------------
+
+_indices = {}
+
+
+def edicoes():
+    """ Edições (anos) disponíveis no cubo, em ordem crescente """
+    prefixo = quote(EDICAO, safe="") + "="
+    if not os.path.isdir(PASTA_INDICADORES):
+        return []
+    return sorted(int(unquote(nome[len(prefixo):])) for nome in os.listdir(PASTA_INDICADORES)
+                  if nome.startswith(prefixo))
+
+
+_versao = (None, None)
+
+
+def versao_cubo():
+    """ Identificador curto da versão atual do cubo (muda quando qualquer partição muda).
+
+    A pasta é percorrida no máximo uma vez a cada dados.VALIDADE_ASSINATURA
+    segundos, e o hash só é recalculado quando a assinatura muda.
+    """
+    global _versao
+    assinatura = assinatura_recente(PASTA_CUBO)
+    if _versao[0] != assinatura:
+        _versao = (assinatura, hashlib.sha256(repr(assinatura).encode("utf-8")).hexdigest()[:16])
+    return _versao[1]
+
+
+def _ordenar(df, pasta):
+    """ Ordem de linhas e colunas das tabelas do cubo, sem a coluna de edição """
+    if pasta == PASTA_INDICADORES:
+        colunas = CHAVE + ["Ciclos"] + COLUNAS_INDICADORES
+    else:
+        colunas = CHAVE + ["Ciclos", ID_HABILIDADE, "Percentual de acertos"]
+    return df.sort_values(colunas[:len(colunas) - 1], kind="stable", ignore_index=True)[colunas]
+
+
+def escopo(municipio):
+    """ Municípios cujas linhas do cubo a sessão de um município lê.
+
+    A sessão da CREDE lê a própria linha agregada e as de cada um dos seus
+    municípios (MUNICIPIOS_CREDE); a de um município, só as dele.
+    """
+    if municipio == CREDE:
+        return (CREDE,) + tuple(MUNICIPIOS_CREDE)
+    return (municipio,)
+
+
+def _grupos(pasta, edicao, chaves, municipios=None):
+    """ Tabela do cubo de uma edição separada por chave, recalculada só quando as partições mudam.
+
+    Com 'municipios', só as linhas desses municípios são lidas (filtro aplicado
+    na leitura das partições); sem ele, a edição inteira.
+    """
+    filtros = [(EDICAO, "==", edicao)]
+    if municipios is not None:
+        filtros.append((COLUNA_ESCOPO, "in", tuple(municipios)))
+    df = carregar_particoes(pasta, filtros, COLUNAS_PARTICAO)
+    chave_indice = (pasta, edicao, tuple(chaves), municipios)
+    entrada = _indices.get(chave_indice)
+    if entrada is None or entrada[0] is not df:
+        tabela = _ordenar(df, pasta)
+        grupos = {chave: grupo.reset_index(drop=True) for chave, grupo in tabela.groupby(chaves, observed=True)}
+        entrada = (df, grupos, tabela.iloc[0:0])
+        _indices[chave_indice] = entrada
+    return entrada[1], entrada[2]
+
+
+def opcoes(edicao, municipio, coluna):
+    """ Valores disponíveis de Etapa ou Componente Curricular para o município na edição """
+    posicao = CHAVE.index(coluna)
+    grupos, _ = _grupos(PASTA_INDICADORES, edicao, CHAVE, escopo(municipio))
+    return sorted({chave[posicao] for chave in grupos if chave[0] == municipio})
+
+
+def visoes(edicao):
+    """ Combinações (Município, Etapa, Componente) presentes no cubo da edição """
+    grupos, _ = _grupos(PASTA_INDICADORES, edicao, CHAVE)
+    return sorted(grupos)
+
+
+def consultar_indicadores(edicao, municipio, etapa, componente):
+    """ Indicadores de todos os ciclos, um registro por ciclo (ordenado) """
+    grupos, vazio = _grupos(PASTA_INDICADORES, edicao, CHAVE, escopo(municipio))
+    return grupos.get((municipio, etapa, componente), vazio)
+
+
+def _dimensao():
+    """ Dimensão de habilidades indexada pelo id, recalculada só quando o arquivo muda """
+    df = carregar_particoes(PASTA_DIMENSAO_HABILIDADES, [], [])
+    entrada = _indices.get(PASTA_DIMENSAO_HABILIDADES)
+    if entrada is None or entrada[0] is not df:
+        entrada = (df, df.set_index(ID_HABILIDADE)[COLUNAS_HABILIDADES])
+        _indices[PASTA_DIMENSAO_HABILIDADES] = entrada
+    return entrada[1]
+
+
+def _com_dimensao(fato):
+    """ Colunas da habilidade (COLUNAS_HABILIDADES) e percentual de acertos das linhas do fato """
+    habilidades = _dimensao().loc[fato[ID_HABILIDADE].to_numpy()].reset_index(drop=True)
+    habilidades["Percentual de acertos"] = fato["Percentual de acertos"].to_numpy()
+    return habilidades
+
+
+def consultar_habilidades(edicao, municipio, etapa, componente, ciclo):
+    """ Média de acertos por habilidade em um ciclo """
+    grupos, vazio = _grupos(PASTA_HABILIDADES, edicao, CHAVE + ["Ciclos"], escopo(municipio))
+    return _com_dimensao(grupos.get((municipio, etapa, componente, ciclo), vazio))
+
+
+def consultar_habilidades_por_ciclo(edicao, municipio, etapa, componente):
+    """ Média de acertos por habilidade de todos os ciclos da visão: {ciclo: DataFrame}, em ordem de ciclo """
+    grupos, _ = _grupos(PASTA_HABILIDADES, edicao, CHAVE, escopo(municipio))
+    habilidades = grupos.get((municipio, etapa, componente))
+    if habilidades is None:
+        return {}
+    return {int(ciclo): _com_dimensao(grupo) for ciclo, grupo in habilidades.groupby("Ciclos", sort=True)}
+
+
+def consultar_edicoes(municipio, etapa, componente):
+    """ Indicadores e médias por habilidade da visão em todas as edições: (indicadores, habilidades).
+
+    Só as partições do componente são abertas e só as linhas da visão são
+    carregadas, qualquer que seja o número de edições guardadas.
+    """
+    filtros = [("Componente Curricular", "==", componente), ("Município", "==", municipio), ("Etapa", "==", etapa)]
+    indicadores = carregar_particoes(PASTA_INDICADORES, filtros, COLUNAS_PARTICAO)
+    habilidades = carregar_particoes(PASTA_HABILIDADES, filtros, COLUNAS_PARTICAO)
+    habilidades = pd.concat([habilidades[[EDICAO, "Município", "Ciclos"]].reset_index(drop=True),
+                             _com_dimensao(habilidades)], axis=1)
+    return (indicadores.sort_values([EDICAO, "Ciclos"], ignore_index=True),
+            habilidades.sort_values([EDICAO, "Ciclos", "Descritor"], ignore_index=True))
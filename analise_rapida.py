@@ -0,0 +1,220 @@
+#-------------------
+# ANÁLISE RÁPIDA (REGRAS LOCAIS)
+#-------------------
+
+# Resumo calculado no próprio app, a partir dos mesmos indicadores por ciclo e
+# médias por habilidade que a página mostra: participação de cada ciclo,
+# variação do Acerto Total e dos níveis de aprendizagem entre ciclos, maiores
+# ganhos e quedas por habilidade e habilidades abaixo das faixas do
+# velocímetro. Não depende da API: aparece na hora, enquanto a análise da IA é
+# gerada, e fica no lugar dela quando a API não está disponível.
+#
+# Os ciclos sem avaliados (por exemplo, um ciclo que o município não aplicou)
+# geram um aviso e ficam fora das comparações.
+
+import math
+
+from agregados import consultar_habilidades_por_ciclo, consultar_indicadores
+from graficos import FAIXAS
+
+# Limites das faixas do velocímetro (0-30, 30-70 e 70-100)
+LIMITE_BAIXO = FAIXAS[0]['range'][1]
+LIMITE_ADEQUADO = FAIXAS[1]['range'][1]
+
+# Participação mínima (%) para os resultados do ciclo serem comparáveis
+PARTICIPACAO_MINIMA = 80
+
+# Variação mínima (pontos percentuais) destacada entre dois ciclos
+VARIACAO_DESTAQUE = 5
+
+# Habilidades listadas em cada destaque
+MAX_HABILIDADES = 3
+
+NIVEIS = ["Defasagem", "Aprendizado intermediário", "Aprendizado adequado"]
+
+
+def _numero(valor):
+    """ float do valor (None para NaN ou ausente) """
+    if valor is None:
+        return None
+    valor = float(valor)
+    return None if math.isnan(valor) else valor
+
+
+def _faixa(valor):
+    if valor <= LIMITE_BAIXO:
+        return "baixo"
+    if valor <= LIMITE_ADEQUADO:
+        return "intermediário"
+    return "adequado"
+
+
+#-------------------
+# REGRAS
+#-------------------
+
+def _participacao(indicadores):
+    """ Avisos de participação: ciclos sem avaliados ou abaixo da participação mínima """
+    avisos = []
+    for _, linha in indicadores.iterrows():
+        avaliados = _numero(linha["Avaliados"]) or 0
+        participacao = _numero(linha["Participação"]) or 0
+        if avaliados == 0:
+            tipo = "sem_avaliados"
+        elif participacao < PARTICIPACAO_MINIMA:
+            tipo = "baixa"
+        else:
+            continue
+        avisos.append({"ciclo": int(linha["Ciclos"]), "tipo": tipo, "previstos": _numero(linha["Previstos"]),
+                       "avaliados": avaliados, "participacao": participacao})
+    return avisos
+
+
+def _acerto(validos):
+    """ Acerto Total de cada ciclo, com a faixa e a variação em relação ao ciclo anterior """
+    acertos = []
+    anterior = None
+    for _, linha in validos.iterrows():
+        valor = _numero(linha["Acerto Total"])
+        if valor is None:
+            continue
+        acertos.append({"ciclo": int(linha["Ciclos"]), "acerto": valor, "faixa": _faixa(valor),
+                        "variacao": None if anterior is None else valor - anterior})
+        anterior = valor
+    return acertos
+
+
+def _niveis(validos):
+    """ Variação dos níveis de aprendizagem entre ciclos consecutivos (pontos percentuais) """
+    mudancas = []
+    linhas = [linha for _, linha in validos.iterrows()]
+    for antes, depois in zip(linhas, linhas[1:]):
+        variacoes = {}
+        for nivel in NIVEIS:
+            a, b = _numero(antes[nivel]), _numero(depois[nivel])
+            if a is not None and b is not None:
+                variacoes[nivel] = b - a
+        mudancas.append({"de": int(antes["Ciclos"]), "para": int(depois["Ciclos"]), "variacoes": variacoes})
+    return mudancas
+
+
+def _percentuais(df):
+    """ {descritor: (habilidade, descrição, percentual)} das habilidades com resultado """
+    resultado = {}
+    for _, linha in df.iterrows():
+        percentual = _numero(linha["Percentual de acertos"])
+        if percentual is not None:
+            resultado[linha["Descritor"]] = (linha["Habilidades"], linha["Descrição da Habilidade "], percentual)
+    return resultado
+
+
+def _variacoes_habilidades(ciclos, por_ciclo):
+    """ Maiores ganhos e quedas por habilidade (mesmo descritor) entre ciclos consecutivos """
+    variacoes = []
+    for de, para in zip(ciclos, ciclos[1:]):
+        antes, depois = _percentuais(por_ciclo[de]), _percentuais(por_ciclo[para])
+        for descritor in antes.keys() & depois.keys():
+            habilidade, descricao, valor = depois[descritor]
+            variacao = valor - antes[descritor][2]
+            if abs(variacao) >= VARIACAO_DESTAQUE:
+                variacoes.append({"descritor": descritor, "habilidade": habilidade, "descricao": descricao,
+                                  "de": de, "para": para, "antes": antes[descritor][2], "depois": valor,
+                                  "variacao": variacao})
+    ordem = sorted(variacoes, key=lambda v: (-abs(v["variacao"]), v["para"], v["descritor"]))
+    return {
+        "ganhos": [v for v in ordem if v["variacao"] > 0][:MAX_HABILIDADES],
+        "quedas": [v for v in ordem if v["variacao"] < 0][:MAX_HABILIDADES],
+    }
+
+
+def _abaixo(ciclo, df):
+    """ Habilidades do ciclo abaixo da faixa adequada, da menor para a maior """
+    habilidades = [{"descritor": descritor, "habilidade": habilidade, "descricao": descricao,
+                    "percentual": percentual, "faixa": _faixa(percentual)}
+                   for descritor, (habilidade, descricao, percentual) in _percentuais(df).items()
+                   if percentual <= LIMITE_ADEQUADO]
+    return {"ciclo": ciclo, "habilidades": sorted(habilidades, key=lambda h: (h["percentual"], h["descritor"]))}
+
+
+def analisar(indicadores, habilidades_por_ciclo):
+    """ Resumo estruturado de uma visão a partir dos indicadores por ciclo e das médias por habilidade """
+    indicadores = indicadores.sort_values("Ciclos")
+    validos = indicadores[indicadores["Avaliados"].fillna(0) > 0]
+    ciclos = [int(c) for c in validos["Ciclos"] if int(c) in habilidades_por_ciclo]
+    return {
+        "participacao": _participacao(indicadores),
+        "acerto": _acerto(validos),
+        "niveis": _niveis(validos),
+        "habilidades": _variacoes_habilidades(ciclos, habilidades_por_ciclo),
+        "abaixo": _abaixo(ciclos[-1], habilidades_por_ciclo[ciclos[-1]]) if ciclos else None,
+    }
+
+
+def analise_rapida(edicao, municipio, etapa, componente):
+    """ Resumo de uma visão do painel, consultando o cubo """
+    return analisar(consultar_indicadores(edicao, municipio, etapa, componente),
+                    consultar_habilidades_por_ciclo(edicao, municipio, etapa, componente))
+
+
+#-------------------
+# TEXTO
+#-------------------
+
+def _pp(valor):
+    return f"{valor:+.0f} p.p."
+
+
+def _habilidade(h):
+    return f"{h['habilidade']} ({h['descritor']}) - {h['descricao'].strip().rstrip('.')}"
+
+
+def _texto_faixa(faixa):
+    return {"baixo": f"até {LIMITE_BAIXO}%", "intermediário": f"entre {LIMITE_BAIXO}% e {LIMITE_ADEQUADO}%",
+            "adequado": f"acima de {LIMITE_ADEQUADO}%"}[faixa]
+
+
+def texto(resumo):
+    """ Resumo em Markdown, na ordem: participação, Acerto Total, níveis e habilidades """
+    partes = []
+
+    if resumo["participacao"]:
+        partes.append("\n**Participação**")
+        for aviso in resumo["participacao"]:
+            if aviso["tipo"] == "sem_avaliados":
+                partes.append(f"- Ciclo {aviso['ciclo']}: nenhum estudante avaliado "
+                              f"({aviso['previstos']:.0f} previstos). O ciclo fica fora das comparações.")
+            else:
+                partes.append(f"- Ciclo {aviso['ciclo']}: participação de {aviso['participacao']:.0f}% "
+                              f"(abaixo de {PARTICIPACAO_MINIMA}%). Compare os resultados com cautela.")
+
+    if resumo["acerto"]:
+        partes.append("\n**Acerto Total**")
+        for ciclo in resumo["acerto"]:
+            variacao = "" if ciclo["variacao"] is None else f", {_pp(ciclo['variacao'])} em relação ao ciclo anterior"
+            partes.append(f"- Ciclo {ciclo['ciclo']}: {ciclo['acerto']:.0f}% ({_texto_faixa(ciclo['faixa'])}{variacao})")
+
+    mudancas = [m for m in resumo["niveis"] if m["variacoes"]]
+    if mudancas:
+        partes.append("\n**Níveis de aprendizagem**")
+        for mudanca in mudancas:
+            variacoes = "; ".join(f"{nivel} {_pp(valor)}" for nivel, valor in mudanca["variacoes"].items())
+            partes.append(f"- Do ciclo {mudanca['de']} para o {mudanca['para']}: {variacoes}")
+
+    for chave, titulo in (("ganhos", "Maiores avanços por habilidade"), ("quedas", "Maiores quedas por habilidade")):
+        if resumo["habilidades"][chave]:
+            partes.append(f"\n**{titulo}**")
+            for h in resumo["habilidades"][chave]:
+                partes.append(f"- {_habilidade(h)}: {h['antes']:.0f}% → {h['depois']:.0f}% "
+                              f"({_pp(h['variacao'])}, ciclos {h['de']} → {h['para']})")
+
+    abaixo = resumo["abaixo"]
+    if abaixo is not None:
+        partes.append(f"\n**Habilidades até {LIMITE_ADEQUADO}% no ciclo {abaixo['ciclo']}**")
+        if abaixo["habilidades"]:
+            for h in abaixo["habilidades"]:
+                marca = f" (até {LIMITE_BAIXO}%)" if h["faixa"] == "baixo" else ""
+                partes.append(f"- {_habilidade(h)}: {h['percentual']:.0f}%{marca}")
+        else:
+            partes.append("- Nenhuma: todas as habilidades estão na faixa adequada.")
+
+    return "\n".join(partes).strip() if partes else "Sem dados suficientes para o resumo."
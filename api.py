@@ -0,0 +1,271 @@
+#-------------------
+# API DE CONSULTA AOS AGREGADOS (SOMENTE LEITURA)
+#-------------------
+
+# Serviço HTTP que expõe os mesmos números do painel (indicadores por ciclo,
+# níveis de aprendizagem e médias por habilidade) para outros sistemas, em JSON
+# ou Arrow IPC, lendo o cubo pela mesma camada de carregamento do app (ver
+# agregados.py). Cada resposta tem um ETag: o cliente que repete o pedido com
+# If-None-Match recebe 304 sem corpo enquanto o cubo não mudar. As respostas
+# ficam em um cache em memória, descartado quando o cubo é regravado.
+#
+# Rotas (GET):
+#   /v1/edicoes
+#   /v1/visoes?edicao=2024
+#   /v1/indicadores?municipio=CAUCAIA&etapa=2 ANO&componente=MATEMÁTICA[&ciclo=1][&edicao=2024]
+#   /v1/niveis?...      (mesmos parâmetros)
+#   /v1/habilidades?... (mesmos parâmetros)
+#
+# Sem 'edicao', vale a mais recente. Para Arrow IPC (stream), use formato=arrow
+# ou o cabeçalho Accept: application/vnd.apache.arrow.stream.
+#
+# Uso:
+#   python api.py --porta 8000
+
+import argparse
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pyarrow as pa
+
+from agregados import (CHAVE, COLUNAS_HABILIDADES, EDICAO, consultar_habilidades_por_ciclo, consultar_indicadores,
+                       edicoes, versao_cubo, visoes)
+
+# Respostas guardadas em memória
+MAX_RESPOSTAS = 1024
+
+# Tempo (segundos) que clientes e proxies podem reaproveitar uma resposta sem revalidar
+MAX_AGE = 60
+
+TIPO_JSON = "application/json; charset=utf-8"
+TIPO_ARROW = "application/vnd.apache.arrow.stream"
+
+COLUNAS_NIVEIS = ["Defasagem", "Aprendizado intermediário", "Aprendizado adequado"]
+
+
+class ErroPedido(Exception):
+    """ Pedido inválido (status HTTP e mensagem para o cliente) """
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+#-------------------
+# CONSULTAS
+#-------------------
+
+def _edicao(consulta):
+    """ Edição pedida (ou a mais recente), verificada no cubo """
+    disponiveis = edicoes()
+    try:
+        edicao = int(consulta["edicao"]) if consulta.get("edicao") else (disponiveis or [None])[-1]
+    except ValueError:
+        raise ErroPedido(400, "'edicao' deve ser um número")
+    if edicao not in disponiveis:
+        raise ErroPedido(404, f"Edição não encontrada: {edicao}")
+    return edicao
+
+
+def _parametros(consulta):
+    """ (edição, município, etapa, componente, ciclo) a partir da query string """
+    faltando = [nome for nome in ("municipio", "etapa", "componente") if not consulta.get(nome)]
+    if faltando:
+        raise ErroPedido(400, f"Parâmetros obrigatórios: {', '.join(faltando)}")
+    try:
+        ciclo = int(consulta["ciclo"]) if consulta.get("ciclo") else None
+    except ValueError:
+        raise ErroPedido(400, "'ciclo' deve ser um número")
+    return _edicao(consulta), consulta["municipio"], consulta["etapa"], consulta["componente"], ciclo
+
+
+def _indicadores(consulta, colunas):
+    edicao, municipio, etapa, componente, ciclo = _parametros(consulta)
+    indicadores = consultar_indicadores(edicao, municipio, etapa, componente)
+    if indicadores.empty:
+        raise ErroPedido(404, "Visão não encontrada")
+    if ciclo is not None:
+        indicadores = indicadores[indicadores["Ciclos"] == ciclo]
+    return indicadores[CHAVE + ["Ciclos"] + colunas].assign(**{EDICAO: edicao})
+
+
+def rota_indicadores(consulta):
+    return _indicadores(consulta, ["Previstos", "Avaliados", "Participação", "Acerto Total"] + COLUNAS_NIVEIS)
+
+
+def rota_niveis(consulta):
+    return _indicadores(consulta, COLUNAS_NIVEIS)
+
+
+def rota_habilidades(consulta):
+    edicao, municipio, etapa, componente, ciclo = _parametros(consulta)
+    por_ciclo = consultar_habilidades_por_ciclo(edicao, municipio, etapa, componente)
+    if not por_ciclo:
+        raise ErroPedido(404, "Visão não encontrada")
+    colunas = [EDICAO, "Município", "Ciclos"] + COLUNAS_HABILIDADES + ["Percentual de acertos"]
+    linhas = [df.assign(**{EDICAO: edicao, "Município": municipio, "Ciclos": c})
+              for c, df in por_ciclo.items() if ciclo is None or c == ciclo]
+    if not linhas:
+        return pd.DataFrame(columns=colunas)
+    return pd.concat(linhas, ignore_index=True)[colunas]
+
+
+def rota_edicoes(consulta):
+    return pd.DataFrame({EDICAO: edicoes()})
+
+
+def rota_visoes(consulta):
+    edicao = _edicao(consulta)
+    return pd.DataFrame(visoes(edicao), columns=CHAVE).assign(**{EDICAO: edicao})
+
+
+ROTAS = {
+    "/v1/edicoes": rota_edicoes,
+    "/v1/visoes": rota_visoes,
+    "/v1/indicadores": rota_indicadores,
+    "/v1/niveis": rota_niveis,
+    "/v1/habilidades": rota_habilidades,
+}
+
+
+#-------------------
+# RESPOSTAS (serialização, ETag e cache)
+#-------------------
+
+def _json(df):
+    registros = json.loads(df.to_json(orient="records", force_ascii=False))
+    return json.dumps({"linhas": len(registros), "dados": registros}, ensure_ascii=False).encode("utf-8")
+
+
+def _arrow(df):
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    destino = pa.BufferOutputStream()
+    with pa.ipc.new_stream(destino, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    return destino.getvalue().to_pybytes()
+
+
+class CacheRespostas:
+    """ Respostas prontas (corpo, tipo e ETag) por pedido, válidas para uma versão do cubo """
+
+    def __init__(self, maximo=MAX_RESPOSTAS):
+        self.maximo = maximo
+        self._respostas = OrderedDict()
+        self._versao = None
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, rota, consulta, formato):
+        """ (corpo, tipo, etag) do pedido, montado só se ainda não estiver no cache """
+        versao = versao_cubo()
+        chave = (rota, tuple(sorted(consulta.items())), formato)
+        with self._trava:
+            if versao != self._versao:
+                self._respostas.clear()
+                self._versao = versao
+            resposta = self._respostas.get(chave)
+            if resposta is not None:
+                self._respostas.move_to_end(chave)
+                self.acertos += 1
+                return resposta
+            self.falhas += 1
+
+        df = ROTAS[rota](consulta)
+        corpo = _arrow(df) if formato == "arrow" else _json(df)
+        tipo = TIPO_ARROW if formato == "arrow" else TIPO_JSON
+        resposta = (corpo, tipo, '"' + hashlib.sha256(corpo).hexdigest()[:20] + '"')
+
+        with self._trava:
+            if versao == self._versao:
+                self._respostas[chave] = resposta
+                while len(self._respostas) > self.maximo:
+                    self._respostas.popitem(last=False)
+        return resposta
+
+
+#-------------------
+# SERVIDOR HTTP
+#-------------------
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeçalhos e corpo saem em escritas separadas: sem isso, cada resposta
+    # de uma conexão reaproveitada espera o ACK atrasado do cliente
+    disable_nagle_algorithm = True
+    cache = None
+
+    def _enviar(self, status, corpo=b"", tipo=TIPO_JSON, cabecalhos=None):
+        self.send_response(status)
+        if corpo:
+            self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if corpo and self.command != "HEAD":
+            self.wfile.write(corpo)
+
+    def _erro(self, status, mensagem):
+        self._enviar(status, json.dumps({"erro": mensagem}, ensure_ascii=False).encode("utf-8"))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        rota = url.path.rstrip("/")
+        if rota not in ROTAS:
+            self._erro(404, f"Rota não encontrada: {url.path}")
+            return
+        consulta = {nome: valores[-1] for nome, valores in parse_qs(url.query).items()}
+        formato = consulta.pop("formato", None)
+        if formato is None:
+            formato = "arrow" if TIPO_ARROW in self.headers.get("Accept", "") else "json"
+        if formato not in ("json", "arrow"):
+            self._erro(400, "formato deve ser 'json' ou 'arrow'")
+            return
+
+        try:
+            corpo, tipo, etag = self.cache.obter(rota, consulta, formato)
+        except ErroPedido as erro:
+            self._erro(erro.status, str(erro))
+            return
+
+        cabecalhos = {"ETag": etag, "Cache-Control": f"public, max-age={MAX_AGE}", "Vary": "Accept"}
+        etags_cliente = [valor.strip() for valor in self.headers.get("If-None-Match", "").split(",")]
+        if etag in etags_cliente or "*" in etags_cliente:
+            self._enviar(304, cabecalhos=cabecalhos)
+        else:
+            self._enviar(200, corpo, tipo, cabecalhos)
+
+    do_HEAD = do_GET
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def criar_servidor(host="127.0.0.1", porta=8000):
+    """ Servidor pronto para serve_forever(), com um cache de respostas próprio """
+    manipulador = type("Manipulador", (_Manipulador,), {"cache": CacheRespostas()})
+    return ThreadingHTTPServer((host, porta), manipulador)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API somente leitura dos agregados do CNCA (JSON e Arrow)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    servidor = criar_servidor(args.host, args.porta)
+    print(f"API em http://{args.host}:{args.porta}/v1/")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
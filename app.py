@@ -4,11 +4,20 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import requests
 import os
 from dotenv import load_dotenv
 import plotly.graph_objects as go
+from agregados import (CREDE, EDICAO, MUNICIPIOS_CREDE, consultar_edicoes, consultar_habilidades_por_ciclo,
+                       consultar_indicadores, edicoes, opcoes)
+from dcrc import consultar_correspondencias
+from escolas import EDICAO as EDICAO_ESCOLAS, NIVEIS as NIVEIS_ESCOLA, consultar_escola, listar_escolas
+from graficos import aprendizagem, comparacao_edicoes, habilidades, velocimetro, estatisticas as estatisticas_figuras
+import cache_analises
+import metricas
+from dados import estatisticas as estatisticas_particoes
+from metricas import contadores_dados, contadores_figuras, medir
+from analise_rapida import analise_rapida, texto as texto_analise_rapida
+from ia import MODELO, analise_compartilhada, chave_analise, dados_analise, estatisticas_pedidos, montar_payload
 
 #-------------------
 # CONFIGURAR PÁGINA
@@ -38,160 +47,235 @@ st.markdown(
 # Carregar variáveis do arquivo .env
 load_dotenv()
 
-# Verificação da chave da API
+# Chave da API: sem ela, o app mostra só as análises já guardadas no cache e,
+# no lugar das demais, o resumo calculado localmente (ver analise_rapida.py)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    st.error("Erro: Chave da API não encontrada. Verifique o arquivo .env.")
-    st.stop()
 
-# Configuração da API da Groq
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
-HEADERS = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
+# Função para obter análise da IA (pedido em segundo plano, ver ia.py)
+def analise(dados):
+    """ Retorna o texto da análise, se já estiver pronto, o pedido em andamento ou None (sem chave da API) """
+    # Cache persistente compartilhado por sessões, processos e deploys (ver cache_analises.py)
+    chave = chave_analise(dados)
+    texto = cache_analises.obter(chave)
+    if texto is not None:
+        return texto
+    if not GROQ_API_KEY:
+        return None
+
+    # Um pedido por visão: os reruns da sessão acompanham o mesmo pedido, e
+    # sessões que abrem a mesma visão ao mesmo tempo compartilham um único
+    # pedido à API (ver ia.analise_compartilhada)
+    em_andamento = st.session_state.setdefault("analises", {})
+    if chave not in em_andamento:
+        em_andamento[chave] = analise_compartilhada(
+            chave, montar_payload(dados), GROQ_API_KEY,
+            ao_concluir=lambda texto: cache_analises.gravar(chave, texto, MODELO)
+        )
+    return em_andamento[chave]
+
+#-------------------
+# SEÇÕES INDEPENDENTES (FRAGMENTOS)
+#-------------------
 
+# As seções abaixo são fragmentos: interagir com os seus widgets (escolha da
+# escola, "Tentar novamente") reexecuta só a própria seção, sem refazer o
+# cabeçalho, os gráficos dos ciclos e a análise da IA.
 
-# Função para obter análise da IA (com cache)
-@st.cache_data
-def analise(dados):
-    """ Gera uma análise baseada nos dados e no conteúdo do arquivo base.txt """
-    try:
-        with open("base.txt", "r", encoding="utf-8") as f:
-            base_conhecimento = f.read()
-    except FileNotFoundError:
-        base_conhecimento = ['DCRC_2019_OFICIAL fundamental LP.csv','DCRC_2019_OFICIAL fundamental MT.csv']
-    
-    # Criando o prompt aprimorado para análise educacional
-
-    prompt = (
-        "Os arquivos enviados contêm os resultados da **Acerto Total** dos **ciclos 1, 2 e 3** do programa **CNCA**.\n\n"
-
-        "### **Sobre o CNCA**\n"
-        "O **Compromisso Nacional Criança Alfabetizada (CNCA)** é um programa do governo federal que busca garantir "
-        "que todas as crianças brasileiras sejam alfabetizadas até o final do **2º ano do ensino fundamental** e "
-        "recuperar as aprendizagens dos estudantes do **3º, 4º e 5º ano**, especialmente aqueles afetados pela pandemia.\n\n"
-
-        "### **Objetivo desta análise**\n"
-        "- Esta análise **prioriza os dados do arquivo informado** e foca na comparação do desempenho de **uma mesma disciplina** "
-        "ao longo dos três ciclos avaliados dentro do mesmo ano.\n"
-        "- O principal objetivo é destacar os padrões de aprendizagem, apontar avanços e dificuldades, "
-        "e fornecer **sugestões pedagógicas** aplicáveis na escola.\n\n"
-
-        "### **Análise Baseada nos Dados do Arquivo**\n\n"
-        "1️ **Resumo Geral dos Resultados:**\n"
-        "   - Como os alunos se saíram nos ciclos 1, 2 e 3?\n"
-        "   - Identificação das principais tendências nos resultados do arquivo.\n"
-        "   - Mudanças significativas no desempenho ao longo dos ciclos.\n\n"
-
-        "2️ **Habilidades com Melhor e Pior Desempenho:**\n"
-        "   - Habilidades com maiores percentuais de acertos.\n"
-        "   - Habilidades que apresentam dificuldades recorrentes.\n"
-        "   - Comparação entre os ciclos e identificação de padrões.\n\n"
-
-        "3️ **Níveis de Aprendizagem e Defasagem:**\n"
-        "   - Quantos alunos estão em **Defasagem Educacional**?\n"
-        "   - Quantos estão no nível **Intermediário**?\n"
-        "   - Quantos atingiram o **Aprendizado Adequado**?\n"
-        "   - Sugestões práticas para melhorar esses índices.\n\n"
-
-        "4️ **Comparação Entre Disciplinas:**\n"
-        "   - Como o desempenho varia entre os diferentes componentes curriculares avaliados?\n"
-        "   - Alguma disciplina teve resultados muito abaixo das outras?\n"
-        "   - Relação entre diferentes habilidades dentro da mesma disciplina.\n\n"
-
-        "5️ **Correlação entre Número de Avaliados e Desempenho:**\n"
-        "   - Escolas com mais alunos avaliados tiveram melhor ou pior desempenho?\n"
-        "   - Diferenças entre escolas pequenas e grandes com base nos dados do arquivo.\n\n"
-
-        "6️ **Alinhamento das Habilidades com a Matriz DCRC:**\n"
-        "   - As habilidades avaliadas no CNCA estão alinhadas com a matriz DCRC?\n"
-        "   - Identificação de possíveis lacunas na aprendizagem.\n"
-        "   - Sugestões para fortalecer habilidades críticas.\n\n"
-
-        "### **Construção Obrigatória de Sequências Didáticas**\n"
-        "Com base nos dados do arquivo enviado, construa **cinco sequências didáticas detalhadas** "
-        "que **obrigatoriamente** devem conter todos os passos descritos abaixo:\n\n"
-
-        "-**Sequência 1: Aprendizagem Ativa (Exploração e Descoberta)**\n"
-        "   - **Objetivo:** Incentivar os alunos a descobrirem conceitos por meio de atividades interativas.\n"
-        "   - **Passos:**\n"
-        "     1. Escolha de um tema baseado nos dados do arquivo.\n"
-        "     2. Propor um problema ou situação do dia a dia relacionada a esse tema.\n"
-        "     3. Estimular os alunos a levantar hipóteses.\n"
-        "     4. Fazer experimentos, pesquisas ou simulações.\n"
-        "     5. Conduzir um debate sobre os resultados encontrados.\n\n"
-
-        "-**Sequência 2: Gamificação (Aprender Brincando)**\n"
-        "   - **Objetivo:** Utilizar jogos e desafios para fixação dos conteúdos.\n"
-        "   - **Passos:**\n"
-        "     1. Selecionar uma habilidade que apresentou baixo desempenho no arquivo.\n"
-        "     2. Criar um jogo de perguntas e respostas baseado nessa habilidade.\n"
-        "     3. Organizar uma competição saudável entre os alunos.\n"
-        "     4. Premiar os melhores desempenhos com recompensas simbólicas.\n"
-        "     5. Revisar os erros cometidos e reforçar os pontos fracos.\n\n"
-
-        "-**Sequência 3: Resolução de Problemas**\n"
-        "   - **Objetivo:** Ensinar os alunos a pensarem criticamente e resolverem desafios reais.\n"
-        "   - **Passos:**\n"
-        "     1. Apresentar um problema real vinculado às dificuldades observadas no arquivo.\n"
-        "     2. Dividir os alunos em grupos para encontrarem soluções.\n"
-        "     3. Cada grupo apresenta suas ideias.\n"
-        "     4. O professor orienta a solução correta e faz a conexão com o conteúdo teórico.\n\n"
-
-        "-**Sequência 4: Projetos Interdisciplinares**\n"
-        "   - **Objetivo:** Integrar diferentes disciplinas em um projeto único.\n"
-        "   - **Passos:**\n"
-        "     1. Escolher um tema que contemple habilidades críticas identificadas nos dados.\n"
-        "     2. Envolver diferentes matérias para fortalecer o aprendizado.\n"
-        "     3. Realizar pesquisas e criar um produto final (cartazes, vídeos, apresentações).\n"
-        "     4. Expor os trabalhos para a escola e comunidade.\n\n"
-
-        "### **Base de conhecimento:**\n"
-        f"- {base_conhecimento}\n\n"
-
-        "### **Dados utilizados na análise:**\n"
-        f"{dados.to_json(orient='records')}"
+@st.fragment
+def secao_escolas(municipio, etapa, componente):
+    """ Desempenho por escola (consulta por chave na base indexada, ver escolas.py) """
+    # Fora da CREDE a seção só aparece quando o município tem escolas na base
+    if municipio != CREDE:
+        lista_escolas = listar_escolas(municipio, etapa, componente)
+        if not lista_escolas:
+            return
+
+    st.markdown(
+        "<h3 style='font-family: Kanit; font-size: 24px; font-weight: bold;'>Desempenho por Escola</h3>",
+        unsafe_allow_html=True
     )
+    # Na CREDE o município é escolhido dentro da seção, mesmo que algum deles não tenha escolas
+    if municipio == CREDE:
+        municipio_escolas = st.selectbox("Selecione o Município", MUNICIPIOS_CREDE)
+        lista_escolas = listar_escolas(municipio_escolas, etapa, componente)
+        if not lista_escolas:
+            st.info(f"Nenhuma escola de {municipio_escolas} encontrada para {etapa} - {componente}.")
+            return
+    else:
+        municipio_escolas = municipio
 
-    # Criando o payload otimizado para IA
-    payload = {
-        "model": "llama-3.3-70b-versatile",
-        "messages": [
-            {
-                "role": "system",
-                "content": (
-                    "Você é um analista de dados especializado em educação no Brasil, com foco especial no Ceará. "
-                    "Seu objetivo é **priorizar as informações do arquivo enviado**, realizando uma análise aprofundada "
-                    "com base nesses dados. **Toda a resposta deve ser estruturada de forma acessível e prática** para gestores escolares.\n\n"
-
-                    "### **Diretrizes Obrigatórias:**\n"
-                    "🔹 **A resposta deve ser 100% baseada nos dados do arquivo** e não em generalizações.\n"
-                    "🔹 **As sequências didáticas devem obrigatoriamente seguir todos os passos especificados no prompt.**\n"
-                    "🔹 **A linguagem deve ser clara e acessível**, sem uso excessivo de termos técnicos.\n"
-                    "🔹 **A resposta deve ser organizada em tópicos bem definidos**, facilitando a leitura.\n"
-                )
+    escola_filtro = st.selectbox("Selecione a Escola", lista_escolas)
+    resumo_escola, df_habilidades_escola = consultar_escola(municipio_escolas, etapa, componente, escola_filtro)
+    if resumo_escola is None:
+        st.info(f"Sem resultados da escola {escola_filtro} para {etapa} - {componente}.")
+        return
+
+    col1, col2 = st.columns([0.4, 0.6], border=True)
+
+    with col1:
+        acerto_escola = df_habilidades_escola["Percentual de acertos"].mean()
+        fig_escola = go.Figure(go.Indicator(
+            mode="gauge+number",
+            value=acerto_escola,
+            number={'font': {'size': 80, 'family': "Kanit", 'color': "#111827"}, 'valueformat': '.0f'},
+            title={
+                'text': "Acerto médio nas habilidades",
+                'font': {'size': 24, 'family': "Kanit", 'color': "black"}
             },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        "temperature": 0.5,
-        "max_tokens": 4096,
-        "top_p": 0.9,
-        "frequency_penalty": 0.2,
-        "presence_penalty": 0.1
-    }
-    response = requests.post(GROQ_API_URL, headers=HEADERS, json=payload)
-    
-    if response.status_code == 200:
-        data = response.json()
-        if "choices" in data and len(data["choices"]) > 0:
-            return data["choices"][0].get("message", {}).get("content", "")
-        else:
-            print("Resposta da API não contém a chave 'choices':", data)
+            gauge = {
+                'axis': {'range': [None, 100], 'tickwidth': 1, 'tickfont': {'size': 20, 'color': "black"} },
+                'bar': {'color': "#111827"},
+                'bgcolor': "white",
+                'borderwidth': 2,
+                'bordercolor': "black",
+                'steps': [
+                    {'range': [0, 30], 'color': '#f68511'},
+                    {'range': [30.1, 70], 'color': '#ffce2c'},
+                    {'range': [70.1, 100], 'color': '#7e84fa'}],
+                'threshold': {
+                    'line': {'color': "black", 'width': 4},
+                    'thickness': 0.75,
+                    'value': acerto_escola}}
+            ))
+        fig_escola.update_layout(height=350, margin=dict(l=10, r=10, t=60, b=0))
+        st.plotly_chart(fig_escola)
+
+        st.markdown(
+        f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Previstos: {resumo_escola['previstos']} alunos · Avaliados: {resumo_escola['avaliados']} alunos</h3>",
+        unsafe_allow_html=True
+    )
+        st.markdown(
+        f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Proficiência Média: {resumo_escola['proficiencia_media']:.0f}</h3>",
+        unsafe_allow_html=True
+    )
+
+    with col2:
+        # Padrões de desempenho da escola
+        fig_niveis = go.Figure(go.Bar(
+            x=list(NIVEIS_ESCOLA.values()),
+            y=[resumo_escola[coluna] for coluna in NIVEIS_ESCOLA],
+            marker=dict(color=['#f68511', '#f8a34a', '#ffce2c', '#a9acf9', '#7e84fa'], line=dict(color="black", width=2)),
+            text=[resumo_escola[coluna] for coluna in NIVEIS_ESCOLA],
+            textposition='auto',
+            textfont=dict(family="Kanit", size=18, color="black"),
+        ))
+        fig_niveis.update_layout(
+            title=dict(text="Padrão de Desempenho (%)", font=dict(family="Kanit", size=20)),
+            yaxis=dict(range=[0, 100], tickfont=dict(size=16)),
+            xaxis=dict(tickfont=dict(size=16)),
+            paper_bgcolor="white",
+            plot_bgcolor="white",
+            margin=dict(l=50, r=50, t=50, b=50)
+        )
+        st.plotly_chart(fig_niveis)
+
+    # Habilidades da escola
+    fig_hab_escola = go.Figure(go.Bar(
+        x=df_habilidades_escola["Habilidades"],
+        y=df_habilidades_escola["Percentual de acertos"],
+        name=escola_filtro,
+        marker=dict(color='#7e84fa', line=dict(color="black", width=2)),
+        text=df_habilidades_escola["Percentual de acertos"],
+        textposition='auto',
+        textfont=dict(family="Kanit", size=20, color="black"),
+    ))
+    fig_hab_escola.update_layout(
+        title=dict(text="Percentual de Acertos por Habilidade", font=dict(family="Kanit", size=20)),
+        xaxis=dict(title=dict(text="Habilidade", font=dict(family="Kanit", size=20)), tickfont=dict(size=20)),
+        yaxis=dict(title=dict(text="Percentual (%)", font=dict(family="Kanit", size=20)), range=[0, 100], tickfont=dict(size=20)),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        margin=dict(l=50, r=50, t=50, b=50)
+    )
+    st.plotly_chart(fig_hab_escola)
+
+    st.markdown("---")
+
+
+@st.fragment
+def secao_analise(edicao, municipio, etapa, componente):
+    """ Resumo calculado localmente e sugestão de análise da IA (texto do cache ou pedido em andamento) """
+    st.markdown(
+        "<h3 style='font-family: Kanit; font-size: 26px; font-weight: bold;'>Sugestão de Análise</h3>",
+        unsafe_allow_html=True
+    )
+    st.markdown(
+        "<h3 style='font-family: Kanit; font-size: 14px; color: red;'>Esta análise é feita por inteligência artificial e está em fase de teste. Verifique se ela faz sentido antes de utilizar!</h3>",
+        unsafe_allow_html=True
+    )
+
+    with medir("analise_rapida"):
+        resumo = texto_analise_rapida(analise_rapida(edicao, municipio, etapa, componente))
+    with medir("analise") as medicao:
+        resultado = analise(dados_analise(edicao, municipio, etapa, componente))
+        if resultado is not None:
+            medicao.cache = "acerto" if isinstance(resultado, str) else "falha"
+
+    # O resumo aparece na hora; fica aberto enquanto a análise da IA não estiver pronta
+    with st.expander("Resumo dos dados (calculado a partir dos resultados, sem IA)",
+                     expanded=not isinstance(resultado, str)):
+        st.markdown(resumo)
+
+    if isinstance(resultado, str):
+        st.write(resultado)
+    elif resultado is None:
+        st.info("Análise da IA indisponível: chave da API não encontrada. Verifique o arquivo .env.")
     else:
-        print(f"Erro na API: {response.status_code} - {response.text}")
+        with st.status("Analisando seus dados... Aguarde", expanded=True) as status, medir("analise.resposta"):
+            # Com muitos pedidos ao mesmo tempo, o pedido espera vaga no cliente compartilhado (ver ia.py)
+            aviso = st.empty()
+            for posicao in resultado.posicoes_na_fila():
+                aviso.info(f"Muitas análises sendo geradas agora. Posição na fila: {posicao}")
+            aviso.empty()
+            # O texto aparece à medida que a API responde
+            st.write_stream(resultado.acompanhar())
+            if resultado.erro is None:
+                status.update(label="", expanded=True, state="complete")
+            else:
+                status.update(label="Não foi possível gerar a análise agora. Veja o resumo dos dados acima.",
+                              state="error")
+        if resultado.erro is not None:
+            if st.button("Tentar novamente"):
+                st.session_state["analises"].pop(resultado.chave, None)
+                st.rerun(scope="fragment")
 
-    return ""
+#-------------------
+# PAINEL DE DESEMPENHO (ADMINISTRAÇÃO)
+#-------------------
+
+def painel_desempenho():
+    """ Tempo de cada etapa desta execução, totais do processo e estado dos caches (ver metricas.py) """
+    with st.sidebar.expander("Desempenho"):
+        medicoes = metricas.execucao()
+        st.caption(f"Execução: {sum(m.segundos for m in medicoes if m.etapa == 'total') * 1000:.0f} ms")
+        st.dataframe(
+            pd.DataFrame([m.registro() for m in medicoes if m.etapa != "total"],
+                         columns=["etapa", "ms", "linhas", "cache"]),
+            hide_index=True, use_container_width=True
+        )
+
+        st.caption("Acumulado do processo")
+        totais = pd.DataFrame.from_dict(metricas.acumulado(), orient="index")
+        if not totais.empty:
+            totais["média (ms)"] = (1000 * totais["segundos"] / totais["execucoes"]).round(1)
+            totais["máximo (ms)"] = (1000 * totais["maximo"]).round(1)
+            st.dataframe(totais[["execucoes", "média (ms)", "máximo (ms)", "linhas", "acertos", "falhas"]],
+                         use_container_width=True)
+
+        st.caption("Caches")
+        caches = {f"figuras: {nome}": {"acertos": info["hits"], "falhas": info["misses"], "entradas": info["currsize"]}
+                  for nome, info in estatisticas_figuras().items()}
+        caches["partições do cubo"] = estatisticas_particoes()
+        analises = cache_analises.estatisticas()
+        caches["análises da IA"] = {chave: analises[chave] for chave in ("acertos", "falhas", "entradas")}
+        st.dataframe(pd.DataFrame.from_dict(caches, orient="index"), use_container_width=True)
+
+        pedidos = estatisticas_pedidos()
+        st.caption(f"Pedidos à IA: {pedidos['em_andamento']} em andamento, {pedidos['fila']} na fila, "
+                   f"{pedidos['compartilhados']} compartilhados entre sessões")
+
+        st.download_button("Métricas (Prometheus)", metricas.prometheus(), file_name="metricas.prom",
+                           mime="text/plain")
 
 #-------------------
 # AUTENTICAÇÃO
@@ -212,6 +296,9 @@ USERS = {"crede01": "0", "aquiraz": "0", "caucaia": "0", "eusebio": "0", "guaiub
 
 # Mapeamento de municípios para usuários
 MUNICIPIOS = {"crede01": "Crede 01", "aquiraz": "AQUIRAZ", "caucaia": "CAUCAIA", "eusebio": "EUSEBIO", "guaiuba": "GUAIUBA", "itaitinga": "ITAITINGA", "maracanau": "MARACANAU", "maranguape": "MARANGUAPE", "pacatuba": "PACATUBA"}
+
+# Usuários que veem o painel de desempenho
+ADMINISTRADORES = ["crede01"]
 #-------------------
 
 # Simulação de autenticação
@@ -233,6 +320,7 @@ if not st.session_state["authenticated"]:
         else:
             st.error("Usuário ou senha incorretos!")
 else:
+    metricas.iniciar_execucao()
     usuario = st.session_state["username"]
     municipio_usuario = st.session_state["municipio"]
     st.sidebar.image("CNCA.png", width=150)
@@ -255,9 +343,15 @@ else:
             )
     
     st.markdown('---')
+
+    # Edição (ano da avaliação): o app só lê as partições do cubo dessa edição
+    st.sidebar.subheader("Filtros")
+    with medir("edicoes"):
+        lista_edicoes = edicoes()
+    edicao_filtro = st.sidebar.selectbox("Selecione a Edição", lista_edicoes, index=len(lista_edicoes) - 1)
     
     st.markdown(
-        "<h1 style='font-family: Kanit; font-size: 36px; font-weight: bold;'>CNCA 2024</h1>",
+        f"<h1 style='font-family: Kanit; font-size: 36px; font-weight: bold;'>CNCA {edicao_filtro}</h1>",
         unsafe_allow_html=True
     )
     st.markdown(
@@ -268,324 +362,84 @@ else:
     # Adicionar linha divisória
     st.write("---")
 
-#-------------------
-# IMPORTA OS DADOS (df)
-#-------------------
-
-    df = pd.read_csv("df_final.csv")
-    # st.text('df')
-    # st.dataframe(df, height=400, width=1000)
-    
 #-------------------
 # FILTROS ()
 #-------------------
     
-    # Filtrar os dados pelo município
-    if municipio_usuario != "Todos":
-        df = df[df["Município"] == municipio_usuario]
-    
-    # Barra lateral com filtros
-    st.sidebar.subheader("Filtros")
-    etapa_filtro = st.sidebar.selectbox("Selecione a Etapa", df["Etapa"].unique())
-    componente_filtro = st.sidebar.selectbox("Selecione o Componente Curricular", df["Componente Curricular"].unique())
+    # Barra lateral com filtros (opções vindas do cubo de agregados)
+    with medir("filtros", contadores_dados):
+        opcoes_etapa = opcoes(edicao_filtro, municipio_usuario, "Etapa")
+        opcoes_componente = opcoes(edicao_filtro, municipio_usuario, "Componente Curricular")
+    etapa_filtro = st.sidebar.selectbox("Selecione a Etapa", opcoes_etapa)
+    componente_filtro = st.sidebar.selectbox("Selecione o Componente Curricular", opcoes_componente)
 
-    df_filtrado = df[(df["Etapa"] == etapa_filtro) & (df["Componente Curricular"] == componente_filtro)].copy()
-        # st.text('df_filtrado')
-        # st.dataframe(df_filtrado, height=400, width=1000)
-        
 #-------------------
-# IMPORTAR BIBLIOTECAS
+# CONSULTA AO CUBO DE AGREGADOS
 #-------------------
 
-    if not df_filtrado.empty:
+    # Indicadores dos ciclos já calculados no pré-processamento (ver agregados.py)
+    with medir("indicadores", contadores_dados) as medicao:
+        df_indicadores = consultar_indicadores(edicao_filtro, municipio_usuario, etapa_filtro, componente_filtro)
+        medicao.linhas = len(df_indicadores)
+        # st.text('df_indicadores')
+        # st.dataframe(df_indicadores, height=400, width=1000)
+
+    if not df_indicadores.empty:
         st.markdown(
             "<h3 style='font-family: Kanit; font-size: 24px; font-weight: bold;'>Acerto Total por Ciclo</h3>",
             unsafe_allow_html=True
         )
-        # Filtrar dados do Ciclo 1
-        df_ciclo1 = df_filtrado[df_filtrado['Ciclos'] == 1].copy()
-        df_ciclo1['Acerto Total'] = pd.to_numeric(df_ciclo1['Acerto Total'], errors='coerce')
-        acerto_media1 = df_ciclo1['Acerto Total'].mean()
-
-        df_acerto1 = df_ciclo1[['Acerto Total']].drop_duplicates()
-        df_aprendizado1 = df_ciclo1[['Defasagem', 'Aprendizado intermediário', 'Aprendizado adequado']].drop_duplicates()
-        df_habilidades1 = df_ciclo1[['Descritor', 'Descrição da Habilidade ', 'Habilidades', 'Percentual de acertos']].drop_duplicates()
-        df_avaliados1 = df_ciclo1[['Previstos', 'Avaliados','Participação']].drop_duplicates()
-
-        # Filtrar dados do Ciclo 2
-        df_ciclo2 = df_filtrado[df_filtrado['Ciclos'] == 2].copy()
-        df_ciclo2['Acerto Total'] = pd.to_numeric(df_ciclo2['Acerto Total'], errors='coerce')
-        acerto_media2 = df_ciclo2['Acerto Total'].mean()
-
-        df_acerto2 = df_ciclo2[['Acerto Total']].drop_duplicates()
-        df_aprendizado2 = df_ciclo2[['Defasagem', 'Aprendizado intermediário', 'Aprendizado adequado']].drop_duplicates()
-        df_habilidades2 = df_ciclo2[['Descritor', 'Descrição da Habilidade ', 'Habilidades', 'Percentual de acertos']].drop_duplicates()
-        df_avaliados2 = df_ciclo2[['Previstos', 'Avaliados','Participação']].drop_duplicates()
-
-        # Filtrar dados do Ciclo 3
-        df_ciclo3 = df_filtrado[df_filtrado['Ciclos'] == 3].copy()
-        df_ciclo3['Acerto Total'] = pd.to_numeric(df_ciclo3['Acerto Total'], errors='coerce')
-        acerto_media3 = df_ciclo3['Acerto Total'].mean()  # Corrigido para df_ciclo3
-
-        df_acerto3 = df_ciclo3[['Acerto Total']].drop_duplicates()
-        df_aprendizado3 = df_ciclo3[['Defasagem', 'Aprendizado intermediário', 'Aprendizado adequado']].drop_duplicates()
-        df_habilidades3 = df_ciclo3[['Descritor', 'Descrição da Habilidade ', 'Habilidades', 'Percentual de acertos']].drop_duplicates()
-        df_avaliados3 = df_ciclo3[['Previstos', 'Avaliados','Participação']].drop_duplicates()
+        # Todos os ciclos da visão de uma vez: indicadores agrupados por ciclo
+        # e médias por habilidade separadas por ciclo (ver agregados.py)
+        with medir("agregacao_ciclos") as medicao:
+            resumo_ciclos = df_indicadores.groupby('Ciclos')[
+                ['Acerto Total', 'Previstos', 'Avaliados', 'Participação']
+            ].mean()
+            medicao.linhas = len(df_indicadores)
+        with medir("habilidades", contadores_dados) as medicao:
+            habilidades_ciclos = consultar_habilidades_por_ciclo(edicao_filtro, municipio_usuario, etapa_filtro, componente_filtro)
+            medicao.linhas = sum(len(df) for df in habilidades_ciclos.values())
 
 #-----------------------------------------            
-# Criar colunas para exibição lado a lado
+# Criar colunas para exibição lado a lado (uma por ciclo)
 #----------------------------------------
 
-        col1, col2, col3 = st.columns([0.3,0.3,0.3], border=True)
-        
-        with col1:
-            fig1 = go.Figure(go.Indicator(
-                mode="gauge+number", 
-                value=acerto_media1, 
-                title={
-                    'text': "Acerto Total - Ciclo 1",
-                    'font': {'size': 30, 'family': "Kanit", 'color': "black"}
-                },
-                 number={
-                    'font': {'size': 100, 'family': "Kanit",  'color': "#111827"}  # Ajuste o tamanho e a cor do número aqui
-                },
-                gauge = {
-                    'axis': {'range': [None, 100], 'tickwidth': 1, 'tickfont': {'size': 30, 'color': "black"} },
-                    'bar': {'color': "#111827"},
-                    'bgcolor': "white",
-                    'borderwidth': 2,
-                    'bordercolor': "black",
-                    'steps': [
-                        {'range': [0, 30], 'color': '#f68511'},
-                        {'range': [30.1, 70], 'color': '#ffce2c'},
-                        {'range': [70.1, 100], 'color': '#7e84fa'}],
-                    'threshold': {
-                        'line': {'color': "black", 'width': 4},
-                        'thickness': 0.75,
-                        'value': acerto_media1}}
-                ))
-            # Ajustar o tamanho do gráfico
-            fig1.update_layout(
-                width=500,  # Largura reduzida
-                height=400,  # Altura reduzida
-                margin=dict(l=10, r=10, t=30, b=0)  # Reduzindo margens
+        colunas_ciclos = st.columns(len(resumo_ciclos), border=True)
+        acerto_anterior = False
+
+        for coluna, (ciclo, resumo) in zip(colunas_ciclos, resumo_ciclos.iterrows()):
+            with coluna:
+                # A partir do segundo ciclo, o velocímetro mostra a variação em relação ao anterior
+                with medir("figura.velocimetro", contadores_figuras("velocimetro")):
+                    fig_ciclo = velocimetro(resumo['Acerto Total'], f"Acerto Total - Ciclo {ciclo}", acerto_anterior)
+                with medir("envio.velocimetro"):
+                    st.plotly_chart(fig_ciclo)
+                acerto_anterior = resumo['Acerto Total']
+
+                previstos = resumo["Previstos"]
+                st.markdown(
+                f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Previstos: {previstos} alunos</h3>",
+                unsafe_allow_html=True
             )
-
-            st.plotly_chart(fig1)
-            
-            
-            previstos =df_avaliados1["Previstos"].mean()
-            st.markdown(
-            f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Previstos: {previstos} alunos</h3>",
-            unsafe_allow_html=True
-        )
-            avaliados =df_avaliados1["Avaliados"].mean()
-            st.markdown(
-            f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Avaliados: {avaliados} alunos</h3>",
-            unsafe_allow_html=True
-        )
-            participacao =df_avaliados1["Participação"].mean()
-            st.markdown(
-            f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Participação: {participacao} %</h3>",
-            unsafe_allow_html=True
-        )
-        
-        with col2:
-            fig2 = go.Figure(go.Indicator(
-                mode="gauge+number+delta", 
-                value=acerto_media2, 
-                title={
-                    'text': "Acerto Total - Ciclo 2",
-                    'font': {'size': 30, 'family': "Kanit", 'color': "black"}
-                },
-                 number={
-                    'font': {'size': 80,'family': "Kanit", 'color': "#111827"}  # Ajuste o tamanho e a cor do número aqui
-                },
-                delta={"reference": acerto_media1, "increasing": {"color": "green"}, "decreasing": {"color": "red"},"position": "bottom", "font": {"size": 30}},  # Configuração do delta
-                gauge = {
-                    'axis': {'range': [None, 100], 'tickwidth': 1, 'tickfont': {'size': 30, 'color': "black"} },
-                    'bar': {'color': "#111827"},
-                    'bgcolor': "white",
-                    'borderwidth': 2,
-                    'bordercolor': "black",
-                    'steps': [
-                        {'range': [0, 30], 'color': '#f68511'},
-                        {'range': [30.1, 70], 'color': '#ffce2c'},
-                        {'range': [70.1, 100], 'color': '#7e84fa'}],
-                    'threshold': {
-                        'line': {'color': "black", 'width': 4},
-                        'thickness': 0.75,
-                        'value': acerto_media2}}
-                ))
-             # Ajustar o tamanho do gráfico
-            fig2.update_layout(
-                width=500,  # Largura reduzida
-                height=400,  # Altura reduzida
-                margin=dict(l=10, r=10, t=30, b=0)  # Reduzindo margens
+                avaliados = resumo["Avaliados"]
+                st.markdown(
+                f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Avaliados: {avaliados} alunos</h3>",
+                unsafe_allow_html=True
+            )
+                participacao = resumo["Participação"]
+                st.markdown(
+                f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Participação: {participacao} %</h3>",
+                unsafe_allow_html=True
             )
-            st.plotly_chart(fig2)
-            
-            previstos =df_avaliados2["Previstos"].mean()
-            st.markdown(
-            f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Previstos: {previstos} alunos</h3>",
-            unsafe_allow_html=True
-        )
-            avaliados =df_avaliados2["Avaliados"].mean()
-            st.markdown(
-            f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Avaliados: {avaliados} alunos</h3>",
-            unsafe_allow_html=True
-        )
-            participacao =df_avaliados2["Participação"].mean()
-            st.markdown(
-            f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Participação: {participacao} %</h3>",
-            unsafe_allow_html=True
-        )
-        with col3:
-            fig4 = go.Figure(go.Indicator(
-                mode="gauge+number+delta", 
-                value=acerto_media3, 
-                title={
-                    'text': "Acerto Total - Ciclo 3",
-                    'font': {'size': 30, 'family': "Kanit", 'color': "black"}
-                },
-                 number={
-                    'font': {'size': 80,'family': "Kanit", 'color': "#111827"}  # Ajuste o tamanho e a cor do número aqui
-                },
-                delta={"reference": acerto_media2, "increasing": {"color": "green"}, "decreasing": {"color": "red"},"position": "bottom", "font": {"size": 30}},  # Configuração do delta
-                gauge = {
-                    'axis': {'range': [None, 100], 'tickwidth': 1, 'tickfont': {'size': 30, 'color': "black"} },
-                    'bar': {'color': "#111827"},
-                    'bgcolor': "white",
-                    'borderwidth': 2,
-                    'bordercolor': "black",
-                    'steps': [
-                        {'range': [0, 30], 'color': '#f68511'},
-                        {'range': [30.1, 70], 'color': '#ffce2c'},
-                        {'range': [70.1, 100], 'color': '#7e84fa'}],
-                    'threshold': {
-                        'line': {'color': "black", 'width': 4},
-                        'thickness': 0.75,
-                        'value': acerto_media3}}
-                ))
-             # Ajustar o tamanho do gráfico
-            fig4.update_layout(
-                width=500,  # Largura reduzida
-                height=400,  # Altura reduzida
-                margin=dict(l=10, r=10, t=30, b=0)  # Reduzindo margens
-            )  
-            st.plotly_chart(fig4)
-            
-            previstos =df_avaliados3["Previstos"].mean()
-            st.markdown(
-            f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Previstos: {previstos} alunos</h3>",
-            unsafe_allow_html=True
-        )
-            avaliados =df_avaliados3["Avaliados"].mean()
-            st.markdown(
-            f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Avaliados: {avaliados} alunos</h3>",
-            unsafe_allow_html=True
-        )
-            participacao =df_avaliados3["Participação"].mean()
-            st.markdown(
-            f"<h3 style='font-family: Kanit; font-size: 20px;text-align: center; font-weight: normal;'>Participação: {participacao} %</h3>",
-            unsafe_allow_html=True
-        )
 
         # Adicionar linha divisória
         st.markdown("---")
 
-        # Converter o eixo X para string para garantir que os rótulos sejam reconhecidos corretamente
-        df_filtrado['Ciclos'] = df_filtrado['Ciclos'].astype(str)
-
-        # Criar figura
-        fig5 = go.Figure()
-
-        # Defasagem
-        fig5.add_trace(go.Scatter(
-            x=df_filtrado['Ciclos'], 
-            y=df_filtrado['Defasagem'],
-            mode='lines+markers+text',  # Adiciona os rótulos ao gráfico
-            name='Defasagem',
-            line=dict(color='#f68511'),
-            marker=dict(size=8),
-            text=df_filtrado['Defasagem'].astype(str), 
-            textposition="top center",
-            textfont=dict(family="Kanit", size=16, color="black"),
-            cliponaxis=False, 
-            showlegend=True  # Garantir que apareça na legenda
-        ))
-
-        # Aprendizado Intermediário
-        fig5.add_trace(go.Scatter(
-            x=df_filtrado['Ciclos'], 
-            y=df_filtrado['Aprendizado intermediário'],
-            mode='lines+markers+text',
-            name='Aprendizado Intermediário',
-            line=dict(color='#ffce2c'),
-            marker=dict(size=8),
-            text=df_filtrado['Aprendizado intermediário'].astype(str),
-            textposition="top center",
-            textfont=dict(family="Kanit", size=16, color="black"),
-            cliponaxis=False, 
-            showlegend=True
-        ))
-
-        # Aprendizado Adequado
-        fig5.add_trace(go.Scatter(
-            x=df_filtrado['Ciclos'], 
-            y=df_filtrado['Aprendizado adequado'],
-            mode='lines+markers+text',
-            name='Aprendizado Adequado',
-            line=dict(color='#7e84fa'),
-            marker=dict(size=8),
-            text=df_filtrado['Aprendizado adequado'].astype(str),
-            textposition="top center",
-            textfont=dict(family="Kanit", size=16, color="black"),
-            cliponaxis=False, 
-            showlegend=True
-        ))
-
-        # Configurar o layout do gráfico
-        fig5.update_layout(
-            title=dict(text="Aprendizagem por Ciclo", font=dict(family="Kanit", size=25)),
-            xaxis=dict(
-                title=dict(text="Ciclo", font=dict(family="Kanit", size=20)),
-                tickfont=dict(size=16),  # Alterando o tamanho dos rótulos no eixo X
-                tickmode='array',
-                tickvals=df_filtrado['Ciclos'].tolist(),  # Garantir que os valores estão no eixo X
-                ticktext=df_filtrado['Ciclos'].tolist()   # Forçar os rótulos a aparecerem
-            ),
-            
-            yaxis=dict(
-                title=dict(text="Percentual (%)", font=dict(family="Kanit", size=20)),
-                range=[0, 100],
-                tickfont=dict(size=20)  # Alterando o tamanho dos rótulos no eixo Y
-            ),
-            margin=dict(l=0, r=0, t=120, b=10),
-                
-            template='plotly_white',
-            font=dict(family="Kanit", size=20),
-            legend=dict(
-                orientation="v",  # Legenda horizontal
-                yanchor="bottom",  # Alinhar a parte inferior da legenda
-                y=-0.5,  # Elevar a legenda acima do gráfico
-                xanchor="center",
-                x=0,
-                font=dict(size=16)  # Ajustar tamanho da fonte da legenda
-            ),
-            hoverlabel=dict(
-                font_size=20,
-                font_family="Kanit"
-            )
-        )
-        # Adicionar customdata para o hover
-        fig5.update_traces(
-            hovertemplate="<b>Ciclo:</b> %{customdata[0]}°<br>",
-            customdata=df_filtrado[['Ciclos']].values
-        )
-
-        # Exibir o gráfico
-        st.plotly_chart(fig5)
+        # Gráficos montados pela fábrica com cache (ver graficos.py)
+        with medir("figura.aprendizagem", contadores_figuras("aprendizagem")):
+            fig_aprendizagem = aprendizagem(df_indicadores)
+        with medir("envio.aprendizagem"):
+            st.plotly_chart(fig_aprendizagem)
         
         
         # Adicionar linha divisória
@@ -596,120 +450,69 @@ else:
             unsafe_allow_html=True
         )
         
-        df_habilidade1 = df_ciclo1.groupby(
-            ['Componente Curricular', 'Descritor', 'Descrição da Habilidade ', 'Etapa', 'Habilidades']
-        )['Percentual de acertos'].mean().reset_index()  # Garante que o resultado seja um DataFrame
-        # st.text('df_habilidade1')
-        # st.dataframe(df_habilidade1, height=400, width=1000)
-        
-        df_habilidade2 = df_ciclo2.groupby(
-            ['Componente Curricular', 'Descritor', 'Descrição da Habilidade ', 'Etapa', 'Habilidades']
-        )['Percentual de acertos'].mean().reset_index()  # Garante que o resultado seja um DataFrame
-        # st.text('df_habilidade2')
-        # st.dataframe(df_habilidade2, height=400, width=1000)
-        
-        df_habilidade3 = df_ciclo3.groupby(
-            ['Componente Curricular', 'Descritor', 'Descrição da Habilidade ', 'Etapa', 'Habilidades']
-        )['Percentual de acertos'].mean().reset_index()  # Garante que o resultado seja um DataFrame
-        # st.text('df_habilidade2')
-        # st.dataframe(df_habilidade2, height=400, width=1000)
-        
-        fig = go.Figure()
-
-        # Definir um limite de caracteres por linha e quebrar em múltiplas linhas
-        df_habilidade1["Descrição Quebrada"] = df_habilidade1["Descrição da Habilidade "].str.wrap(50).str.replace('\n', '<br>')
-
-        fig.add_trace(go.Bar(
-            x=df_habilidade1["Descritor"],
-            y=df_habilidade1["Percentual de acertos"],
-            name="Ciclo 1",
-            marker=dict(color='#e46e3c', line=dict(color="black", width=2)),
-            text=df_habilidade1["Percentual de acertos"],  # Rótulo do percentual
-            textposition='auto',  # Posição automática dos rótulos
-            textfont=dict(family="Kanit", size=20, color="black"),  # Tamanho e cor dos rótulos
-            hovertemplate="<b>Descritor:</b> %{customdata[0]}<br>"
-                        "<b>Descrição:</b> %{customdata[1]}<br>",
-            customdata=df_habilidade1[["Descritor", "Descrição Quebrada"]].values  # Usa a versão com quebras de linha
-        ))
+        with medir("figura.habilidades", contadores_figuras("habilidades")):
+            fig_habilidades = habilidades(habilidades_ciclos)
+        with medir("envio.habilidades"):
+            st.plotly_chart(fig_habilidades)
+
+        # Habilidades do DCRC correspondentes aos descritores do gráfico (tabela gerada no pré-processamento)
+        with medir("correspondencias") as medicao:
+            df_correspondencias = consultar_correspondencias(etapa_filtro, componente_filtro)
+            descritores_visao = set().union(*(df["Descritor"] for df in habilidades_ciclos.values()))
+            df_correspondencias = df_correspondencias[df_correspondencias["Descritor"].isin(descritores_visao)]
+            medicao.linhas = len(df_correspondencias)
+        if not df_correspondencias.empty:
+            with st.expander("Correspondência das habilidades com o DCRC"):
+                st.dataframe(
+                    df_correspondencias[["Descritor", "Posição", "Código DCRC", "Habilidade DCRC", "Similaridade"]],
+                    hide_index=True, use_container_width=True
+                )
 
+        st.markdown("---")
 
-        df_habilidade2["Descrição Quebrada"] = df_habilidade2["Descrição da Habilidade "].str.wrap(50).str.replace('\n', '<br>')
+#-------------------
+# COMPARAÇÃO ENTRE EDIÇÕES
+#-------------------
 
-        fig.add_trace(go.Bar(
-            x=df_habilidade2["Descritor"],
-            y=df_habilidade2["Percentual de acertos"],
-            name="Ciclo 2",
-            marker=dict(color='#ffce2c', line=dict(color="black", width=2)),
-            text=df_habilidade2["Percentual de acertos"],  # Rótulo do percentual
-            textposition='auto',  # Posição automática dos rótulos
-            textfont=dict(family="Kanit", size=20, color="black"),  # Tamanho e cor dos rótulos
-            hovertemplate="<b>Descritor:</b> %{customdata[0]}<br>"
-                        "<b>Descrição:</b> %{customdata[1]}<br>",
-            customdata=df_habilidade2[["Descritor", "Descrição Quebrada"]].values  # Usa a versão com quebras de linha
-        ))
-        
-        df_habilidade3["Descrição Quebrada"] = df_habilidade3["Descrição da Habilidade "].str.wrap(50).str.replace('\n', '<br>')
-
-        fig.add_trace(go.Bar(
-            x=df_habilidade3["Descritor"],
-            y=df_habilidade3["Percentual de acertos"],
-            name="Ciclo 3",
-            marker=dict(color='#7e84fa', line=dict(color="black", width=2)),
-            text=df_habilidade3["Percentual de acertos"],  # Rótulo do percentual
-            textposition='auto',  # Posição automática dos rótulos
-            textfont=dict(family="Kanit", size=20, color="black"),  # Tamanho e cor dos rótulos
-            hovertemplate="<b>Descritor:</b> %{customdata[0]}<br>"
-                        "<b>Descrição:</b> %{customdata[1]}<br>",
-            customdata=df_habilidade3[["Descritor", "Descrição Quebrada"]].values  # Usa a versão com quebras de linha
-        ))
+        # Lê só as linhas desta visão em cada edição (ver agregados.consultar_edicoes)
+        if len(lista_edicoes) > 1:
+            with medir("edicoes.consulta", contadores_dados) as medicao:
+                df_indicadores_edicoes, df_habilidades_edicoes = consultar_edicoes(municipio_usuario, etapa_filtro, componente_filtro)
+                medicao.linhas = len(df_indicadores_edicoes) + len(df_habilidades_edicoes)
+            if df_indicadores_edicoes[EDICAO].nunique() > 1:
+                st.markdown(
+                    "<h3 style='font-family: Kanit; font-size: 24px; font-weight: bold;'>Comparação entre Edições</h3>",
+                    unsafe_allow_html=True
+                )
+                with medir("figura.comparacao_edicoes", contadores_figuras("comparacao_edicoes")):
+                    fig_edicoes = comparacao_edicoes(df_indicadores_edicoes)
+                with medir("envio.comparacao_edicoes"):
+                    st.plotly_chart(fig_edicoes)
 
-        # Layout do gráfico
-        fig.update_layout(
-            title=dict(text="Média de Acertos por Habilidade (Descritor)", font=dict(family="Kanit", size=20)),
-            
-            xaxis=dict(
-                title=dict(text="Habilidade", font=dict(family="Kanit", size=20)),
-                tickfont=dict(size=20)  # Alterando o tamanho dos rótulos no eixo X
-            ),
-            
-            yaxis=dict(
-                title=dict(text="Percentual (%)", font=dict(family="Kanit", size=20)),
-                range=[0, 100],
-                tickfont=dict(size=20)  # Alterando o tamanho dos rótulos no eixo Y
-            ),
-            barmode="group",
-            bargroupgap=0,
-            showlegend=True,
-            hoverlabel=dict(
-                font_size=20,  # Aumenta o tamanho da fonte no hover
-                font_family="Kanit"
-            ),
-            #hovermode="x unified",
-            paper_bgcolor="white",  # Fundo branco
-            plot_bgcolor="white",   # Fundo branco do gráfico
-            margin=dict(l=50, r=50, t=50, b=50)  # Margens para exibição correta
-        )
+                with st.expander("Percentual de acertos por habilidade em cada edição"):
+                    df_comparacao = df_habilidades_edicoes.pivot_table(
+                        index="Descritor", columns=[EDICAO, "Ciclos"], values="Percentual de acertos", observed=True
+                    )
+                    df_comparacao.columns = [f"{edicao} - Ciclo {ciclo}" for edicao, ciclo in df_comparacao.columns]
+                    st.dataframe(df_comparacao, use_container_width=True)
 
-        # Exibir o gráfico
-        st.plotly_chart(fig)
-        
-        st.markdown("---")
+                st.markdown("---")
+
+#-------------------
+# RESULTADOS POR ESCOLA E ANÁLISE DA IA
+#-------------------
+
+        # As exportações por escola são de uma única edição
+        if edicao_filtro == EDICAO_ESCOLAS:
+            with medir("escolas"):
+                secao_escolas(municipio_usuario, etapa_filtro, componente_filtro)
+
+        secao_analise(edicao_filtro, municipio_usuario, etapa_filtro, componente_filtro)
+
+    metricas.finalizar_execucao(usuario=usuario, edicao=edicao_filtro, municipio=municipio_usuario)
+    if usuario in ADMINISTRADORES:
+        painel_desempenho()
 
-        st.markdown(
-            "<h3 style='font-family: Kanit; font-size: 26px; font-weight: bold;'>Sugestão de Análise</h3>",
-            unsafe_allow_html=True
-        )
-        st.markdown(
-            "<h3 style='font-family: Kanit; font-size: 14px; color: red;'>Esta análise é feita por inteligência artificial e está em fase de teste. Verifique se ela faz sentido antes de utilizar!</h3>",
-            unsafe_allow_html=True
-        )
-        
-        
-        with st.status("Analisando seus dados... Aguarde", expanded=False) as status:
-            analise = analise(pd.concat([df_acerto1, df_acerto2,df_aprendizado1,df_aprendizado2,df_avaliados1,df_avaliados2,df_habilidades1,df_habilidades2]))
-            st.write(analise)
-            status.update(label="", expanded=True)
-            
     if st.sidebar.button("Sair"):
         st.session_state["authenticated"] = False
         st.rerun()
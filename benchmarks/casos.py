@@ -0,0 +1,182 @@
+#-------------------
+# CASOS MEDIDOS PELOS BENCHMARKS
+#-------------------
+
+# Cada caso é uma função que recebe o contexto da execução (ver
+# executar.Contexto) e retorna o número de linhas (ou itens) processados. Um
+# caso pode ter uma preparação, executada antes de cada repetição e fora da
+# medição (por exemplo, para esvaziar um cache e medir a execução "fria").
+#
+# Os casos seguem o caminho dos dados: leitura dos arquivos brutos, melt/merge
+# do pré-processamento, carga do df_final, construção e consulta do cubo (o
+# caminho de cada visão do painel), montagem dos gráficos e do prompt da IA.
+
+import glob
+
+import pandas as pd
+
+import agregados
+import analise_rapida
+import dados
+import escolas
+import etl
+import estudantes
+import graficos
+import ia
+
+CASOS = []
+
+
+def caso(preparar=None):
+    """ Registra a função como caso de benchmark, na ordem de definição """
+    def registrar(funcao):
+        CASOS.append((funcao.__name__, preparar, funcao))
+        return funcao
+    return registrar
+
+
+def _visoes():
+    return [(edicao,) + visao for edicao in agregados.edicoes() for visao in agregados.visoes(edicao)]
+
+
+def _esvaziar_cubo(contexto):
+    agregados._indices.clear()
+    dados._particoes.clear()
+
+
+def _esvaziar_graficos(contexto):
+    graficos.limpar()
+
+
+#-------------------
+# PRÉ-PROCESSAMENTO
+#-------------------
+
+@caso()
+def etl_completo(contexto):
+    """ Pré-processamento completo (reprocessa todas as partições) """
+    etl.executar(contexto.pasta_brutos, forcar=True, informar=lambda *_: None)
+    return sum(1 for _ in etl.descobrir_arquivos(contexto.pasta_brutos))
+
+
+@caso()
+def leitura_brutos(contexto):
+    """ Leitura de todos os arquivos brutos com tipos explícitos """
+    linhas = 0
+    for edicao, ciclo, ano, componente, caminho in etl.descobrir_arquivos(contexto.pasta_brutos):
+        linhas += len(etl.ler_bruto(caminho, ciclo, ano, componente))
+    return linhas
+
+
+@caso()
+def transformacao(contexto):
+    """ Melt/merge de cada partição bruta com a matriz de referência """
+    linhas = 0
+    for edicao, bruto in contexto.brutos:
+        linhas += len(etl.transformar(bruto, etl.matriz_da_edicao(contexto.matriz, edicao)))
+    return linhas
+
+
+@caso()
+def df_final_csv(contexto):
+    """ Leitura e tipagem do df_final.csv """
+    return len(dados.tipar(pd.read_csv(etl.ARQUIVO_FINAL)))
+
+
+@caso(preparar=lambda contexto: dados._cache.clear())
+def df_final_parquet(contexto):
+    """ Carga do df_final pela camada de dados (Parquet já materializado) """
+    return len(dados.carregar_dados(etl.ARQUIVO_FINAL))
+
+
+@caso()
+def cubo_construcao(contexto):
+    """ Indicadores e médias por habilidade de todas as visões a partir do df_final """
+    indicadores, habilidades = agregados.construir_cubo(dados.carregar_dados(etl.ARQUIVO_FINAL).drop(columns="Edição"))
+    return len(indicadores) + len(habilidades)
+
+
+#-------------------
+# CAMINHO DE CADA VISÃO DO PAINEL
+#-------------------
+
+def _consultar_visoes(contexto):
+    for edicao, municipio, etapa, componente in contexto.visoes:
+        indicadores = agregados.consultar_indicadores(edicao, municipio, etapa, componente)
+        indicadores.groupby('Ciclos')[['Acerto Total', 'Previstos', 'Avaliados', 'Participação']].mean()
+        agregados.consultar_habilidades_por_ciclo(edicao, municipio, etapa, componente)
+    return len(contexto.visoes)
+
+
+@caso(preparar=_esvaziar_cubo)
+def visoes_cubo_frio(contexto):
+    """ Consultas de todas as visões, carregando as partições do cubo """
+    return _consultar_visoes(contexto)
+
+
+@caso()
+def visoes_cubo(contexto):
+    """ Consultas de todas as visões com o cubo já carregado """
+    return _consultar_visoes(contexto)
+
+
+def _graficos_visoes(contexto):
+    for edicao, municipio, etapa, componente in contexto.visoes:
+        indicadores = agregados.consultar_indicadores(edicao, municipio, etapa, componente)
+        anterior = False
+        for _, linha in indicadores.iterrows():
+            graficos.velocimetro(linha['Acerto Total'], f"Acerto Total - Ciclo {linha['Ciclos']}", anterior)
+            anterior = linha['Acerto Total']
+        graficos.aprendizagem(indicadores)
+        graficos.habilidades(agregados.consultar_habilidades_por_ciclo(edicao, municipio, etapa, componente))
+    return len(contexto.visoes)
+
+
+@caso(preparar=_esvaziar_graficos)
+def graficos_construcao(contexto):
+    """ Montagem de todos os gráficos de todas as visões """
+    return _graficos_visoes(contexto)
+
+
+@caso()
+def graficos_cache(contexto):
+    """ Gráficos de todas as visões vindos do cache de figuras """
+    return _graficos_visoes(contexto)
+
+
+@caso()
+def prompt_montagem(contexto):
+    """ Dados, prompt e payload da análise da IA de todas as visões """
+    for visao in contexto.visoes:
+        ia.montar_payload(ia.dados_analise(*visao))
+    return len(contexto.visoes)
+
+
+@caso()
+def analise_rapida_texto(contexto):
+    """ Resumo calculado localmente (regras) de todas as visões """
+    for visao in contexto.visoes:
+        analise_rapida.texto(analise_rapida.analise_rapida(*visao))
+    return len(contexto.visoes)
+
+
+#-------------------
+# EXPORTAÇÕES POR ESCOLA E POR ESTUDANTE
+#-------------------
+
+@caso()
+def escolas_base(contexto):
+    """ Base indexada das exportações por escola """
+    if not glob.glob(escolas.PADRAO_ESCOLAS):
+        return 0
+    return escolas.construir_base()
+
+
+@caso()
+def estudantes_agregacao(contexto):
+    """ Agregação em blocos das exportações por estudante """
+    caminhos = sorted(glob.glob(estudantes.PADRAO_ESTUDANTES))
+    if not caminhos:
+        return 0
+    agregado = estudantes.agregar(caminhos, informar=lambda *_: None)
+    return 0 if agregado is None else len(agregado)
@@ -0,0 +1,221 @@
+#-------------------
+# EXECUÇÃO DOS BENCHMARKS
+#-------------------
+
+# Mede os casos de benchmarks/casos.py sobre um conjunto de arquivos brutos
+# (os dados do repositório ou qualquer outra pasta no mesmo formato) e grava o
+# resultado em JSON, identificado pelo commit, para comparar versões.
+#
+# A execução acontece em uma pasta temporária: o pré-processamento é feito uma
+# vez nela antes das medições, e as saídas do repositório não são alteradas.
+#
+# Uso:
+#   python benchmarks/executar.py                         # dados de DadosBrutos
+#   python benchmarks/executar.py --dados /outra/pasta --repeticoes 3
+#   python benchmarks/executar.py --casos prompt,graficos # só os casos com esses nomes
+#   python benchmarks/executar.py --sintetico 10          # dados sintéticos (ver gerador_sintetico.py)
+#   python benchmarks/executar.py --comparar antes.json depois.json
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# Repetições de cada caso
+REPETICOES = 5
+
+# Pasta dos resultados
+PASTA_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+
+# Variação da mediana, entre duas execuções, destacada na comparação
+TOLERANCIA = 0.10
+
+# Arquivos de referência usados pelo pré-processamento e pelo prompt
+REFERENCIAS = ["Matriz_Referencia_CNCA.csv", "DCRC_2019_OFICIAL fundamental LP.csv",
+               "DCRC_2019_OFICIAL fundamental MT.csv", "base.txt"]
+
+# Exportações por escola e por estudante copiadas para a pasta de trabalho
+PADROES_EXPORTACOES = ["HABILIDADES_DESEMPENHO_ESCOLA *.csv", "HABILIDADES_DESEMPENHO_ESTUDANTE *.csv"]
+
+
+class Contexto:
+    """ Pasta de trabalho e dados compartilhados pelos casos """
+
+    def __init__(self, pasta_brutos):
+        import etl
+
+        self.pasta_brutos = pasta_brutos
+        etl.executar(pasta_brutos, informar=lambda *_: None)
+        self.matriz = etl.carregar_matriz()
+        self.brutos = [(edicao, etl.ler_bruto(caminho, ciclo, ano, componente))
+                       for edicao, ciclo, ano, componente, caminho in etl.descobrir_arquivos(pasta_brutos)]
+        from casos import _visoes
+        self.visoes = _visoes()
+
+    def descrever(self):
+        return {
+            "pasta": self.pasta_brutos,
+            "arquivos": len(self.brutos),
+            "linhas_brutas": sum(len(bruto) for _, bruto in self.brutos),
+            "visoes": len(self.visoes),
+        }
+
+
+def _commit():
+    """ Commit atual (com '+' se houver alterações não commitadas) """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        alterado = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=RAIZ,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+    return commit + ("+" if alterado else "")
+
+
+def _preparar_pasta(pasta, exportacoes):
+    """ Copia os arquivos de referência e as exportações (se houver pasta) para a pasta de trabalho """
+    for nome in REFERENCIAS:
+        if os.path.exists(os.path.join(RAIZ, nome)):
+            shutil.copy(os.path.join(RAIZ, nome), pasta)
+    if exportacoes is None:
+        return
+    for padrao in PADROES_EXPORTACOES:
+        for caminho in glob.glob(os.path.join(exportacoes, padrao)):
+            shutil.copy(caminho, pasta)
+
+
+def medir(contexto, casos, repeticoes=REPETICOES, informar=print):
+    """ Tempos de cada caso: {nome: {mediana, minimo, media, desvio, linhas, ...}} """
+    resultados = {}
+    for nome, preparar, funcao in casos:
+        tempos = []
+        linhas = 0
+        for _ in range(repeticoes):
+            if preparar:
+                preparar(contexto)
+            inicio = time.perf_counter()
+            linhas = funcao(contexto)
+            tempos.append(time.perf_counter() - inicio)
+        resultados[nome] = {
+            "mediana": statistics.median(tempos),
+            "minimo": min(tempos),
+            "media": statistics.fmean(tempos),
+            "desvio": statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+            "repeticoes": repeticoes,
+            "linhas": linhas,
+        }
+        informar(f"{nome:<24} mediana {1000 * resultados[nome]['mediana']:10.2f} ms   "
+                 f"mín {1000 * resultados[nome]['minimo']:10.2f} ms   {linhas} linhas")
+    return resultados
+
+
+def executar(pasta_brutos, repeticoes=REPETICOES, filtro=None, exportacoes=RAIZ, destino=PASTA_RESULTADOS,
+             sintetico=None, semente=0, informar=print):
+    """ Executa os casos em uma pasta temporária e grava o resultado em JSON; retorna o caminho.
+
+    Com 'sintetico' (uma escala), os arquivos brutos e as exportações são
+    gerados na pasta temporária por gerador_sintetico.py, no lugar de
+    'pasta_brutos' e 'exportacoes'.
+    """
+    pasta_brutos = os.path.abspath(pasta_brutos)
+    exportacoes = os.path.abspath(exportacoes)
+    destino = os.path.abspath(destino)
+    original = os.getcwd()
+    trabalho = tempfile.mkdtemp(prefix="cnca-benchmarks-")
+    try:
+        _preparar_pasta(trabalho, None if sintetico else exportacoes)
+        os.chdir(trabalho)
+        from casos import CASOS
+
+        if sintetico:
+            import gerador_sintetico
+
+            gerador_sintetico.gerar(trabalho, sintetico, semente=semente, informar=informar)
+            pasta_brutos = os.path.join(trabalho, "DadosBrutos")
+
+        casos = [c for c in CASOS if not filtro or any(parte in c[0] for parte in filtro)]
+        inicio = time.perf_counter()
+        contexto = Contexto(pasta_brutos)
+        informar(f"Preparação: {time.perf_counter() - inicio:.2f}s ({contexto.descrever()})")
+        resultados = medir(contexto, casos, repeticoes, informar)
+        dados = contexto.descrever()
+        if sintetico:
+            dados.update(pasta="sintetico", escala=sintetico, semente=semente)
+    finally:
+        os.chdir(original)
+        shutil.rmtree(trabalho, ignore_errors=True)
+
+    agora = datetime.datetime.now()
+    commit = _commit()
+    relatorio = {
+        "commit": commit,
+        "data": agora.isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "dados": dados,
+        "casos": resultados,
+    }
+    os.makedirs(destino, exist_ok=True)
+    caminho = os.path.join(destino, f"{agora:%Y%m%d-%H%M%S}-{commit.replace('+', '-alterado')}.json")
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=1)
+    informar(f"Resultado gravado em {caminho}")
+    return caminho
+
+
+def comparar(antes, depois, informar=print):
+    """ Compara as medianas de duas execuções; retorna os casos mais lentos além da tolerância """
+    with open(antes, encoding="utf-8") as f:
+        a = json.load(f)
+    with open(depois, encoding="utf-8") as f:
+        b = json.load(f)
+    informar(f"{'caso':<24} {a['commit']:>12} {b['commit']:>12}   razão")
+    piores = []
+    for nome in sorted(set(a["casos"]) | set(b["casos"])):
+        if nome not in a["casos"] or nome not in b["casos"]:
+            informar(f"{nome:<24} (só em uma das execuções)")
+            continue
+        t_a, t_b = a["casos"][nome]["mediana"], b["casos"][nome]["mediana"]
+        razao = t_b / t_a if t_a else float("inf")
+        marca = "  mais lento" if razao > 1 + TOLERANCIA else ("  mais rápido" if razao < 1 - TOLERANCIA else "")
+        if razao > 1 + TOLERANCIA:
+            piores.append(nome)
+        informar(f"{nome:<24} {1000 * t_a:10.2f}ms {1000 * t_b:10.2f}ms   {razao:5.2f}x{marca}")
+    return piores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do pré-processamento e do painel do CNCA")
+    parser.add_argument("--dados", default=os.path.join(RAIZ, "DadosBrutos"), help="pasta com os arquivos brutos")
+    parser.add_argument("--exportacoes", default=RAIZ, help="pasta com as exportações por escola e por estudante")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--casos", help="só os casos cujo nome contém um destes textos (separados por vírgula)")
+    parser.add_argument("--saida", default=PASTA_RESULTADOS, help="pasta dos resultados em JSON")
+    parser.add_argument("--sintetico", type=float, metavar="ESCALA",
+                        help="usa dados sintéticos nessa escala no lugar de --dados e --exportacoes")
+    parser.add_argument("--semente", type=int, default=0, help="semente dos dados sintéticos")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DEPOIS"), help="compara dois resultados")
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        return 1 if comparar(*args.comparar) else 0
+    filtro = args.casos.split(",") if args.casos else None
+    executar(args.dados, args.repeticoes, filtro, args.exportacoes, args.saida, args.sintetico, args.semente)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+#-------------------
+# CACHE PERSISTENTE DAS ANÁLISES DA IA
+#-------------------
+
+# Guarda em SQLite as análises já geradas, para que cada combinação de dados,
+# modelo, versão do prompt e parâmetros seja pedida à API uma única vez. O
+# arquivo é compartilhado por todos os processos do servidor (modo WAL) e
+# sobrevive a novos deploys. Entradas antigas expiram (TTL) e, acima dos
+# limites de quantidade ou tamanho, as menos acessadas são descartadas.
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from etl import PASTA_ARMAZEM
+
+ARQUIVO_CACHE = os.getenv("CACHE_ANALISES", os.path.join(PASTA_ARMAZEM, "analises.sqlite"))
+
+# Validade das análises (os resultados do CNCA não mudam depois de publicados)
+TTL_SEGUNDOS = 90 * 24 * 3600
+
+# Limites do cache
+MAX_ENTRADAS = 2000
+MAX_BYTES = 50 * 1024 * 1024
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS analises (
+    chave TEXT PRIMARY KEY,
+    texto TEXT NOT NULL,
+    modelo TEXT,
+    criado REAL NOT NULL,
+    acessado REAL NOT NULL,
+    tamanho INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analises_acessado ON analises (acessado);
+CREATE TABLE IF NOT EXISTS contadores (nome TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+"""
+
+
+def _valor_canonico(valor):
+    """ Normaliza números (69 e 69.0 geram a mesma chave) e valores ausentes """
+    if isinstance(valor, float):
+        if math.isnan(valor):
+            return None
+        if valor.is_integer():
+            return int(valor)
+        return round(valor, 6)
+    if hasattr(valor, "item"):
+        return _valor_canonico(valor.item())
+    return valor
+
+
+def registros_canonicos(dados):
+    """ Registros do DataFrame sem valores ausentes e com números normalizados """
+    registros = []
+    for registro in dados.to_dict(orient="records"):
+        canonico = {str(k): _valor_canonico(v) for k, v in registro.items()}
+        registros.append({k: v for k, v in canonico.items() if v is not None})
+    return registros
+
+
+def chave(registros, modelo, versao_prompt, parametros):
+    """ Impressão digital da análise """
+    conteudo = {
+        "registros": registros,
+        "modelo": modelo,
+        "versao_prompt": versao_prompt,
+        "parametros": parametros,
+    }
+    texto = json.dumps(conteudo, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def _conectar(arquivo=ARQUIVO_CACHE):
+    """ Conexão para uma operação (segura entre threads e processos) """
+    os.makedirs(os.path.dirname(arquivo) or ".", exist_ok=True)
+    conexao = sqlite3.connect(arquivo, timeout=10)
+    try:
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.executescript(ESQUEMA)
+        with conexao:
+            yield conexao
+    finally:
+        conexao.close()
+
+
+def _contar(conexao, nome):
+    conexao.execute(
+        "INSERT INTO contadores VALUES (?, 1) ON CONFLICT(nome) DO UPDATE SET valor = valor + 1", (nome,)
+    )
+
+
+def obter(chave_analise, arquivo=ARQUIVO_CACHE):
+    """ Texto da análise em cache (None se ausente ou expirada) """
+    agora = time.time()
+    with _conectar(arquivo) as conexao:
+        linha = conexao.execute(
+            "SELECT texto, criado FROM analises WHERE chave = ?", (chave_analise,)
+        ).fetchone()
+        # Textos vazios (gravados por versões anteriores) também contam como ausentes
+        if linha is not None and (agora - linha[1] > TTL_SEGUNDOS or not linha[0].strip()):
+            conexao.execute("DELETE FROM analises WHERE chave = ?", (chave_analise,))
+            linha = None
+        if linha is None:
+            _contar(conexao, "falhas")
+            return None
+        conexao.execute("UPDATE analises SET acessado = ? WHERE chave = ?", (agora, chave_analise))
+        _contar(conexao, "acertos")
+        return linha[0]
+
+
+def existe(chave_analise, arquivo=ARQUIVO_CACHE):
+    """ Verifica se há análise válida para a chave (sem alterar acessos nem contadores) """
+    with _conectar(arquivo) as conexao:
+        linha = conexao.execute(
+            "SELECT 1 FROM analises WHERE chave = ? AND criado >= ? AND TRIM(texto) != ''",
+            (chave_analise, time.time() - TTL_SEGUNDOS)
+        ).fetchone()
+    return linha is not None
+
+
+def gravar(chave_analise, texto, modelo=None, arquivo=ARQUIVO_CACHE):
+    """ Grava a análise e aplica os limites de validade, quantidade e tamanho (texto vazio é recusado) """
+    if not texto or not texto.strip():
+        raise ValueError("Análise vazia não é gravada no cache")
+    agora = time.time()
+    with _conectar(arquivo) as conexao:
+        conexao.execute(
+            "INSERT OR REPLACE INTO analises VALUES (?, ?, ?, ?, ?, ?)",
+            (chave_analise, texto, modelo, agora, agora, len(texto.encode("utf-8"))),
+        )
+        _remover_excedentes(conexao, agora)
+
+
+def _remover_excedentes(conexao, agora):
+    """ Remove expiradas e, se preciso, as menos acessadas recentemente """
+    conexao.execute("DELETE FROM analises WHERE criado < ?", (agora - TTL_SEGUNDOS,))
+    quantidade, tamanho = conexao.execute("SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM analises").fetchone()
+    if quantidade <= MAX_ENTRADAS and tamanho <= MAX_BYTES:
+        return
+    removidas = 0
+    for chave_antiga, tamanho_entrada in conexao.execute(
+        "SELECT chave, tamanho FROM analises ORDER BY acessado"
+    ).fetchall():
+        if quantidade <= MAX_ENTRADAS and tamanho <= MAX_BYTES:
+            break
+        conexao.execute("DELETE FROM analises WHERE chave = ?", (chave_antiga,))
+        quantidade -= 1
+        tamanho -= tamanho_entrada
+        removidas += 1
+    conexao.execute(
+        "INSERT INTO contadores VALUES ('descartes', ?) ON CONFLICT(nome) DO UPDATE SET valor = valor + ?",
+        (removidas, removidas),
+    )
+
+
+def estatisticas(arquivo=ARQUIVO_CACHE):
+    """ Acertos, falhas, descartes, entradas e bytes do cache """
+    with _conectar(arquivo) as conexao:
+        contadores = dict(conexao.execute("SELECT nome, valor FROM contadores").fetchall())
+        entradas, tamanho = conexao.execute("SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM analises").fetchone()
+    return {
+        "acertos": contadores.get("acertos", 0),
+        "falhas": contadores.get("falhas", 0),
+        "descartes": contadores.get("descartes", 0),
+        "entradas": entradas,
+        "bytes": tamanho,
+    }
@@ -0,0 +1,193 @@
+#-------------------
+# CAMADA DE CARREGAMENTO DOS DADOS
+#-------------------
+
+# Materializa o df_final.csv uma única vez em Parquet (colunas tipadas e
+# categóricas) e mantém o resultado em um cache compartilhado pelo processo,
+# evitando reler e reinterpretar o CSV a cada interação no Streamlit. Conjuntos
+# Parquet particionados (coluna=valor) são lidos só nas partições pedidas.
+
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+
+# Arquivo gerado pelo pré-processamento
+ARQUIVO_FINAL = "df_final.csv"
+
+# Pasta onde ficam as versões em Parquet
+PASTA_CACHE = "cache_dados"
+
+# Pasta dos artefatos gerados (partições, bases e índices)
+PASTA_ARMAZEM = "armazem"
+
+# Colunas de texto com poucos valores distintos
+COLUNAS_CATEGORICAS = ["Município", "Etapa", "Componente Curricular", "Habilidades", "Descritor"]
+
+# Colunas numéricas e seus tipos
+COLUNAS_NUMERICAS = {
+    "Edição": "int16",
+    "Ciclos": "int8",
+    "Previstos": "float64",
+    "Avaliados": "float64",
+    "Participação": "int16",
+    "Defasagem": "int16",
+    "Aprendizado intermediário": "int16",
+    "Aprendizado adequado": "int16",
+    "Acerto Total": "int16",
+    "Percentual de acertos": "float64",
+}
+
+# Tempo (segundos) em que a assinatura de uma pasta é reaproveitada sem percorrê-la de novo
+VALIDADE_ASSINATURA = 2.0
+
+_cache = {}
+_particoes = {}
+_assinaturas = {}
+_trava = threading.Lock()
+
+# Leituras de partições atendidas pelo cache e lidas do disco (ver estatisticas)
+_contadores = {"acertos": 0, "falhas": 0}
+
+
+def _assinatura(caminho):
+    """ Identifica a versão do arquivo pelo horário de modificação e tamanho """
+    info = os.stat(caminho)
+    return (os.path.abspath(caminho), info.st_mtime_ns, info.st_size)
+
+
+def _hash_arquivo(caminho):
+    """ Calcula o hash do conteúdo do arquivo (usado no nome do Parquet) """
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()[:16]
+
+
+def tipar(df):
+    """ Converte as colunas do df_final para tipos compactos """
+    df = df.copy()
+    for coluna, tipo in COLUNAS_NUMERICAS.items():
+        if coluna not in df.columns:
+            continue
+        valores = pd.to_numeric(df[coluna], errors="coerce")
+        # Colunas inteiras com valores ausentes ficam como float
+        if tipo.startswith("int") and valores.isna().any():
+            tipo = "float64"
+        df[coluna] = valores.astype(tipo)
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in df.columns:
+            df[coluna] = df[coluna].astype("category")
+    return df
+
+
+def _materializar(caminho):
+    """ Lê o Parquet correspondente ao CSV ou o cria se ainda não existir """
+    nome = os.path.splitext(os.path.basename(caminho))[0]
+    parquet = os.path.join(PASTA_CACHE, f"{nome}-{_hash_arquivo(caminho)}.parquet")
+
+    if os.path.exists(parquet):
+        return pd.read_parquet(parquet)
+
+    df = tipar(pd.read_csv(caminho))
+    os.makedirs(PASTA_CACHE, exist_ok=True)
+    temporario = f"{parquet}.{os.getpid()}.tmp"
+    df.to_parquet(temporario, index=False)
+    os.replace(temporario, parquet)
+    return df
+
+
+def carregar_dados(caminho=ARQUIVO_FINAL):
+    """ Retorna o df_final tipado, compartilhado entre todas as sessões.
+
+    O DataFrame devolvido é o mesmo objeto para todos os chamadores e não deve
+    ser modificado no lugar (use .copy() antes de alterar colunas).
+    """
+    chave = _assinatura(caminho)
+    df = _cache.get(chave)
+    if df is not None:
+        return df
+
+    with _trava:
+        df = _cache.get(chave)
+        if df is None:
+            df = _materializar(caminho)
+            # Descarta versões antigas do mesmo arquivo
+            for antiga in [k for k in _cache if k[0] == chave[0]]:
+                del _cache[antiga]
+            _cache[chave] = df
+    return df
+
+
+def assinatura_pasta(pasta):
+    """ Identifica a versão de um conjunto particionado pelos arquivos que o compõem """
+    arquivos = []
+    for raiz, _, nomes in os.walk(pasta):
+        for nome in nomes:
+            if nome.endswith(".parquet"):
+                info = os.stat(os.path.join(raiz, nome))
+                arquivos.append((os.path.join(raiz, nome), info.st_mtime_ns, info.st_size))
+    return tuple(sorted(arquivos))
+
+
+def assinatura_recente(pasta):
+    """ assinatura_pasta, percorrendo a pasta no máximo uma vez a cada VALIDADE_ASSINATURA segundos.
+
+    Uma pasta regravada por outro processo é percebida em até
+    VALIDADE_ASSINATURA segundos; quem regrava no mesmo processo chama
+    esquecer_assinaturas.
+    """
+    caminho = os.path.abspath(pasta)
+    agora = time.monotonic()
+    entrada = _assinaturas.get(caminho)
+    if entrada is not None and agora - entrada[0] < VALIDADE_ASSINATURA:
+        return entrada[1]
+    assinatura = assinatura_pasta(caminho)
+    _assinaturas[caminho] = (agora, assinatura)
+    return assinatura
+
+
+def esquecer_assinaturas():
+    """ Descarta as assinaturas guardadas por assinatura_recente """
+    _assinaturas.clear()
+
+
+def carregar_particoes(pasta, filtros, colunas_particao):
+    """ Linhas de um conjunto Parquet particionado que atendem aos filtros, tipadas.
+
+    filtros: lista de (coluna, "==" ou "in", valor). Só as partições que atendem aos
+    filtros nas colunas de partição são lidas do disco; os demais filtros são
+    aplicados na leitura. As colunas de partição voltam com o tipo original
+    (texto ou número). Como em carregar_dados, o resultado é compartilhado e
+    não deve ser modificado no lugar. A versão da pasta vem de
+    assinatura_recente: um acerto não percorre a pasta.
+    """
+    chave = (os.path.abspath(pasta), tuple(filtros))
+    assinatura = assinatura_recente(pasta)
+    entrada = _particoes.get(chave)
+    if entrada is not None and entrada[0] == assinatura:
+        _contadores["acertos"] += 1
+        return entrada[1]
+
+    with _trava:
+        entrada = _particoes.get(chave)
+        if entrada is None or entrada[0] != assinatura:
+            _contadores["falhas"] += 1
+            df = pd.read_parquet(pasta, filters=list(filtros) or None)
+            # As colunas de partição chegam como categorias de texto ou número
+            for coluna in colunas_particao:
+                if coluna in df.columns:
+                    df[coluna] = df[coluna].astype(df[coluna].cat.categories.dtype)
+            entrada = (assinatura, tipar(df))
+            _particoes[chave] = entrada
+        else:
+            _contadores["acertos"] += 1
+    return entrada[1]
+
+
+def estatisticas():
+    """ Acertos e falhas do cache de partições e número de conjuntos guardados """
+    return {**_contadores, "entradas": len(_particoes)}
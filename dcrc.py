@@ -0,0 +1,334 @@
+#-------------------
+# ÍNDICE DE BUSCA NO DCRC
+#-------------------
+
+# Índice BM25 sobre as linhas do Documento Curricular Referencial do Ceará
+# (DCRC_2019_OFICIAL fundamental LP.csv e MT.csv). No pré-processamento, cada
+# descritor da matriz do CNCA é ligado às habilidades do DCRC mais próximas do
+# mesmo componente e ano (df_correspondencias_dcrc.csv). O app e o prompt da IA
+# consultam essa tabela por chave, sem calcular similaridades a cada pedido.
+#
+# O índice é gerado uma vez (python dcrc.py ou no primeiro uso), gravado em
+# armazem/dcrc_indice.json e carregado uma vez por processo. É refeito
+# automaticamente quando os arquivos do DCRC mudam.
+#
+# Uso:
+#   python dcrc.py                                   # (re)cria o índice se o DCRC mudou
+#   python dcrc.py --buscar "identificar rimas" --componente "LÍNGUA PORTUGUESA" --ano 2
+
+import argparse
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+from dados import PASTA_ARMAZEM, carregar_dados
+
+# Arquivos do DCRC por componente curricular
+ARQUIVOS_DCRC = {
+    "LÍNGUA PORTUGUESA": "DCRC_2019_OFICIAL fundamental LP.csv",
+    "MATEMÁTICA": "DCRC_2019_OFICIAL fundamental MT.csv",
+}
+
+ARQUIVO_INDICE = os.path.join(PASTA_ARMAZEM, "dcrc_indice.json")
+
+# Versão do índice (faz parte da chave do cache de análises)
+VERSAO_INDICE = "1"
+
+# Colunas equivalentes nos dois arquivos -> nome usado no índice
+COLUNAS = {
+    "ANO": "ano",
+    "HABILIDADES": "habilidade",
+    "OBJETOS DE CONHECIMENTO": "objeto",
+    "OBJETOS ESPECÍFICOS": "objetos_especificos",
+    "RELAÇÃO DENTRO DO PRÓPRIO COMPONENTE": "relacao",
+    "RELAÇÃO INTRACOMPONENTE": "relacao",
+}
+
+# Campos usados na busca
+CAMPOS_BUSCA = ["habilidade", "objeto", "objetos_especificos"]
+
+# Parâmetros do BM25
+K1 = 1.5
+B = 0.75
+
+# Linhas devolvidas por padrão
+TOP_K = 5
+
+# Tamanho máximo dos objetos específicos de cada linha no prompt
+TAMANHO_OBJETOS = 200
+
+# Correspondência CNCA -> DCRC gerada no pré-processamento
+ARQUIVO_CORRESPONDENCIAS = "df_correspondencias_dcrc.csv"
+COLUNAS_CORRESPONDENCIAS = ["Etapa", "Componente Curricular", "Descritor", "Posição",
+                            "Código DCRC", "Habilidade DCRC", "Similaridade"]
+
+# Habilidades do DCRC guardadas por descritor
+CORRESPONDENCIAS_POR_DESCRITOR = 3
+
+# Código no início da habilidade: "(EF01LP01) ..." ou "(CEEF01LP01) ..."
+PADRAO_CODIGO = re.compile(r"^\((\w+)\)\s*(.*)$")
+
+STOPWORDS = set("""
+a ao aos as com como da das de do dos e em entre essa esse esta este isso na nas no nos o os ou para pela pelas
+pelo pelos por que se sem sua suas seu seus um uma umas uns ate mais quando meio sobre tambem ja nao sao
+""".split())
+
+
+def _texto_limpo(texto):
+    """ Junta palavras hifenizadas na quebra de linha do PDF ("compar- tilhada") """
+    if pd.isna(texto):
+        return ""
+    texto = re.sub(r"(\w)- (\w)", r"\1\2", str(texto))
+    return " ".join(texto.split())
+
+
+def termos(texto):
+    """ Palavras sem acento, em minúsculas, sem stopwords e com um radical simples """
+    sem_acento = unicodedata.normalize("NFKD", texto.lower()).encode("ascii", "ignore").decode()
+    resultado = []
+    for palavra in re.findall(r"[a-z0-9]+", sem_acento):
+        if len(palavra) < 3 or palavra in STOPWORDS:
+            continue
+        # Radical: corta flexões frequentes (plural e gênero) e limita o tamanho
+        palavra = re.sub(r"(oes|aes|es|s)$", "", palavra) if len(palavra) > 4 else palavra
+        resultado.append(palavra[:8])
+    return resultado
+
+
+def _anos(valor):
+    """ Anos cobertos pela linha ("1º; 2º; 3º" -> [1, 2, 3]) """
+    return sorted({int(ano) for ano in re.findall(r"(\d)\s*º", str(valor))})
+
+
+#-------------------
+# CONSTRUÇÃO
+#-------------------
+
+def _origens():
+    return {componente: [os.stat(arquivo).st_size, os.stat(arquivo).st_mtime_ns]
+            for componente, arquivo in ARQUIVOS_DCRC.items() if os.path.exists(arquivo)}
+
+
+def ler_documentos():
+    """ Linhas do DCRC dos dois componentes, com os campos do índice """
+    documentos = []
+    for componente, arquivo in ARQUIVOS_DCRC.items():
+        if not os.path.exists(arquivo):
+            continue
+        df = pd.read_csv(arquivo, sep=';', encoding='utf-8', dtype=str)
+        df = df[[c for c in df.columns if c in COLUNAS]].rename(columns=COLUNAS)
+        for linha in df.to_dict(orient="records"):
+            if pd.isna(linha.get("habilidade")):
+                continue
+            documento = {campo: _texto_limpo(linha.get(campo)) for campo in set(COLUNAS.values())}
+            documento["componente"] = componente
+            documento["anos"] = _anos(linha.get("ano"))
+            documentos.append(documento)
+    return documentos
+
+
+def construir_indice(destino=ARQUIVO_INDICE):
+    """ Cria o índice BM25 e grava em JSON (substituição atômica) """
+    documentos = ler_documentos()
+    postings = defaultdict(list)
+    tamanhos = []
+    for posicao, documento in enumerate(documentos):
+        contagem = Counter(termos(" ".join(documento[campo] for campo in CAMPOS_BUSCA)))
+        tamanhos.append(sum(contagem.values()))
+        for termo, frequencia in contagem.items():
+            postings[termo].append([posicao, frequencia])
+
+    indice = {
+        "versao": VERSAO_INDICE,
+        "origens": _origens(),
+        "documentos": documentos,
+        "tamanhos": tamanhos,
+        "postings": postings,
+    }
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(indice, f, ensure_ascii=False)
+    os.replace(temporario, destino)
+    return indice
+
+
+#-------------------
+# CONSULTA
+#-------------------
+
+class Indice:
+    """ Índice carregado em memória """
+
+    def __init__(self, dados):
+        self.documentos = dados["documentos"]
+        self.tamanhos = dados["tamanhos"]
+        self.postings = dados["postings"]
+        self.por_codigo = {}
+        for documento in self.documentos:
+            codigo, _ = separar_codigo(documento["habilidade"])
+            self.por_codigo.setdefault(codigo, documento)
+        total = len(self.documentos)
+        self.media = sum(self.tamanhos) / total if total else 0.0
+        self.idf = {termo: math.log(1 + (total - len(lista) + 0.5) / (len(lista) + 0.5))
+                    for termo, lista in self.postings.items()}
+
+    def buscar(self, consulta, componente=None, ano=None, k=TOP_K):
+        """ As k linhas mais relevantes: lista de (pontuação, documento) """
+        pontuacao = defaultdict(float)
+        for termo in set(termos(consulta)):
+            idf = self.idf.get(termo)
+            if idf is None:
+                continue
+            for posicao, frequencia in self.postings[termo]:
+                documento = self.documentos[posicao]
+                if componente and documento["componente"] != componente:
+                    continue
+                if ano and ano not in documento["anos"]:
+                    continue
+                normalizacao = K1 * (1 - B + B * self.tamanhos[posicao] / self.media)
+                pontuacao[posicao] += idf * frequencia * (K1 + 1) / (frequencia + normalizacao)
+        melhores = sorted(pontuacao.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(valor, self.documentos[posicao]) for posicao, valor in melhores]
+
+
+_carregados = {}
+_trava = threading.Lock()
+
+
+def carregar_indice(destino=ARQUIVO_INDICE):
+    """ Índice do processo, refeito se os arquivos do DCRC mudaram """
+    origens = _origens()
+    entrada = _carregados.get(destino)
+    if entrada is not None and entrada[0] == origens:
+        return entrada[1]
+    with _trava:
+        entrada = _carregados.get(destino)
+        if entrada is None or entrada[0] != origens:
+            dados = None
+            if os.path.exists(destino):
+                with open(destino, encoding="utf-8") as f:
+                    dados = json.load(f)
+                if dados.get("versao") != VERSAO_INDICE or dados.get("origens") != origens:
+                    dados = None
+            if dados is None:
+                dados = construir_indice(destino)
+            entrada = _carregados[destino] = (origens, Indice(dados))
+    return entrada[1]
+
+
+def ano_da_etapa(etapa):
+    """ "2 ANO" -> 2 """
+    encontrado = re.match(r"\s*(\d)", str(etapa))
+    return int(encontrado.group(1)) if encontrado else None
+
+
+def _resumir(texto, limite):
+    return texto if len(texto) <= limite else texto[:limite - 1].rstrip() + "…"
+
+
+def descrever(codigos):
+    """ Texto com as linhas do DCRC dos códigos informados (habilidade, objetos e relacionadas) """
+    indice = carregar_indice()
+    linhas = []
+    for codigo in codigos:
+        documento = indice.por_codigo.get(codigo)
+        if documento is None:
+            continue
+        linha = f"- {documento['habilidade']}"
+        if documento["objetos_especificos"]:
+            linha += f" | Objetos específicos: {_resumir(documento['objetos_especificos'], TAMANHO_OBJETOS)}"
+        if documento["relacao"]:
+            linha += f" | Relacionadas: {documento['relacao']}"
+        linhas.append(linha)
+    return "\n".join(linhas)
+
+
+#-------------------
+# CORRESPONDÊNCIA CNCA -> DCRC (pré-processamento)
+#-------------------
+
+def separar_codigo(habilidade):
+    """ "(EF01LP01) Reconhecer ..." -> ("EF01LP01", "Reconhecer ...") """
+    encontrado = PADRAO_CODIGO.match(habilidade)
+    if encontrado is None:
+        return None, habilidade
+    return encontrado.group(1), encontrado.group(2)
+
+
+def construir_correspondencias(matriz, k=CORRESPONDENCIAS_POR_DESCRITOR):
+    """ Para cada descritor da matriz do CNCA, as k habilidades do DCRC mais próximas no mesmo componente e ano """
+    indice = carregar_indice()
+    descritores = (
+        matriz.dropna(subset=["Descritor", "Descrição da Habilidade "])
+        .drop_duplicates(subset=["Etapa", "Componente Curricular", "Descritor"])
+    )
+    linhas = []
+    for etapa, componente, descritor, descricao in descritores[
+        ["Etapa", "Componente Curricular", "Descritor", "Descrição da Habilidade "]
+    ].itertuples(index=False):
+        resultados = indice.buscar(descricao, componente, ano_da_etapa(etapa), k)
+        for posicao, (pontuacao, documento) in enumerate(resultados, start=1):
+            codigo, texto = separar_codigo(documento["habilidade"])
+            linhas.append([etapa, componente, descritor, posicao, codigo, texto, round(pontuacao, 2)])
+    correspondencias = pd.DataFrame(linhas, columns=COLUNAS_CORRESPONDENCIAS)
+    return correspondencias.sort_values(["Etapa", "Componente Curricular", "Descritor", "Posição"], ignore_index=True)
+
+
+#-------------------
+# CONSULTA DA CORRESPONDÊNCIA (app e prompt)
+#-------------------
+
+_correspondencias = {}
+
+
+def consultar_correspondencias(etapa, componente, caminho=ARQUIVO_CORRESPONDENCIAS):
+    """ Correspondências dos descritores de uma etapa e componente (vazia se não houver) """
+    if not os.path.exists(caminho):
+        return pd.DataFrame(columns=COLUNAS_CORRESPONDENCIAS)
+    df = carregar_dados(caminho)
+    entrada = _correspondencias.get(caminho)
+    if entrada is None or entrada[0] is not df:
+        grupos = {chave: grupo.reset_index(drop=True)
+                  for chave, grupo in df.groupby(["Etapa", "Componente Curricular"], observed=True)}
+        entrada = _correspondencias[caminho] = (df, grupos)
+    grupo = entrada[1].get((etapa, componente))
+    return df.iloc[0:0] if grupo is None else grupo
+
+
+def codigos_por_descritor(etapa, componente, posicoes=CORRESPONDENCIAS_POR_DESCRITOR):
+    """ {descritor: [códigos DCRC em ordem de similaridade]} """
+    correspondencias = consultar_correspondencias(etapa, componente)
+    correspondencias = correspondencias[correspondencias["Posição"] <= posicoes]
+    return {str(descritor): [str(codigo) for codigo in grupo["Código DCRC"].dropna()]
+            for descritor, grupo in correspondencias.groupby("Descritor", observed=True)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Índice de busca no DCRC")
+    parser.add_argument("--buscar", help="texto a buscar")
+    parser.add_argument("--componente", choices=list(ARQUIVOS_DCRC))
+    parser.add_argument("--ano", type=int)
+    parser.add_argument("-k", type=int, default=TOP_K)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    indice = carregar_indice()
+    print(f"Índice com {len(indice.documentos)} linhas pronto em {time.perf_counter() - inicio:.2f}s: {ARQUIVO_INDICE}")
+    if args.buscar:
+        inicio = time.perf_counter()
+        resultados = indice.buscar(args.buscar, args.componente, args.ano, args.k)
+        print(f"Busca em {1000 * (time.perf_counter() - inicio):.1f} ms")
+        for pontuacao, documento in resultados:
+            print(f"{pontuacao:6.2f}  [{documento['componente']} {documento['anos']}] {documento['habilidade']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#-------------------
+# BASE INDEXADA DOS RESULTADOS POR ESCOLA
+#-------------------
+
+# Converte as exportações HABILIDADES_DESEMPENHO_ESCOLA em uma base SQLite com
+# índices por município, etapa, componente e escola. O app consulta uma escola
+# por chave, sem carregar nem filtrar todas as escolas a cada interação.
+#
+# Uso:
+#   python escolas.py            # (re)cria a base se as exportações mudaram
+#   python escolas.py --forcar   # recria a base
+
+import argparse
+import glob
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from agregados import CODIGOS_MUNICIPIOS
+from etl import ETAPAS, PASTA_ARMAZEM
+
+# Exportações por escola
+PADRAO_ESCOLAS = "HABILIDADES_DESEMPENHO_ESCOLA *.csv"
+
+# Edição do CNCA a que as exportações se referem
+EDICAO = 2024
+
+# Base gerada
+ARQUIVO_BASE = os.path.join(PASTA_ARMAZEM, "escolas.sqlite")
+
+# Siglas dos componentes nas exportações
+COMPONENTES = {"LP": "LÍNGUA PORTUGUESA", "LPL": "LÍNGUA PORTUGUESA", "MT": "MATEMÁTICA", "MAT": "MATEMÁTICA"}
+
+# Colunas da exportação -> colunas da base
+COLUNAS = {
+    "Rede": "rede",
+    "Etapa": "etapa",
+    "Componente Curricular": "componente",
+    "Código do Município": "codigo_municipio",
+    "Escola": "escola",
+    "Previstos": "previstos",
+    "Avaliados": "avaliados",
+    "Avaliados (%)": "participacao",
+    "Proficiência Média": "proficiencia_media",
+    "Não alfabetizado": "nao_alfabetizado",
+    "Alfabetização incompleta": "alfabetizacao_incompleta",
+    "Intermediário": "intermediario",
+    "Suficiente": "suficiente",
+    "Desejável": "desejavel",
+}
+
+# Padrões de desempenho, na ordem de exibição
+NIVEIS = {
+    "nao_alfabetizado": "Não alfabetizado",
+    "alfabetizacao_incompleta": "Alfabetização incompleta",
+    "intermediario": "Intermediário",
+    "suficiente": "Suficiente",
+    "desejavel": "Desejável",
+}
+
+ESQUEMA = """
+CREATE TABLE escolas (
+    id INTEGER PRIMARY KEY,
+    municipio TEXT,
+    codigo_municipio TEXT,
+    etapa TEXT,
+    componente TEXT,
+    escola TEXT,
+    rede TEXT,
+    previstos INTEGER,
+    avaliados INTEGER,
+    participacao REAL,
+    proficiencia_media REAL,
+    nao_alfabetizado REAL,
+    alfabetizacao_incompleta REAL,
+    intermediario REAL,
+    suficiente REAL,
+    desejavel REAL
+);
+CREATE INDEX idx_escolas_municipio ON escolas (municipio, etapa, componente, escola);
+CREATE INDEX idx_escolas_codigo ON escolas (codigo_municipio, etapa, componente, escola);
+CREATE TABLE habilidades_escola (
+    id_escola INTEGER,
+    habilidade TEXT,
+    percentual REAL,
+    PRIMARY KEY (id_escola, habilidade)
+) WITHOUT ROWID;
+CREATE TABLE origem (arquivo TEXT PRIMARY KEY, tamanho INTEGER, mtime_ns INTEGER);
+"""
+
+
+#-------------------
+# CONSTRUÇÃO DA BASE
+#-------------------
+
+def _numero(serie):
+    """ Converte '97%', '107', '-' em número (vazio quando não houver valor) """
+    return pd.to_numeric(serie.str.replace('%', '', regex=False).str.strip(), errors='coerce')
+
+
+def _origens(padrao=PADRAO_ESCOLAS):
+    """ Exportações encontradas, com tamanho e data de modificação """
+    return [(caminho, os.stat(caminho).st_size, os.stat(caminho).st_mtime_ns) for caminho in sorted(glob.glob(padrao))]
+
+
+def ler_exportacoes(caminhos):
+    """ Lê e normaliza as exportações; em escolas repetidas vale o último arquivo """
+    tabelas = [pd.read_csv(caminho, sep=';', encoding='utf-8-sig', dtype=str) for caminho in caminhos]
+    df = pd.concat(tabelas, ignore_index=True)
+
+    for coluna in ["Rede", "Etapa", "Componente Curricular", "Código do Município", "Escola"]:
+        df[coluna] = df[coluna].str.strip()
+    df["Etapa"] = df["Etapa"].replace(ETAPAS)
+    df["Componente Curricular"] = df["Componente Curricular"].replace(COMPONENTES)
+    df = df.drop_duplicates(subset=["Código do Município", "Etapa", "Componente Curricular", "Escola"], keep="last")
+
+    escolas = df[list(COLUNAS)].rename(columns=COLUNAS)
+    for coluna in list(COLUNAS.values())[5:]:
+        escolas[coluna] = _numero(escolas[coluna])
+    escolas.insert(0, "municipio", escolas["codigo_municipio"].map(CODIGOS_MUNICIPIOS))
+    escolas.insert(0, "id", range(1, len(escolas) + 1))
+
+    colunas_h = [c for c in df.columns if c.startswith("H ")]
+    habilidades = df[colunas_h].set_axis(escolas["id"]).rename(columns=lambda c: c.replace(" (%)", ""))
+    habilidades = habilidades.apply(_numero).rename_axis("id_escola").reset_index()
+    habilidades = habilidades.melt(id_vars="id_escola", var_name="habilidade", value_name="percentual")
+    return escolas, habilidades.dropna(subset=["percentual"])
+
+
+def construir_base(destino=ARQUIVO_BASE, padrao=PADRAO_ESCOLAS):
+    """ Cria a base SQLite a partir das exportações (substituição atômica) """
+    origens = _origens(padrao)
+    escolas, habilidades = ler_exportacoes([caminho for caminho, *_ in origens])
+
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    with sqlite3.connect(temporario) as conexao:
+        conexao.executescript(ESQUEMA)
+        escolas.to_sql("escolas", conexao, if_exists="append", index=False)
+        habilidades.to_sql("habilidades_escola", conexao, if_exists="append", index=False)
+        conexao.executemany("INSERT INTO origem VALUES (?, ?, ?)", origens)
+    os.replace(temporario, destino)
+    return len(escolas)
+
+
+def _base_atualizada(destino, origens):
+    """ Verifica se a base foi gerada a partir das mesmas exportações """
+    if not os.path.exists(destino):
+        return False
+    with sqlite3.connect(f"file:{destino}?mode=ro", uri=True) as conexao:
+        registradas = conexao.execute("SELECT arquivo, tamanho, mtime_ns FROM origem ORDER BY arquivo").fetchall()
+    return registradas == [tuple(o) for o in origens]
+
+
+_verificada = {}
+_trava = threading.Lock()
+
+
+def garantir_base(destino=ARQUIVO_BASE, padrao=PADRAO_ESCOLAS):
+    """ Recria a base se as exportações mudaram (verificado uma vez por versão) """
+    origens = tuple(_origens(padrao))
+    if not origens:
+        return False
+    if _verificada.get(destino) == origens:
+        return True
+    with _trava:
+        if _verificada.get(destino) != origens:
+            if not _base_atualizada(destino, origens):
+                construir_base(destino, padrao)
+            _verificada[destino] = origens
+    return True
+
+
+#-------------------
+# CONSULTAS (app)
+#-------------------
+
+_local = threading.local()
+
+
+def _conexao(destino=ARQUIVO_BASE):
+    """ Conexão somente leitura por thread, refeita se a base for recriada """
+    versao = os.stat(destino).st_mtime_ns
+    conexoes = getattr(_local, "conexoes", None)
+    if conexoes is None:
+        conexoes = _local.conexoes = {}
+    atual = conexoes.get(destino)
+    if atual is None or atual[0] != versao:
+        if atual is not None:
+            atual[1].close()
+        conexao = sqlite3.connect(f"file:{destino}?mode=ro", uri=True, check_same_thread=False)
+        conexao.row_factory = sqlite3.Row
+        atual = conexoes[destino] = (versao, conexao)
+    return atual[1]
+
+
+def listar_escolas(municipio, etapa, componente, destino=ARQUIVO_BASE):
+    """ Escolas do município com resultado na etapa e componente """
+    if not garantir_base(destino):
+        return []
+    linhas = _conexao(destino).execute(
+        "SELECT escola FROM escolas WHERE municipio = ? AND etapa = ? AND componente = ? ORDER BY escola",
+        (municipio, etapa, componente),
+    ).fetchall()
+    return [linha["escola"] for linha in linhas]
+
+
+def consultar_escola(municipio, etapa, componente, escola, destino=ARQUIVO_BASE):
+    """ Resultado da escola: (dicionário com os indicadores, DataFrame das habilidades) """
+    if not garantir_base(destino):
+        return None, None
+    conexao = _conexao(destino)
+    resumo = conexao.execute(
+        "SELECT * FROM escolas WHERE municipio = ? AND etapa = ? AND componente = ? AND escola = ?",
+        (municipio, etapa, componente, escola),
+    ).fetchone()
+    if resumo is None:
+        return None, None
+    linhas = conexao.execute(
+        "SELECT habilidade, percentual FROM habilidades_escola WHERE id_escola = ? ORDER BY habilidade",
+        (resumo["id"],),
+    ).fetchall()
+    habilidades = pd.DataFrame([tuple(linha) for linha in linhas], columns=["Habilidades", "Percentual de acertos"])
+    return dict(resumo), habilidades
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Base indexada dos resultados por escola do CNCA")
+    parser.add_argument("--forcar", action="store_true", help="recria a base mesmo sem mudanças nas exportações")
+    args = parser.parse_args(argv)
+    if args.forcar:
+        print(f"{construir_base()} escolas gravadas em {ARQUIVO_BASE}")
+    elif garantir_base():
+        print(f"Base atualizada: {ARQUIVO_BASE}")
+    else:
+        print("Nenhuma exportação por escola encontrada.")
+
+
+if __name__ == "__main__":
+    main()
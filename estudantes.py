@@ -0,0 +1,170 @@
+#-------------------
+# INGESTÃO DOS RESULTADOS POR ESTUDANTE (EM BLOCOS)
+#-------------------
+
+# Lê as exportações HABILIDADES_DESEMPENHO_ESTUDANTE em blocos de tamanho fixo,
+# separa as células "acertos / total" de cada habilidade em duas colunas
+# inteiras e acumula os totais por turma, escola e município. A memória usada
+# depende do número de turmas, não do número de estudantes do arquivo.
+#
+# Os nomes dos estudantes não são lidos nem gravados.
+#
+# Uso:
+#   python estudantes.py                                # arquivos HABILIDADES_DESEMPENHO_ESTUDANTE *.csv
+#   python estudantes.py exportacao.csv --bloco 50000   # arquivos e tamanho de bloco escolhidos
+
+import argparse
+import glob
+import os
+import shutil
+import time
+
+import pandas as pd
+
+from escolas import COMPONENTES
+from etl import ETAPAS, PASTA_ARMAZEM, gravar_particionado
+
+# Arquivos exportados pelo sistema de avaliação
+PADRAO_ESTUDANTES = "HABILIDADES_DESEMPENHO_ESTUDANTE *.csv"
+
+# Saída: um conjunto Parquet por nível de agregação
+PASTA_ESTUDANTES = os.path.join(PASTA_ARMAZEM, "estudantes")
+
+# Linhas lidas por vez
+TAMANHO_BLOCO = 100_000
+
+# Colunas que identificam o grupo em todos os níveis
+COLUNAS_COMUNS = ["Rede", "Etapa", "Componente Curricular"]
+
+# Hierarquia das unidades (da maior para a menor)
+HIERARQUIA = ["Código do Município", "Escola", "Código da Turma"]
+
+# Coluna que define cada nível; um nível só é gerado se o arquivo tiver a coluna
+NIVEIS = {
+    "turma": "Código da Turma",
+    "escola": "Escola",
+    "municipio": "Código do Município",
+}
+
+# Partições do conjunto Parquet
+COLUNAS_PARTICAO = ["Etapa", "Componente Curricular"]
+
+# Célula de habilidade: " 2 / 2" (acertos / total) ou " -" (não respondeu)
+PADRAO_CELULA = r"^\s*(\d+)\s*/\s*(\d+)\s*$"
+
+
+def _colunas(caminho):
+    """ Cabeçalho do arquivo (sem o BOM) """
+    return list(pd.read_csv(caminho, sep=';', encoding='utf-8-sig', nrows=0).columns)
+
+
+def ler_em_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    """ Gera blocos do arquivo já convertidos para o formato longo.
+
+    Cada bloco tem uma linha por (estudante, habilidade) respondida, com as
+    colunas de identificação do grupo, 'Habilidades', 'Acertos' e 'Total'.
+    """
+    colunas = _colunas(caminho)
+    habilidades = [c for c in colunas if c.startswith("H ")]
+    chaves = [c for c in COLUNAS_COMUNS + HIERARQUIA if c in colunas]
+
+    blocos = pd.read_csv(caminho, sep=';', encoding='utf-8-sig', dtype=str,
+                         usecols=chaves + habilidades, chunksize=tamanho_bloco)
+    for bloco in blocos:
+        for coluna in chaves:
+            bloco[coluna] = bloco[coluna].str.strip()
+        # Mesmos nomes de etapa e componente do cubo e da base de escolas
+        bloco["Etapa"] = bloco["Etapa"].replace(ETAPAS)
+        bloco["Componente Curricular"] = bloco["Componente Curricular"].replace(COMPONENTES)
+
+        longo = bloco.melt(id_vars=chaves, value_vars=habilidades,
+                           var_name="Habilidades", value_name="Célula")
+        partes = longo["Célula"].str.extract(PADRAO_CELULA)
+        longo["Acertos"] = pd.to_numeric(partes[0], downcast="integer")
+        longo["Total"] = pd.to_numeric(partes[1], downcast="integer")
+        yield longo.dropna(subset=["Total"]).drop(columns="Célula")
+
+
+def _somar(df, chaves):
+    """ Soma acertos e totais e conta respondentes por chave """
+    return df.groupby(chaves, dropna=False, observed=True).agg(
+        Acertos=("Acertos", "sum"),
+        Total=("Total", "sum"),
+        Respondentes=("Total", "size"),
+    )
+
+
+def agregar(caminhos, tamanho_bloco=TAMANHO_BLOCO, informar=print):
+    """ Agrega os arquivos bloco a bloco no nível mais detalhado disponível """
+    acumulado = None
+    chaves = None
+    for caminho in caminhos:
+        inicio = time.perf_counter()
+        linhas = 0
+        for bloco in ler_em_blocos(caminho, tamanho_bloco):
+            chaves_bloco = [c for c in bloco.columns if c not in ("Habilidades", "Acertos", "Total")] + ["Habilidades"]
+            if chaves is None:
+                chaves = chaves_bloco
+            elif chaves != chaves_bloco:
+                raise ValueError(f"{caminho}: colunas diferentes dos arquivos anteriores")
+
+            parcial = _somar(bloco, chaves)
+            # Os totais são somas: cada bloco pode ser combinado ao acumulado
+            acumulado = parcial if acumulado is None else acumulado.add(parcial, fill_value=0)
+            linhas += len(bloco)
+        informar(f"{os.path.basename(caminho)}: {linhas} respostas em {time.perf_counter() - inicio:.2f}s")
+
+    if acumulado is None:
+        return None
+    return acumulado.astype("int64").reset_index()
+
+
+def niveis(agregado):
+    """ Tabelas por nível (turma, escola, município) a partir do agregado mais detalhado """
+    tabelas = {}
+    for nivel, coluna in NIVEIS.items():
+        if coluna not in agregado.columns:
+            continue
+        # O nível inclui as unidades acima dele (ex.: a escola dentro do município)
+        unidades = HIERARQUIA[:HIERARQUIA.index(coluna) + 1]
+        chaves = [c for c in COLUNAS_COMUNS + unidades if c in agregado.columns] + ["Habilidades"]
+        tabela = agregado.groupby(chaves, dropna=False)[["Acertos", "Total", "Respondentes"]].sum().reset_index()
+        tabela["Percentual de acertos"] = (100 * tabela["Acertos"] / tabela["Total"]).round(1)
+        tabelas[nivel] = tabela
+    return tabelas
+
+
+def gravar(tabelas, destino=PASTA_ESTUDANTES):
+    """ Grava cada nível como conjunto Parquet particionado por Etapa e Componente """
+    for nivel, tabela in tabelas.items():
+        pasta = os.path.join(destino, nivel)
+        if os.path.exists(pasta):
+            shutil.rmtree(pasta)
+        gravar_particionado(tabela, pasta, COLUNAS_PARTICAO)
+
+
+def executar(caminhos=None, tamanho_bloco=TAMANHO_BLOCO, destino=PASTA_ESTUDANTES, informar=print):
+    """ Lê as exportações por estudante e grava os agregados """
+    caminhos = caminhos or sorted(glob.glob(PADRAO_ESTUDANTES))
+    agregado = agregar(caminhos, tamanho_bloco, informar)
+    if agregado is None:
+        informar("Nenhum arquivo de estudantes encontrado.")
+        return {}
+    tabelas = niveis(agregado)
+    gravar(tabelas, destino)
+    for nivel, tabela in tabelas.items():
+        informar(f"Nível {nivel}: {len(tabela)} linhas gravadas em {os.path.join(destino, nivel)}")
+    return tabelas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agregação dos resultados por estudante do CNCA")
+    parser.add_argument("arquivos", nargs="*", help=f"arquivos a processar (padrão: {PADRAO_ESTUDANTES})")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO, help="linhas lidas por vez")
+    parser.add_argument("--destino", default=PASTA_ESTUDANTES, help="pasta de saída")
+    args = parser.parse_args(argv)
+    executar(args.arquivos, args.bloco, args.destino)
+
+
+if __name__ == "__main__":
+    main()
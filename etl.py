@@ -0,0 +1,464 @@
+#-------------------
+# PRÉ-PROCESSAMENTO (ETL INCREMENTAL)
+#-------------------
+
+# Versão em módulo do pre_processamento.ipynb. Cada arquivo de DadosBrutos vira
+# uma partição (edição, ciclo, ano, componente) guardada em Parquet no armazém;
+# um manifesto com a impressão digital de cada arquivo permite reprocessar só o
+# que mudou. Ao final, df_final.csv e o cubo de agregados (particionado por
+# edição, componente e ciclo) são remontados a partir das partições.
+#
+# Uso:
+#   python etl.py                      # processa apenas arquivos novos ou alterados
+#   python etl.py --forcar             # reprocessa tudo
+#   python etl.py --intermediarios     # também gera df.csv, df1.csv e df2.csv
+#   python etl.py --processos 4        # lê os arquivos em paralelo
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from agregados import (COLUNA_ESCOPO, COLUNAS_PARTICAO, EDICAO, MUNICIPIOS_CREDE, PASTA_DIMENSAO_HABILIDADES,
+                       PASTA_HABILIDADES, PASTA_INDICADORES, construir_cubo, dimensao_habilidades, fato_habilidades)
+from dados import PASTA_ARMAZEM, esquecer_assinaturas, tipar
+from dcrc import ARQUIVO_CORRESPONDENCIAS, ARQUIVOS_DCRC, construir_correspondencias
+
+# Entradas
+PASTA_BRUTOS = "DadosBrutos"
+ARQUIVO_MATRIZ = "Matriz_Referencia_CNCA.csv"
+
+# Saídas
+ARQUIVO_MANIFESTO = os.path.join(PASTA_ARMAZEM, "manifesto.json")
+ARQUIVO_FINAL = "df_final.csv"
+
+# Padrão dos arquivos brutos: CNCA[{edição}]_CICLO{c}_{a}ANO_{LPL|MT}.csv
+# (ex.: CNCA2025_CICLO1_2ANO_MT.csv); sem o ano, o arquivo é da edição 2024
+PADRAO_GLOB = "CNCA*_CICLO*_*ANO_*.csv"
+PADRAO_ARQUIVO = re.compile(r"CNCA(\d{4})?_CICLO(\d+)_(\d+)ANO_(LPL|MT)\.csv$")
+EDICAO_PADRAO = 2024
+
+# Nome das colunas de habilidade após remover ' (%)': 'H 01', 'H 02', ...
+PADRAO_HABILIDADE = r"H \d+$"
+
+# Ordem dos componentes no processamento original
+COMPONENTES = ["LPL", "MT"]
+
+# Substituir descrições longas dos anos por versões mais curtas
+ETAPAS = {f"ENSINO FUNDAMENTAL DE 9 ANOS - {ano}º ANO": f"{ano} ANO" for ano in range(1, 6)}
+
+COLUNAS_ID = ['Município', 'Componente Curricular', 'Etapa', 'Previstos', 'Avaliados', '% Participação',
+              'Defasagem', 'Aprendizado intermediário', 'Aprendizado adequado', 'Acerto Total', 'Ciclos']
+
+CHAVES_MERGE = ['Etapa', 'Componente Curricular', 'Ciclos', 'Habilidades']
+
+# Tipos das colunas dos arquivos brutos (as colunas 'H xx (%)' são float)
+TIPOS_BRUTOS = {
+    'Município': str,
+    'Componente Curricular': str,
+    'Etapa': str,
+    'Previstos': 'Int64',
+    'Avaliados': 'Int64',
+    '% Participação': str,
+    'Defasagem': str,
+    'Aprendizado intermediário': str,
+    'Aprendizado adequado': str,
+    'Acerto Total': str,
+}
+
+
+#-------------------
+# IMPRESSÃO DIGITAL DOS ARQUIVOS
+#-------------------
+
+def hash_arquivo(caminho):
+    """ Hash SHA-256 do conteúdo do arquivo """
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def impressao_digital(caminho, anterior=None):
+    """ Tamanho, data de modificação e hash do arquivo.
+
+    Se tamanho e data forem iguais aos da impressão anterior, o hash não é
+    recalculado.
+    """
+    info = os.stat(caminho)
+    digital = {"tamanho": info.st_size, "mtime_ns": info.st_mtime_ns}
+    if anterior and all(anterior.get(k) == v for k, v in digital.items()):
+        digital["sha256"] = anterior["sha256"]
+    else:
+        digital["sha256"] = hash_arquivo(caminho)
+    return digital
+
+
+def ler_manifesto():
+    """ Manifesto do armazém (vazio se ainda não existir) """
+    if not os.path.exists(ARQUIVO_MANIFESTO):
+        return {"matriz": None, "arquivos": {}}
+    with open(ARQUIVO_MANIFESTO, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def salvar_manifesto(manifesto):
+    """ Grava o manifesto de forma atômica """
+    os.makedirs(PASTA_ARMAZEM, exist_ok=True)
+    temporario = ARQUIVO_MANIFESTO + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temporario, ARQUIVO_MANIFESTO)
+
+
+#-------------------
+# TRANSFORMAÇÕES
+#-------------------
+
+def carregar_matriz(caminho=ARQUIVO_MATRIZ):
+    """ Matriz de referência em formato longo (um registro por habilidade, ciclo e ano da edição) """
+    df1 = pd.read_csv(caminho)
+
+    # Transformar o dataframe para um formato longo
+    df1_longo = pd.melt(df1,
+                        value_vars=['Ciclo 1', 'Ciclo 2', 'Ciclo 3'],
+                        id_vars=['Ano', 'Etapa', 'Componente Curricular', 'Descritor', 'Descrição da Habilidade '],
+                        var_name='Ciclos',
+                        value_name='Habilidades')
+
+    # Remover prefixo 'Ciclo ' e substituir abreviações pelos nomes completos dos componentes
+    df1_longo = df1_longo.replace('Ciclo ', '', regex=True)
+    df1_longo = df1_longo.replace('LPL', 'LÍNGUA PORTUGUESA', regex=True)
+    df1_longo = df1_longo.replace('MT', 'MATEMÁTICA', regex=True)
+    return df1_longo
+
+
+def matriz_da_edicao(matriz, edicao):
+    """ Linhas da matriz usadas na edição (sem a coluna Ano).
+
+    Uma edição sem matriz própria usa a da edição anterior mais recente (ou a
+    mais antiga, se nenhuma for anterior).
+    """
+    anos = sorted(matriz['Ano'].dropna().astype(int).unique())
+    anteriores = [ano for ano in anos if ano <= edicao]
+    ano = anteriores[-1] if anteriores else anos[0]
+    return matriz[matriz['Ano'] == ano].drop(columns='Ano').reset_index(drop=True)
+
+
+def descobrir_arquivos(pasta=PASTA_BRUTOS, padrao=PADRAO_GLOB):
+    """ Arquivos brutos da pasta, com (edição, ciclo, ano, componente), na ordem de processamento """
+    arquivos = []
+    for caminho in glob.glob(os.path.join(pasta, padrao)):
+        nome = os.path.basename(caminho)
+        encontrado = PADRAO_ARQUIVO.match(nome)
+        if encontrado:
+            edicao, ciclo, ano, componente = encontrado.groups()
+            edicao = int(edicao) if edicao else EDICAO_PADRAO
+            arquivos.append((edicao, int(ciclo), int(ano), componente, os.path.join(pasta, nome)))
+    return sorted(arquivos, key=lambda a: (a[0], a[1], a[2], COMPONENTES.index(a[3])))
+
+
+def ler_bruto(caminho, ciclo, ano, componente):
+    """ Lê um arquivo bruto com tipos explícitos e identifica sua partição """
+    colunas = pd.read_csv(caminho, sep=';', nrows=0).columns
+    tipos = {coluna: TIPOS_BRUTOS.get(coluna, 'float64') for coluna in colunas}
+    df = pd.read_csv(caminho, sep=';', dtype=tipos)
+    df['Ciclos'] = ciclo
+    df['Ano'] = ano
+    df['Componente'] = componente
+    return df
+
+
+def _preparar(df):
+    """ Filtra os municípios da CREDE e normaliza nomes de colunas e etapas """
+    df2 = df[df['Município'].isin(MUNICIPIOS_CREDE)]
+    df2 = df2.rename(columns=lambda x: x.replace(' (%)', '') if ' (%)' in x else x)
+    return df2.replace(ETAPAS)
+
+
+def _limpar(df):
+    """ Remove símbolos de porcentagem dos valores e dos nomes das colunas """
+    df = df.replace('%', '', regex=True)
+    return df.rename(columns=lambda x: x.replace('% ', '') if '% ' in x else x)
+
+
+def transformar(bruto, matriz):
+    """ Linhas do df_final correspondentes a uma partição bruta """
+    df2 = _preparar(bruto)
+
+    # Habilidades previstas na matriz para esta partição mas ausentes no arquivo
+    # aparecem como percentual vazio, como no processamento conjunto original
+    ciclo = str(bruto['Ciclos'].iloc[0]) if len(bruto) else None
+    matriz_particao = matriz[
+        matriz['Ciclos'].astype(str).eq(ciclo)
+        & matriz['Etapa'].isin(df2['Etapa'].unique())
+        & matriz['Componente Curricular'].isin(df2['Componente Curricular'].unique())
+    ]
+    colunas_h = [col for col in df2.columns if col.startswith('H')]
+    previstas = matriz_particao['Habilidades'].dropna()
+    faltantes = sorted(set(previstas[previstas.str.match(PADRAO_HABILIDADE)]) - set(colunas_h))
+    df2 = df2.assign(**{h: float('nan') for h in faltantes})
+
+    df2_longo = pd.melt(df2,
+                        value_vars=colunas_h + faltantes,
+                        id_vars=COLUNAS_ID,
+                        var_name='Habilidades',
+                        value_name='Percentual de acertos')
+    df2_longo['Ciclos'] = df2_longo['Ciclos'].astype(str)
+    df2_longo['Percentual de acertos'] = df2_longo['Percentual de acertos'].astype(float)
+    df2_longo[['Previstos', 'Avaliados']] = df2_longo[['Previstos', 'Avaliados']].astype(float)
+
+    final = pd.merge(matriz_particao.astype({'Ciclos': str}), df2_longo, on=CHAVES_MERGE, how='inner', sort=True)
+    final = final.dropna(subset=['Descritor'])
+    return _limpar(final)
+
+
+def intermediarios(brutos, matriz):
+    """ df.csv, df1.csv e df2.csv do processamento original (saídas de conferência) """
+    df_concat = pd.concat(brutos, ignore_index=True)
+    df2 = _preparar(df_concat)
+    colunas_h = [col for col in df2.columns if col.startswith('H')]
+    df2_longo = pd.melt(df2,
+                        value_vars=colunas_h,
+                        id_vars=COLUNAS_ID,
+                        var_name='Habilidades',
+                        value_name='Percentual de acertos')
+    return {"df.csv": df_concat, "df1.csv": matriz, "df2.csv": df2_longo}
+
+
+#-------------------
+# ARMAZÉM DE PARTIÇÕES
+#-------------------
+
+def _caminho_particao(camada, nome):
+    return os.path.join(PASTA_ARMAZEM, camada, os.path.splitext(nome)[0] + ".parquet")
+
+
+def _gravar_parquet(df, caminho, grupos_linhas=None):
+    """ Grava df em Parquet; com 'grupos_linhas', cada valor dessa coluna fica em um grupo de linhas próprio """
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = caminho + ".tmp"
+    if grupos_linhas is None:
+        df.to_parquet(temporario, index=False)
+    else:
+        esquema = pa.Schema.from_pandas(df, preserve_index=False)
+        with pq.ParquetWriter(temporario, esquema) as escritor:
+            for _, grupo in df.groupby(grupos_linhas, observed=True, sort=True):
+                escritor.write_table(pa.Table.from_pandas(grupo, schema=esquema, preserve_index=False))
+    os.replace(temporario, caminho)
+
+
+def gravar_particionado(df, pasta, colunas, grupos_linhas=None):
+    """ Grava df como conjunto Parquet particionado no estilo coluna=valor.
+
+    Cada partição é um único arquivo, lido de volta com pd.read_parquet(pasta)
+    (inclusive com filtros nas colunas de partição). Com 'grupos_linhas', as
+    linhas de cada valor dessa coluna ficam em um grupo de linhas próprio: uma
+    leitura filtrada por ela pula os grupos dos demais valores pelas
+    estatísticas do arquivo, sem decodificá-los.
+    """
+    for valores, grupo in df.groupby(colunas, observed=True, sort=True):
+        valores = valores if isinstance(valores, tuple) else (valores,)
+        partes = [f"{quote(coluna, safe='')}={quote(str(valor), safe='')}" for coluna, valor in zip(colunas, valores)]
+        _gravar_parquet(grupo.drop(columns=colunas), os.path.join(pasta, *partes, "parte-0.parquet"), grupos_linhas)
+
+
+def substituir_particionado(df, pasta, colunas, grupos_linhas=None):
+    """ Regrava por inteiro um conjunto particionado (partições que sumiram não ficam para trás) """
+    temporaria = pasta + ".tmp"
+    shutil.rmtree(temporaria, ignore_errors=True)
+    gravar_particionado(df, temporaria, colunas, grupos_linhas)
+    shutil.rmtree(pasta, ignore_errors=True)
+    os.replace(temporaria, pasta)
+
+
+def _ordem_final(particao):
+    """ Ordem das partições no df_final (por edição, na mesma ordenação do merge original) """
+    edicao, ciclo, ano, componente = particao
+    return (edicao, f"{ano} ANO", "LÍNGUA PORTUGUESA" if componente == "LPL" else "MATEMÁTICA", str(ciclo))
+
+
+def montar_saidas(particoes, matriz, destino_final=ARQUIVO_FINAL):
+    """ Concatena as partições finais e regrava df_final.csv, a dimensão de habilidades e o cubo de cada edição """
+    finais = [pd.read_parquet(_caminho_particao("final", nome)).assign(**{EDICAO: particao[0]})
+              for nome, particao in sorted(particoes.items(), key=lambda p: _ordem_final(p[1]))]
+    df_final = pd.concat(finais, ignore_index=True)
+    df_final.to_csv(destino_final, index=False, encoding="utf-8")
+
+    dimensao = dimensao_habilidades(matriz)
+    indicadores, habilidades = [], []
+    for edicao, df_edicao in tipar(df_final).groupby(EDICAO, sort=True):
+        df_indicadores, df_habilidades = construir_cubo(df_edicao.drop(columns=EDICAO))
+        indicadores.append(df_indicadores.assign(**{EDICAO: edicao}))
+        habilidades.append(fato_habilidades(df_habilidades, dimensao).assign(**{EDICAO: edicao}))
+    _gravar_parquet(dimensao, os.path.join(PASTA_DIMENSAO_HABILIDADES, "parte-0.parquet"))
+    # Um grupo de linhas por município: o app lê só as linhas do escopo da sessão (ver agregados.escopo)
+    substituir_particionado(pd.concat(indicadores, ignore_index=True), PASTA_INDICADORES, COLUNAS_PARTICAO,
+                            COLUNA_ESCOPO)
+    substituir_particionado(pd.concat(habilidades, ignore_index=True), PASTA_HABILIDADES, COLUNAS_PARTICAO,
+                            COLUNA_ESCOPO)
+    # Consultas seguintes neste processo veem o cubo novo sem esperar a validade das assinaturas
+    esquecer_assinaturas()
+    return df_final
+
+
+#-------------------
+# INGESTÃO (serial ou em paralelo)
+#-------------------
+
+_matriz_processo = None
+
+
+def _iniciar_processo(matriz):
+    """ Guarda a matriz em cada processo do pool (enviada uma única vez) """
+    global _matriz_processo
+    _matriz_processo = matriz
+
+
+def ingerir(tarefa, matriz=None):
+    """ Processa uma partição e grava as camadas bruta e final no armazém.
+
+    tarefa = (edição, ciclo, ano, componente, caminho, reler). Com reler=False
+    a partição bruta já gravada é reaproveitada (só a matriz mudou). Retorna
+    (nome, linhas lidas, linhas finais, segundos).
+    """
+    edicao, ciclo, ano, componente, caminho, reler = tarefa
+    matriz = _matriz_processo if matriz is None else matriz
+    inicio = time.perf_counter()
+    nome = os.path.basename(caminho)
+
+    if reler:
+        bruto = ler_bruto(caminho, ciclo, ano, componente)
+        _gravar_parquet(bruto, _caminho_particao("bruto", nome))
+    else:
+        bruto = pd.read_parquet(_caminho_particao("bruto", nome))
+
+    final = transformar(bruto, matriz_da_edicao(matriz, edicao))
+    _gravar_parquet(final, _caminho_particao("final", nome))
+    return nome, len(bruto), len(final), time.perf_counter() - inicio
+
+
+def ingerir_varios(tarefas, matriz, processos=1):
+    """ Executa as tarefas de ingestão, em paralelo se processos > 1.
+
+    A saída não depende do número de processos: cada partição é gravada em seu
+    próprio arquivo e a montagem final segue sempre a mesma ordem.
+    """
+    if processos <= 1 or len(tarefas) <= 1:
+        return [ingerir(tarefa, matriz) for tarefa in tarefas]
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo, initargs=(matriz,)) as pool:
+        return list(pool.map(ingerir, tarefas))
+
+
+def executar(pasta=PASTA_BRUTOS, forcar=False, gerar_intermediarios=False, processos=1,
+             padrao=PADRAO_GLOB, informar=print):
+    """ Processa os arquivos novos ou alterados e atualiza as saídas.
+
+    Retorna um dicionário com as listas de arquivos processados, mantidos e
+    removidos.
+    """
+    inicio = time.perf_counter()
+    manifesto = {"matriz": None, "arquivos": {}} if forcar else ler_manifesto()
+
+    # A matriz entra em todas as partições finais: se mudar, todas são refeitas
+    digital_matriz = impressao_digital(ARQUIVO_MATRIZ, manifesto.get("matriz"))
+    matriz_mudou = (manifesto.get("matriz") or {}).get("sha256") != digital_matriz["sha256"]
+    matriz = carregar_matriz()
+
+    arquivos = descobrir_arquivos(pasta, padrao)
+    atuais = {os.path.basename(caminho) for *_, caminho in arquivos}
+    relatorio = {"processados": [], "mantidos": [], "removidos": []}
+
+    tarefas = []
+    digitais = {}
+    for edicao, ciclo, ano, componente, caminho in arquivos:
+        nome = os.path.basename(caminho)
+        anterior = manifesto["arquivos"].get(nome)
+        digital = impressao_digital(caminho, anterior)
+        bruto_mudou = anterior is None or anterior["sha256"] != digital["sha256"] \
+            or not os.path.exists(_caminho_particao("bruto", nome))
+
+        if not bruto_mudou and not matriz_mudou and os.path.exists(_caminho_particao("final", nome)):
+            manifesto["arquivos"][nome].update(digital)
+            relatorio["mantidos"].append(nome)
+            continue
+
+        digitais[nome] = dict(digital, edicao=edicao, ciclo=ciclo, ano=ano, componente=componente)
+        tarefas.append((edicao, ciclo, ano, componente, caminho, bruto_mudou))
+
+    for nome, linhas_brutas, linhas, segundos in ingerir_varios(tarefas, matriz, processos):
+        manifesto["arquivos"][nome] = dict(digitais[nome], linhas=linhas)
+        relatorio["processados"].append(nome)
+        informar(f"Partição atualizada: {nome} ({linhas_brutas} linhas lidas, {linhas} linhas finais, {segundos:.3f}s)")
+
+    # Arquivos que deixaram de existir saem do armazém
+    for nome in sorted(set(manifesto["arquivos"]) - atuais):
+        for camada in ("bruto", "final"):
+            if os.path.exists(_caminho_particao(camada, nome)):
+                os.remove(_caminho_particao(camada, nome))
+        del manifesto["arquivos"][nome]
+        relatorio["removidos"].append(nome)
+        informar(f"Partição removida: {nome}")
+
+    particoes = {nome: (info.get("edicao", EDICAO_PADRAO), info["ciclo"], info["ano"], info["componente"])
+                 for nome, info in manifesto["arquivos"].items()}
+    houve_mudanca = relatorio["processados"] or relatorio["removidos"] or not os.path.exists(ARQUIVO_FINAL) \
+        or not os.path.exists(PASTA_INDICADORES) or not os.path.exists(PASTA_HABILIDADES) \
+        or not os.path.exists(PASTA_DIMENSAO_HABILIDADES)
+    if houve_mudanca:
+        montar_saidas(particoes, matriz)
+
+    # Correspondência CNCA -> DCRC: depende só da matriz e dos arquivos do DCRC
+    anteriores_dcrc = manifesto.get("dcrc") or {}
+    digital_dcrc = {nome: impressao_digital(arquivo, anteriores_dcrc.get(nome))
+                    for nome, arquivo in ARQUIVOS_DCRC.items() if os.path.exists(arquivo)}
+    dcrc_mudou = {nome: d["sha256"] for nome, d in digital_dcrc.items()} != \
+        {nome: d.get("sha256") for nome, d in anteriores_dcrc.items()}
+    if matriz_mudou or dcrc_mudou or not os.path.exists(ARQUIVO_CORRESPONDENCIAS):
+        correspondencias = construir_correspondencias(matriz)
+        correspondencias.to_csv(ARQUIVO_CORRESPONDENCIAS, index=False, encoding="utf-8")
+        informar(f"Correspondência CNCA -> DCRC atualizada: {len(correspondencias)} linhas")
+
+    if gerar_intermediarios:
+        brutos = [pd.read_parquet(_caminho_particao("bruto", os.path.basename(caminho))) for *_, caminho in arquivos]
+        for nome, df in intermediarios(brutos, matriz.drop(columns='Ano')).items():
+            df.to_csv(nome, index=False, encoding="utf-8")
+
+    manifesto["matriz"] = digital_matriz
+    manifesto["dcrc"] = digital_dcrc
+    salvar_manifesto(manifesto)
+
+    informar(
+        f"{len(relatorio['processados'])} processado(s), {len(relatorio['mantidos'])} sem alteração, "
+        f"{len(relatorio['removidos'])} removido(s) em {time.perf_counter() - inicio:.2f}s"
+    )
+    return relatorio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pré-processamento incremental dos resultados do CNCA")
+    parser.add_argument("--pasta", default=PASTA_BRUTOS, help="pasta com os arquivos CNCA[AAAA]_CICLO*_*ANO_*.csv")
+    parser.add_argument("--forcar", action="store_true", help="ignora o manifesto e reprocessa todos os arquivos")
+    parser.add_argument("--intermediarios", action="store_true", help="também gera df.csv, df1.csv e df2.csv")
+    parser.add_argument("--padrao", default=PADRAO_GLOB, help="padrão (glob) dos arquivos brutos")
+    parser.add_argument("--processos", type=int, default=1,
+                        help="número de processos para ler os arquivos (0 = número de CPUs)")
+    args = parser.parse_args(argv)
+    processos = args.processos or os.cpu_count() or 1
+    executar(args.pasta, forcar=args.forcar, gerar_intermediarios=args.intermediarios,
+             processos=processos, padrao=args.padrao)
+
+
+if __name__ == "__main__":
+    main()
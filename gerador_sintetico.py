@@ -0,0 +1,316 @@
+#-------------------
+# GERADOR DE DADOS SINTÉTICOS DO CNCA (TESTES DE CARGA)
+#-------------------
+
+# Gera arquivos no mesmo formato dos dados reais, com valores inventados:
+#   - DadosBrutos/CNCA_CICLO*_*ANO_*.csv (uma linha por município);
+#   - HABILIDADES_DESEMPENHO_ESCOLA *.csv (uma linha por escola);
+#   - HABILIDADES_DESEMPENHO_ESTUDANTE *.csv (uma linha por estudante).
+#
+# Os arquivos seguem o formato das exportações: separador ';', BOM UTF-8,
+# percentuais com '%', células "acertos / total" por habilidade, códigos com
+# espaço no final e sem quebra de linha no fim do arquivo. As habilidades dos
+# arquivos brutos vêm da matriz de referência, para que o pré-processamento
+# encontre as mesmas correspondências dos dados reais.
+#
+# Os municípios da CREDE 01 (com os códigos IBGE reais) vêm sempre primeiro; os
+# demais têm nomes e códigos inventados. Nomes de escolas e estudantes são
+# combinações aleatórias de listas fixas. A mesma semente gera sempre os
+# mesmos arquivos.
+#
+# Escala 1 corresponde ao volume real da CREDE (cerca de 36 escolas por
+# município e uma turma de 25 estudantes por escola, em cada etapa e
+# componente); a escala multiplica o número de escolas e, com ele, o de
+# estudantes.
+#
+# Uso:
+#   python gerador_sintetico.py sintetico/                       # escala 1
+#   python gerador_sintetico.py sintetico/ --escala 100 --semente 7
+#   python gerador_sintetico.py sintetico/ --edicao 2024 --edicao 2025 --municipios 184
+#   python benchmarks/executar.py --sintetico 100                 # gera e mede em uma pasta temporária
+
+import argparse
+import os
+import random
+import time
+
+from agregados import CODIGOS_MUNICIPIOS, MUNICIPIOS_CREDE
+from etl import ARQUIVO_MATRIZ, EDICAO_PADRAO, ETAPAS, PADRAO_HABILIDADE, carregar_matriz, matriz_da_edicao
+
+# Municípios do Ceará (arquivos brutos e exportações)
+MUNICIPIOS = 184
+
+# Escolas por município na escala 1, turmas por escola e estudantes por turma
+ESCOLAS_POR_MUNICIPIO = 36
+TURMAS_POR_ESCOLA = 1
+ESTUDANTES_POR_TURMA = 25
+
+# Habilidades das exportações por escola e por estudante
+HABILIDADES_EXPORTACOES = 8
+
+# Sigla do componente nos nomes dos arquivos brutos e nas exportações
+COMPONENTES = {"LPL": ("LÍNGUA PORTUGUESA", "LP"), "MT": ("MATEMÁTICA", "MT")}
+
+ANOS = range(1, 6)
+CICLOS = range(1, 4)
+
+# Etapa por ano, como aparece nos arquivos ("ENSINO FUNDAMENTAL DE 9 ANOS - 2º ANO")
+ETAPAS_ARQUIVO = {int(curta.split()[0]): longa for longa, curta in ETAPAS.items()}
+
+CABECALHO_BRUTOS = ["Município", "Componente Curricular", "Etapa", "Previstos", "Avaliados", "% Participação",
+                    "Defasagem", "Aprendizado intermediário", "Aprendizado adequado", "Acerto Total"]
+
+CABECALHO_ESCOLAS = ["Rede", "Etapa", "Componente Curricular", "Código do Município", "Escola", "Previstos",
+                     "Avaliados", "Avaliados (%)", "Proficiência Média", "Não alfabetizado",
+                     "Alfabetização incompleta", "Intermediário", "Suficiente", "Desejável"]
+
+CABECALHO_ESTUDANTES = ["Rede", "Etapa", "Componente Curricular", "Código da Turma", "Estudante", "Avaliado",
+                        "Proficiência", "Padrão de Desempenho"]
+
+# Padrão de desempenho do estudante pela proficiência (limite superior de cada faixa)
+PADROES = [(100, "Não Alfabetizado"), (125, "Alfabetização Incompleta"), (150, "Intermediário"),
+           (175, "Suficiente"), (float("inf"), "Desejável")]
+
+NOMES = ["ANA", "ANTONIO", "BEATRIZ", "CARLOS", "DAVI", "EDUARDA", "FRANCISCO", "GABRIEL", "HELENA", "ISABELA",
+         "JOAO", "JOSE", "LARA", "LUCAS", "MARIA", "MATEUS", "PEDRO", "RAFAELA", "SAMUEL", "VITORIA"]
+SOBRENOMES = ["ALVES", "BARBOSA", "CARNEIRO", "COSTA", "FERREIRA", "GOMES", "LIMA", "MENDES", "NASCIMENTO",
+              "OLIVEIRA", "PEREIRA", "RIBEIRO", "RODRIGUES", "SANTOS", "SILVA", "SOUSA"]
+TIPOS_ESCOLA = ["EMEF", "EMEIEF", "EEF", "CEI", "ESCOLA MUNICIPAL"]
+
+
+#-------------------
+# AUXILIARES
+#-------------------
+
+def _aleatorio(semente, *partes):
+    """ Gerador próprio de cada arquivo ou unidade, independente da ordem de geração """
+    return random.Random("-".join(str(parte) for parte in (semente,) + partes))
+
+
+def _percentuais(rng, qualidade, partes):
+    """ Distribuição inteira (soma 100) entre os níveis, deslocada para os mais altos conforme a qualidade """
+    pesos = [rng.random() + max(0.0, (qualidade - 50) / 10) * i for i in range(partes)]
+    total = sum(pesos)
+    valores = [round(100 * peso / total) for peso in pesos]
+    valores[-1] += 100 - sum(valores)
+    if valores[-1] < 0:
+        valores[valores.index(max(valores))] += valores[-1]
+        valores[-1] = 0
+    return valores
+
+
+def _limitar(valor):
+    return max(0, min(100, round(valor)))
+
+
+def _gravar(caminho, cabecalho, linhas):
+    """ Grava no formato das exportações (';', BOM, sem quebra de linha final); retorna o número de linhas """
+    quantidade = 0
+    with open(caminho, "w", encoding="utf-8-sig", newline="") as f:
+        f.write(";".join(cabecalho))
+        for linha in linhas:
+            f.write("\n" + ";".join(linha))
+            quantidade += 1
+    return quantidade
+
+
+def municipios(quantidade=MUNICIPIOS):
+    """ (código IBGE, nome) dos municípios: os da CREDE 01 e, depois, municípios inventados """
+    codigos = {nome: codigo for codigo, nome in CODIGOS_MUNICIPIOS.items()}
+    lista = [(codigos[nome], nome) for nome in MUNICIPIOS_CREDE]
+    numero = 0
+    while len(lista) < quantidade:
+        numero += 1
+        codigo = f"23{10000 + 37 * numero:05d}"
+        if codigo not in CODIGOS_MUNICIPIOS:
+            lista.append((codigo, f"MUNICIPIO {numero:04d}"))
+    return lista[:quantidade]
+
+
+def _qualidade(semente, codigo):
+    """ Nível de acerto típico do município (o mesmo em todos os arquivos) """
+    return _aleatorio(semente, "municipio", codigo).gauss(65, 12)
+
+
+#-------------------
+# ARQUIVOS BRUTOS (POR MUNICÍPIO)
+#-------------------
+
+def _habilidades_brutas(matriz, ciclo, ano, componente):
+    """ Colunas 'H xx' previstas na matriz para o ciclo, ano e componente """
+    filtro = ((matriz["Ciclos"] == str(ciclo)) & (matriz["Etapa"] == f"{ano} ANO")
+              & (matriz["Componente Curricular"] == COMPONENTES[componente][0]))
+    habilidades = matriz.loc[filtro, "Habilidades"].dropna()
+    return list(dict.fromkeys(habilidades[habilidades.str.match(PADRAO_HABILIDADE)]))
+
+
+def _linhas_brutas(rng, semente, lista, edicao, ciclo, ano, componente, habilidades):
+    for codigo, nome in lista:
+        # Alguns municípios de fora da CREDE não aparecem em todos os arquivos
+        if nome not in MUNICIPIOS_CREDE and rng.random() < 0.1:
+            continue
+        previstos = rng.randint(60, 3500)
+        # Participação baixa no primeiro ciclo e municípios que não aplicaram a avaliação
+        participacao = 0.0 if rng.random() < 0.25 / ciclo else rng.uniform(0.4 if ciclo > 1 else 0.01, 1.0)
+        avaliados = round(previstos * participacao)
+        linha = [nome, COMPONENTES[componente][0], ETAPAS_ARQUIVO[ano], str(previstos), str(avaliados)]
+        if avaliados == 0:
+            yield linha + ["0%"] * 5 + [""] * len(habilidades)
+            continue
+        qualidade = _qualidade(semente, codigo) + 4 * (ciclo - 1) + 2 * (edicao - EDICAO_PADRAO)
+        acertos = [_limitar(rng.gauss(qualidade, 15)) for _ in habilidades]
+        niveis = _percentuais(rng, qualidade, 3)
+        linha += [f"{round(100 * avaliados / previstos)}%"] + [f"{valor}%" for valor in niveis]
+        acerto_total = round(sum(acertos) / len(acertos)) if acertos else _limitar(rng.gauss(qualidade, 10))
+        linha += [f"{acerto_total}%"] + [str(valor) for valor in acertos]
+        yield linha
+
+
+def gerar_brutos(pasta, lista, edicoes=(EDICAO_PADRAO,), semente=0, caminho_matriz=ARQUIVO_MATRIZ):
+    """ Um arquivo bruto por edição, ciclo, ano e componente; retorna o total de linhas """
+    os.makedirs(pasta, exist_ok=True)
+    matriz = carregar_matriz(caminho_matriz)
+    total = 0
+    for edicao in edicoes:
+        matriz_edicao = matriz_da_edicao(matriz, edicao)
+        prefixo = "CNCA" if edicao == EDICAO_PADRAO else f"CNCA{edicao}"
+        for ciclo in CICLOS:
+            for ano in ANOS:
+                for componente in COMPONENTES:
+                    habilidades = _habilidades_brutas(matriz_edicao, ciclo, ano, componente)
+                    rng = _aleatorio(semente, "brutos", edicao, ciclo, ano, componente)
+                    linhas = _linhas_brutas(rng, semente, lista, edicao, ciclo, ano, componente, habilidades)
+                    caminho = os.path.join(pasta, f"{prefixo}_CICLO{ciclo}_{ano}ANO_{componente}.csv")
+                    total += _gravar(caminho, CABECALHO_BRUTOS + [f"{h} (%)" for h in habilidades], linhas)
+    return total
+
+
+#-------------------
+# EXPORTAÇÕES POR ESCOLA E POR ESTUDANTE
+#-------------------
+
+def _escolas(semente, codigo, quantidade):
+    """ Nomes únicos das escolas do município """
+    rng = _aleatorio(semente, "escolas", codigo)
+    nomes = []
+    vistos = set()
+    while len(nomes) < quantidade:
+        nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)} {rng.choice(TIPOS_ESCOLA)}"
+        if nome in vistos:
+            nome = f"{nome} {len(nomes) + 1}"
+        vistos.add(nome)
+        nomes.append(nome)
+    return nomes
+
+
+def _unidades(semente, lista, escolas_por_municipio):
+    """ (código do município, escola, número da escola) de todas as escolas """
+    for codigo, _ in lista:
+        for numero, escola in enumerate(_escolas(semente, codigo, escolas_por_municipio), start=1):
+            yield codigo, escola, numero
+
+
+def _linhas_escolas(semente, unidades, ano, componente, totais):
+    etapa = ETAPAS_ARQUIVO[ano]
+    sigla = COMPONENTES[componente][1]
+    for codigo, escola, numero in unidades:
+        rng = _aleatorio(semente, "escola", codigo, numero, ano, componente)
+        previstos = rng.randint(10, 60)
+        avaliados = max(1, round(previstos * rng.uniform(0.85, 1.1)))
+        qualidade = _qualidade(semente, codigo) + rng.gauss(0, 8)
+        linha = ["MUNICIPAL", etapa, sigla, f"{codigo} ", escola, str(previstos), str(avaliados),
+                 str(round(100 * avaliados / previstos)), str(round(120 + 1.5 * qualidade + rng.gauss(0, 10)))]
+        linha += [f"{valor}%" for valor in _percentuais(rng, qualidade, 5)]
+        linha += ["-" if total == 0 or rng.random() < 0.03 else str(_limitar(rng.gauss(qualidade, 15)))
+                  for total in totais]
+        yield linha
+
+
+def _linhas_estudantes(semente, unidades, ano, componente, totais, turmas, estudantes):
+    etapa = ETAPAS_ARQUIVO[ano]
+    sigla = COMPONENTES[componente][1]
+    for codigo, escola, numero in unidades:
+        for turma in range(1, turmas + 1):
+            rng = _aleatorio(semente, "turma", codigo, numero, turma, ano, componente)
+            codigo_turma = f"{codigo}{numero:05d}{turma:05d} "
+            qualidade = _qualidade(semente, codigo) + rng.gauss(0, 8)
+            for _ in range(estudantes):
+                nome = f"{rng.choice(NOMES)} {rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+                if rng.random() < 0.05:
+                    yield ["MUNICIPAL", etapa, sigla, codigo_turma, nome, "Não", "-", "-"] + [" -"] * len(totais)
+                    continue
+                proficiencia = round(120 + 1.5 * qualidade + rng.gauss(0, 25))
+                padrao = next(nome_padrao for limite, nome_padrao in PADROES if proficiencia < limite)
+                celulas = []
+                for total in totais:
+                    if total == 0 or rng.random() < 0.03:
+                        celulas.append(" -")
+                    else:
+                        acertos = sum(rng.random() * 100 < qualidade for _ in range(total))
+                        celulas.append(f" {acertos} / {total}")
+                yield ["MUNICIPAL", etapa, sigla, codigo_turma, nome, "Sim", str(proficiencia), padrao] + celulas
+
+
+def gerar_exportacoes(pasta, lista, escolas_por_municipio=ESCOLAS_POR_MUNICIPIO, turmas=TURMAS_POR_ESCOLA,
+                      estudantes=ESTUDANTES_POR_TURMA, semente=0):
+    """ Exportações por escola e por estudante de cada etapa e componente; retorna (escolas, estudantes) """
+    os.makedirs(pasta, exist_ok=True)
+    cabecalho_escolas = CABECALHO_ESCOLAS + [f"H {i:02d} (%)" for i in range(1, HABILIDADES_EXPORTACOES + 1)]
+    cabecalho_estudantes = CABECALHO_ESTUDANTES + [f"H {i:02d}" for i in range(1, HABILIDADES_EXPORTACOES + 1)]
+    total_escolas = total_estudantes = 0
+    for posicao, (ano, componente) in enumerate((ano, c) for ano in ANOS for c in COMPONENTES):
+        # Itens por habilidade na prova (0: habilidade sem itens, exportada como '-')
+        rng = _aleatorio(semente, "prova", ano, componente)
+        totais = [0 if rng.random() < 0.1 else rng.randint(1, 5) for _ in range(HABILIDADES_EXPORTACOES)]
+        # Nome no formato das exportações: data e hora da geração do arquivo
+        horario = f"07-02-2025 {posicao // 6}-{10 * (posicao % 6):02d}-00"
+
+        caminho = os.path.join(pasta, f"HABILIDADES_DESEMPENHO_ESCOLA {horario}.csv")
+        linhas = _linhas_escolas(semente, _unidades(semente, lista, escolas_por_municipio), ano, componente, totais)
+        total_escolas += _gravar(caminho, cabecalho_escolas, linhas)
+
+        caminho = os.path.join(pasta, f"HABILIDADES_DESEMPENHO_ESTUDANTE {horario}.csv")
+        linhas = _linhas_estudantes(semente, _unidades(semente, lista, escolas_por_municipio), ano, componente,
+                                    totais, turmas, estudantes)
+        total_estudantes += _gravar(caminho, cabecalho_estudantes, linhas)
+    return total_escolas, total_estudantes
+
+
+#-------------------
+# EXECUÇÃO
+#-------------------
+
+def gerar(destino, escala=1, quantidade_municipios=MUNICIPIOS, municipios_exportacoes=len(MUNICIPIOS_CREDE),
+          edicoes=(EDICAO_PADRAO,), semente=0, caminho_matriz=ARQUIVO_MATRIZ, informar=print):
+    """ Gera os arquivos brutos em destino/DadosBrutos e as exportações em destino; retorna as contagens """
+    inicio = time.perf_counter()
+    lista = municipios(max(quantidade_municipios, municipios_exportacoes))
+    escolas_por_municipio = max(1, round(ESCOLAS_POR_MUNICIPIO * escala))
+
+    brutos = gerar_brutos(os.path.join(destino, "DadosBrutos"), lista[:quantidade_municipios], edicoes, semente,
+                          caminho_matriz)
+    escolas, estudantes = gerar_exportacoes(destino, lista[:municipios_exportacoes], escolas_por_municipio,
+                                            semente=semente)
+    contagens = {"linhas_brutas": brutos, "escolas": escolas, "estudantes": estudantes}
+    informar(f"{brutos} linhas brutas, {escolas} escolas e {estudantes} estudantes gerados em {destino} "
+             f"({time.perf_counter() - inicio:.1f}s)")
+    return contagens
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gerador de dados sintéticos do CNCA (testes de carga)")
+    parser.add_argument("destino", help="pasta de saída (os arquivos brutos vão para destino/DadosBrutos)")
+    parser.add_argument("--escala", type=float, default=1, help="multiplica o número de escolas e estudantes")
+    parser.add_argument("--municipios", type=int, default=MUNICIPIOS, help="municípios nos arquivos brutos")
+    parser.add_argument("--municipios-exportacoes", type=int, default=len(MUNICIPIOS_CREDE),
+                        help="municípios nas exportações por escola e estudante (os da CREDE vêm primeiro)")
+    parser.add_argument("--edicao", type=int, action="append", help="edição gerada (pode repetir; padrão: 2024)")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--matriz", default=ARQUIVO_MATRIZ, help="matriz de referência usada nas habilidades")
+    args = parser.parse_args(argv)
+    gerar(args.destino, args.escala, args.municipios, args.municipios_exportacoes,
+          args.edicao or [EDICAO_PADRAO], args.semente, args.matriz)
+
+
+if __name__ == "__main__":
+    main()
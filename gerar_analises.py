@@ -0,0 +1,120 @@
+#-------------------
+# PRÉ-GERAÇÃO DAS ANÁLISES DA IA
+#-------------------
+
+# Gera de uma vez a análise de cada combinação (Edição, Município, Etapa,
+# Componente Curricular) do cubo de indicadores e grava no cache de análises,
+# para que o painel mostre o texto imediatamente. O payload é o mesmo que o app
+# monta (ver ia.dados_analise). Os pedidos são feitos em paralelo por um
+# cliente próprio (ia.ClienteGroq), respeitando um limite de pedidos por minuto
+# e as pausas pedidas pela API (Retry-After).
+#
+# A execução pode ser interrompida e retomada: as combinações que já estão no
+# cache são puladas.
+#
+# Uso:
+#   python gerar_analises.py                             # todas as combinações pendentes
+#   python gerar_analises.py --simultaneos 4 --por-minuto 20
+#   python gerar_analises.py --edicao 2025                # só uma edição
+#   python gerar_analises.py --url http://127.0.0.1:8765/v1/chat/completions   # servidor local (servidor_mock_groq.py)
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+import cache_analises
+import ia
+from agregados import CHAVE, COLUNAS_PARTICAO, EDICAO, PASTA_INDICADORES
+from dados import carregar_particoes
+
+# Pedidos em paralelo e limite de pedidos por minuto
+SIMULTANEOS = 4
+POR_MINUTO = 30
+
+
+def combinacoes(edicoes=None):
+    """ Combinações (Edição, Município, Etapa, Componente) presentes no cubo de indicadores """
+    filtros = [(EDICAO, "in", tuple(edicoes))] if edicoes else []
+    indicadores = carregar_particoes(PASTA_INDICADORES, filtros, COLUNAS_PARTICAO)
+    return sorted(indicadores[[EDICAO] + CHAVE].astype({coluna: str for coluna in CHAVE})
+                  .drop_duplicates().itertuples(index=False, name=None))
+
+
+def _gerar_uma(combinacao, api_key, cliente):
+    """ Pede e grava a análise de uma combinação; retorna os tokens consumidos """
+    dados = ia.dados_analise(*combinacao)
+    texto, tokens = ia.gerar(ia.montar_payload(dados), api_key, cliente)
+    # Resposta sem texto conta como falha e fica pendente para a próxima execução
+    if not texto.strip():
+        raise ia.ErroAnalise("A API não retornou texto")
+    cache_analises.gravar(ia.chave_analise(dados), texto, ia.MODELO)
+    return tokens
+
+
+def executar(api_key, simultaneos=SIMULTANEOS, por_minuto=POR_MINUTO, forcar=False, edicoes=None, url=None,
+             informar=print):
+    """ Gera as análises pendentes (das edições pedidas ou de todas) e retorna o relatório da execução.
+
+    'url' é o endereço da API (padrão: GROQ_API_URL).
+    """
+    todas = combinacoes(edicoes)
+    if forcar:
+        pendentes = todas
+    else:
+        pendentes = [c for c in todas if not cache_analises.existe(ia.chave_analise(ia.dados_analise(*c)))]
+    informar(f"{len(todas)} combinações, {len(todas) - len(pendentes)} já no cache, {len(pendentes)} a gerar")
+
+    relatorio = {"geradas": [], "falhas": {}, "tokens": 0, "puladas": len(todas) - len(pendentes)}
+    if not pendentes:
+        return relatorio
+
+    inicio = time.perf_counter()
+    # Sem limite de fila: os pedidos esperando vaga são no máximo os das threads
+    cliente = ia.ClienteGroq(url, simultaneos=simultaneos, por_minuto=por_minuto, max_fila=None)
+    with ThreadPoolExecutor(max_workers=max(1, simultaneos)) as executor:
+        futuros = {executor.submit(_gerar_uma, c, api_key, cliente): c for c in pendentes}
+        for feitos, futuro in enumerate(as_completed(futuros), start=1):
+            combinacao = futuros[futuro]
+            nome = " / ".join(map(str, combinacao))
+            try:
+                tokens = futuro.result()
+            except Exception as erro:
+                relatorio["falhas"][combinacao] = str(erro)
+                informar(f"[{feitos}/{len(pendentes)}] {nome}: FALHA ({erro})")
+            else:
+                relatorio["geradas"].append(combinacao)
+                relatorio["tokens"] += tokens
+                informar(f"[{feitos}/{len(pendentes)}] {nome}: ok ({tokens} tokens)")
+
+    informar(
+        f"Concluído em {time.perf_counter() - inicio:.1f}s: {len(relatorio['geradas'])} geradas, "
+        f"{len(relatorio['falhas'])} falhas, {relatorio['tokens']} tokens"
+    )
+    if relatorio["falhas"]:
+        informar("Execute novamente para tentar as combinações que falharam.")
+    return relatorio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pré-geração das análises da IA para todas as visões do painel")
+    parser.add_argument("--simultaneos", type=int, default=SIMULTANEOS, help="pedidos em paralelo")
+    parser.add_argument("--por-minuto", type=float, default=POR_MINUTO, help="limite de pedidos por minuto (0 = sem limite)")
+    parser.add_argument("--forcar", action="store_true", help="gera de novo mesmo as análises já no cache")
+    parser.add_argument("--url", help="endereço da API (padrão: GROQ_API_URL)")
+    parser.add_argument("--edicao", type=int, action="append", help="só esta edição (pode ser repetido)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        parser.error("GROQ_API_KEY não encontrada. Verifique o arquivo .env.")
+
+    relatorio = executar(api_key, args.simultaneos, args.por_minuto, args.forcar, args.edicao, args.url)
+    return 1 if relatorio["falhas"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,307 @@
+#-------------------
+# FÁBRICA DE GRÁFICOS
+#-------------------
+
+# Monta os gráficos do painel (velocímetros de Acerto Total, linhas de
+# aprendizagem por ciclo e barras por habilidade) a partir dos valores do cubo
+# de agregados. Cada gráfico é guardado em um cache LRU indexado pelos valores
+# que o definem: ao voltar para um filtro já visto, o app reaproveita a figura
+# pronta em vez de construir e validar os objetos do Plotly de novo.
+#
+# As figuras em cache são compartilhadas: não devem ser alteradas por quem as
+# recebe.
+
+import math
+from functools import lru_cache
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Figuras guardadas por tipo de gráfico
+MAX_FIGURAS = 256
+
+# Faixas do velocímetro
+FAIXAS = [
+    {'range': [0, 30], 'color': '#f68511'},
+    {'range': [30.1, 70], 'color': '#ffce2c'},
+    {'range': [70.1, 100], 'color': '#7e84fa'},
+]
+
+# Cor das barras de cada ciclo no gráfico por habilidade (ciclos sem cor
+# definida usam a paleta padrão do Plotly)
+CORES_CICLOS = {1: '#e46e3c', 2: '#ffce2c', 3: '#7e84fa'}
+
+# Cor das barras de cada edição na comparação entre edições (em ordem)
+CORES_EDICOES = ['#f68511', '#ffce2c', '#7e84fa', '#e46e3c', '#111827']
+
+# Séries do gráfico de aprendizagem: coluna do cubo, nome na legenda e cor
+SERIES_APRENDIZAGEM = [
+    ('Defasagem', 'Defasagem', '#f68511'),
+    ('Aprendizado intermediário', 'Aprendizado Intermediário', '#ffce2c'),
+    ('Aprendizado adequado', 'Aprendizado Adequado', '#7e84fa'),
+]
+
+
+def _valor(valor):
+    """ Valor usável como chave do cache (NaN vira None) """
+    if valor is None:
+        return None
+    valor = float(valor)
+    return None if math.isnan(valor) else valor
+
+
+def _numero(valor):
+    """ Volta de None para NaN ao montar a figura """
+    return float("nan") if valor is None else valor
+
+
+#-------------------
+# VELOCÍMETRO DE ACERTO TOTAL
+#-------------------
+
+@lru_cache(maxsize=MAX_FIGURAS)
+def _velocimetro(valor, titulo, com_referencia, referencia):
+    valor = _numero(valor)
+    indicador = dict(
+        mode="gauge+number",
+        value=valor,
+        title={
+            'text': titulo,
+            'font': {'size': 30, 'family': "Kanit", 'color': "black"}
+        },
+        number={
+            'font': {'size': 100, 'family': "Kanit", 'color': "#111827"}
+        },
+        gauge={
+            'axis': {'range': [None, 100], 'tickwidth': 1, 'tickfont': {'size': 30, 'color': "black"}},
+            'bar': {'color': "#111827"},
+            'bgcolor': "white",
+            'borderwidth': 2,
+            'bordercolor': "black",
+            'steps': FAIXAS,
+            'threshold': {
+                'line': {'color': "black", 'width': 4},
+                'thickness': 0.75,
+                'value': valor}}
+    )
+    # A partir do segundo ciclo, mostra a variação em relação ao ciclo anterior
+    if com_referencia:
+        indicador["mode"] = "gauge+number+delta"
+        indicador["number"]["font"]["size"] = 80
+        indicador["delta"] = {"reference": _numero(referencia), "increasing": {"color": "green"},
+                              "decreasing": {"color": "red"}, "position": "bottom", "font": {"size": 30}}
+
+    fig = go.Figure(go.Indicator(**indicador))
+    fig.update_layout(
+        width=500,
+        height=400,
+        margin=dict(l=10, r=10, t=30, b=0)
+    )
+    return fig
+
+
+def velocimetro(valor, titulo, referencia=False):
+    """ Velocímetro do Acerto Total; 'referencia' é o valor do ciclo anterior (False = sem variação) """
+    # A presença da referência vai em um argumento próprio: como chave do cache,
+    # False seria igual a 0.0 (False == 0.0 e hash(False) == hash(0.0))
+    com_referencia = referencia is not False
+    return _velocimetro(_valor(valor), titulo, com_referencia, _valor(referencia) if com_referencia else None)
+
+
+#-------------------
+# APRENDIZAGEM POR CICLO
+#-------------------
+
+@lru_cache(maxsize=MAX_FIGURAS)
+def _aprendizagem(ciclos, series):
+    fig = go.Figure()
+    for (nome, cor), valores in zip([(nome, cor) for _, nome, cor in SERIES_APRENDIZAGEM], series):
+        fig.add_trace(go.Scatter(
+            x=ciclos,
+            y=valores,
+            mode='lines+markers+text',
+            name=nome,
+            line=dict(color=cor),
+            marker=dict(size=8),
+            text=[str(valor) for valor in valores],
+            textposition="top center",
+            textfont=dict(family="Kanit", size=16, color="black"),
+            cliponaxis=False,
+            showlegend=True
+        ))
+
+    fig.update_layout(
+        title=dict(text="Aprendizagem por Ciclo", font=dict(family="Kanit", size=25)),
+        xaxis=dict(
+            title=dict(text="Ciclo", font=dict(family="Kanit", size=20)),
+            tickfont=dict(size=16),
+            tickmode='array',
+            tickvals=list(ciclos),
+            ticktext=list(ciclos)
+        ),
+        yaxis=dict(
+            title=dict(text="Percentual (%)", font=dict(family="Kanit", size=20)),
+            range=[0, 100],
+            tickfont=dict(size=20)
+        ),
+        margin=dict(l=0, r=0, t=120, b=10),
+        template='plotly_white',
+        font=dict(family="Kanit", size=20),
+        legend=dict(
+            orientation="v",
+            yanchor="bottom",
+            y=-0.5,
+            xanchor="center",
+            x=0,
+            font=dict(size=16)
+        ),
+        hoverlabel=dict(
+            font_size=20,
+            font_family="Kanit"
+        )
+    )
+    fig.update_traces(
+        hovertemplate="<b>Ciclo:</b> %{customdata[0]}°<br>",
+        customdata=[[ciclo] for ciclo in ciclos]
+    )
+    return fig
+
+
+def aprendizagem(indicadores):
+    """ Linhas de defasagem e aprendizado por ciclo (indicadores: registros do cubo de uma visão) """
+    ciclos = tuple(indicadores['Ciclos'].astype(str))
+    series = tuple(tuple(indicadores[coluna].tolist()) for coluna, _, _ in SERIES_APRENDIZAGEM)
+    return _aprendizagem(ciclos, series)
+
+
+#-------------------
+# DESEMPENHO POR HABILIDADE
+#-------------------
+
+@lru_cache(maxsize=MAX_FIGURAS)
+def _habilidades(barras):
+    fig = go.Figure()
+    for ciclo, descritores, percentuais, descricoes in barras:
+        percentuais = np.array(percentuais, dtype=float)
+        fig.add_trace(go.Bar(
+            x=descritores,
+            y=percentuais,
+            name=f"Ciclo {ciclo}",
+            marker=dict(color=CORES_CICLOS.get(ciclo), line=dict(color="black", width=2)),
+            text=percentuais,
+            textposition='auto',
+            textfont=dict(family="Kanit", size=20, color="black"),
+            hovertemplate="<b>Descritor:</b> %{customdata[0]}<br>"
+                          "<b>Descrição:</b> %{customdata[1]}<br>",
+            customdata=list(zip(descritores, descricoes))
+        ))
+
+    fig.update_layout(
+        title=dict(text="Média de Acertos por Habilidade (Descritor)", font=dict(family="Kanit", size=20)),
+        xaxis=dict(
+            title=dict(text="Habilidade", font=dict(family="Kanit", size=20)),
+            tickfont=dict(size=20)
+        ),
+        yaxis=dict(
+            title=dict(text="Percentual (%)", font=dict(family="Kanit", size=20)),
+            range=[0, 100],
+            tickfont=dict(size=20)
+        ),
+        barmode="group",
+        bargroupgap=0,
+        showlegend=True,
+        hoverlabel=dict(
+            font_size=20,
+            font_family="Kanit"
+        ),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        margin=dict(l=50, r=50, t=50, b=50)
+    )
+    return fig
+
+
+def habilidades(por_ciclo):
+    """ Barras agrupadas por habilidade; por_ciclo: {ciclo: DataFrame de consultar_habilidades} """
+    barras = []
+    for ciclo, df in sorted(por_ciclo.items()):
+        # Quebra as descrições longas em linhas de até 50 caracteres no hover
+        descricoes = df["Descrição da Habilidade "].astype(str).str.wrap(50).str.replace('\n', '<br>')
+        barras.append((
+            ciclo,
+            tuple(df["Descritor"].astype(str)),
+            tuple(_valor(valor) for valor in df["Percentual de acertos"]),
+            tuple(descricoes),
+        ))
+    return _habilidades(tuple(barras))
+
+
+#-------------------
+# COMPARAÇÃO ENTRE EDIÇÕES
+#-------------------
+
+@lru_cache(maxsize=MAX_FIGURAS)
+def _comparacao_edicoes(barras):
+    fig = go.Figure()
+    for posicao, (edicao, ciclos, acertos) in enumerate(barras):
+        acertos = np.array(acertos, dtype=float)
+        fig.add_trace(go.Bar(
+            x=[f"Ciclo {ciclo}" for ciclo in ciclos],
+            y=acertos,
+            name=str(edicao),
+            marker=dict(color=CORES_EDICOES[posicao % len(CORES_EDICOES)], line=dict(color="black", width=2)),
+            text=acertos,
+            textposition='auto',
+            textfont=dict(family="Kanit", size=20, color="black"),
+            hovertemplate=f"<b>Edição:</b> {edicao}<br><b>%{{x}}:</b> %{{y}}%<extra></extra>"
+        ))
+
+    fig.update_layout(
+        title=dict(text="Acerto Total por Ciclo em cada Edição", font=dict(family="Kanit", size=20)),
+        xaxis=dict(
+            title=dict(text="Ciclo", font=dict(family="Kanit", size=20)),
+            tickfont=dict(size=20)
+        ),
+        yaxis=dict(
+            title=dict(text="Acerto Total (%)", font=dict(family="Kanit", size=20)),
+            range=[0, 100],
+            tickfont=dict(size=20)
+        ),
+        barmode="group",
+        showlegend=True,
+        legend=dict(title=dict(text="Edição")),
+        hoverlabel=dict(
+            font_size=20,
+            font_family="Kanit"
+        ),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        margin=dict(l=50, r=50, t=50, b=50)
+    )
+    return fig
+
+
+def comparacao_edicoes(indicadores):
+    """ Barras de Acerto Total por ciclo, uma série por edição (indicadores: agregados.consultar_edicoes) """
+    barras = tuple(
+        (int(edicao), tuple(int(ciclo) for ciclo in grupo["Ciclos"]),
+         tuple(_valor(valor) for valor in grupo["Acerto Total"]))
+        for edicao, grupo in indicadores.groupby("Edição", sort=True)
+    )
+    return _comparacao_edicoes(barras)
+
+
+# Fábricas de figuras com cache, por nome
+FABRICAS = {"velocimetro": _velocimetro, "aprendizagem": _aprendizagem,
+            "habilidades": _habilidades, "comparacao_edicoes": _comparacao_edicoes}
+
+
+def estatisticas():
+    """ Acertos, falhas e tamanho do cache de cada tipo de gráfico """
+    return {nome: funcao.cache_info()._asdict() for nome, funcao in FABRICAS.items()}
+
+
+def limpar():
+    """ Esvazia o cache de todos os tipos de gráfico """
+    for funcao in FABRICAS.values():
+        funcao.cache_clear()
@@ -0,0 +1,542 @@
+#-------------------
+# ANÁLISE POR INTELIGÊNCIA ARTIFICIAL (GROQ)
+#-------------------
+
+# Monta o pedido de análise e consome a resposta da API em modo streaming,
+# em uma thread separada da renderização da página. As conexões têm tempo
+# limite e as falhas antes do primeiro trecho de texto são repetidas com
+# espera crescente. Todos os pedidos do processo passam por um único cliente
+# (ClienteGroq), que reaproveita as conexões e limita a taxa de pedidos.
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import requests
+
+import cache_analises
+from agregados import consultar_habilidades_por_ciclo, consultar_indicadores
+import dcrc
+from prompt import ORCAMENTO_TOKENS, VERSAO_FORMATO, compactar, contexto_visao, piores_descritores
+
+_log = logging.getLogger(__name__)
+
+# Configuração da API da Groq (GROQ_API_URL permite apontar para um servidor local)
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+MODELO = "llama-3.3-70b-versatile"
+
+# Tempo limite (segundos) para conectar e para esperar cada trecho da resposta
+TEMPO_CONEXAO = 5
+TEMPO_LEITURA = 60
+
+# Tentativas antes do primeiro trecho e espera inicial entre elas (dobra a cada falha)
+TENTATIVAS = 3
+ESPERA_INICIAL = 1.0
+
+# Habilidades com pior desempenho detalhadas com o DCRC e máximo de linhas do DCRC no prompt
+HABILIDADES_CONTEXTO = 5
+TRECHOS_DCRC = 6
+
+# Parâmetros de geração (fazem parte da chave do cache de análises)
+PARAMETROS = {
+    "temperature": 0.5,
+    "max_tokens": 4096,
+    "top_p": 0.9,
+    "frequency_penalty": 0.2,
+    "presence_penalty": 0.1,
+}
+
+# Respostas HTTP que valem nova tentativa
+STATUS_TEMPORARIOS = {429, 500, 502, 503, 504}
+
+# Limites do cliente compartilhado por todas as sessões do processo: pedidos em
+# andamento, pedidos por minuto (0 = sem limite) e pedidos esperando vaga
+SIMULTANEOS = int(os.getenv("GROQ_SIMULTANEOS", "4"))
+POR_MINUTO = float(os.getenv("GROQ_POR_MINUTO", "30"))
+MAX_FILA = int(os.getenv("GROQ_MAX_FILA", "20"))
+
+SISTEMA = (
+    "Você é um analista de dados especializado em educação no Brasil, com foco especial no Ceará. "
+    "Seu objetivo é **priorizar as informações do arquivo enviado**, realizando uma análise aprofundada "
+    "com base nesses dados. **Toda a resposta deve ser estruturada de forma acessível e prática** para gestores escolares.\n\n"
+
+    "### **Diretrizes Obrigatórias:**\n"
+    "🔹 **A resposta deve ser 100% baseada nos dados do arquivo** e não em generalizações.\n"
+    "🔹 **As sequências didáticas devem obrigatoriamente seguir todos os passos especificados no prompt.**\n"
+    "🔹 **A linguagem deve ser clara e acessível**, sem uso excessivo de termos técnicos.\n"
+    "🔹 **A resposta deve ser organizada em tópicos bem definidos**, facilitando a leitura.\n"
+)
+
+
+class ErroAnalise(Exception):
+    """ Falha ao obter a análise da API """
+
+
+def montar_prompt(dados):
+    """ Gera o prompt baseado nos dados e no conteúdo do arquivo base.txt """
+    etapa, componente = contexto_visao(dados)
+    codigos = dcrc.codigos_por_descritor(etapa, componente)
+    try:
+        with open("base.txt", "r", encoding="utf-8") as f:
+            base_conhecimento = f.read()
+    except FileNotFoundError:
+        # Habilidades do DCRC correspondentes às de pior desempenho (ver dcrc.py)
+        piores = [codigo for descritor in piores_descritores(dados, HABILIDADES_CONTEXTO)
+                  for codigo in codigos.get(descritor, [])[:1]]
+        base_conhecimento = "DCRC (Documento Curricular Referencial do Ceará):\n" + dcrc.descrever(
+            list(dict.fromkeys(piores))[:TRECHOS_DCRC]
+        )
+
+    # Criando o prompt aprimorado para análise educacional
+    prompt = (
+        "Os arquivos enviados contêm os resultados da **Acerto Total** dos **ciclos 1, 2 e 3** do programa **CNCA**.\n\n"
+
+        "### **Sobre o CNCA**\n"
+        "O **Compromisso Nacional Criança Alfabetizada (CNCA)** é um programa do governo federal que busca garantir "
+        "que todas as crianças brasileiras sejam alfabetizadas até o final do **2º ano do ensino fundamental** e "
+        "recuperar as aprendizagens dos estudantes do **3º, 4º e 5º ano**, especialmente aqueles afetados pela pandemia.\n\n"
+
+        "### **Objetivo desta análise**\n"
+        "- Esta análise **prioriza os dados do arquivo informado** e foca na comparação do desempenho de **uma mesma disciplina** "
+        "ao longo dos três ciclos avaliados dentro do mesmo ano.\n"
+        "- O principal objetivo é destacar os padrões de aprendizagem, apontar avanços e dificuldades, "
+        "e fornecer **sugestões pedagógicas** aplicáveis na escola.\n\n"
+
+        "### **Análise Baseada nos Dados do Arquivo**\n\n"
+        "1️ **Resumo Geral dos Resultados:**\n"
+        "   - Como os alunos se saíram nos ciclos 1, 2 e 3?\n"
+        "   - Identificação das principais tendências nos resultados do arquivo.\n"
+        "   - Mudanças significativas no desempenho ao longo dos ciclos.\n\n"
+
+        "2️ **Habilidades com Melhor e Pior Desempenho:**\n"
+        "   - Habilidades com maiores percentuais de acertos.\n"
+        "   - Habilidades que apresentam dificuldades recorrentes.\n"
+        "   - Comparação entre os ciclos e identificação de padrões.\n\n"
+
+        "3️ **Níveis de Aprendizagem e Defasagem:**\n"
+        "   - Quantos alunos estão em **Defasagem Educacional**?\n"
+        "   - Quantos estão no nível **Intermediário**?\n"
+        "   - Quantos atingiram o **Aprendizado Adequado**?\n"
+        "   - Sugestões práticas para melhorar esses índices.\n\n"
+
+        "4️ **Comparação Entre Disciplinas:**\n"
+        "   - Como o desempenho varia entre os diferentes componentes curriculares avaliados?\n"
+        "   - Alguma disciplina teve resultados muito abaixo das outras?\n"
+        "   - Relação entre diferentes habilidades dentro da mesma disciplina.\n\n"
+
+        "5️ **Correlação entre Número de Avaliados e Desempenho:**\n"
+        "   - Escolas com mais alunos avaliados tiveram melhor ou pior desempenho?\n"
+        "   - Diferenças entre escolas pequenas e grandes com base nos dados do arquivo.\n\n"
+
+        "6️ **Alinhamento das Habilidades com a Matriz DCRC:**\n"
+        "   - As habilidades avaliadas no CNCA estão alinhadas com a matriz DCRC?\n"
+        "   - Identificação de possíveis lacunas na aprendizagem.\n"
+        "   - Sugestões para fortalecer habilidades críticas.\n\n"
+
+        "### **Construção Obrigatória de Sequências Didáticas**\n"
+        "Com base nos dados do arquivo enviado, construa **cinco sequências didáticas detalhadas** "
+        "que **obrigatoriamente** devem conter todos os passos descritos abaixo:\n\n"
+
+        "-**Sequência 1: Aprendizagem Ativa (Exploração e Descoberta)**\n"
+        "   - **Objetivo:** Incentivar os alunos a descobrirem conceitos por meio de atividades interativas.\n"
+        "   - **Passos:**\n"
+        "     1. Escolha de um tema baseado nos dados do arquivo.\n"
+        "     2. Propor um problema ou situação do dia a dia relacionada a esse tema.\n"
+        "     3. Estimular os alunos a levantar hipóteses.\n"
+        "     4. Fazer experimentos, pesquisas ou simulações.\n"
+        "     5. Conduzir um debate sobre os resultados encontrados.\n\n"
+
+        "-**Sequência 2: Gamificação (Aprender Brincando)**\n"
+        "   - **Objetivo:** Utilizar jogos e desafios para fixação dos conteúdos.\n"
+        "   - **Passos:**\n"
+        "     1. Selecionar uma habilidade que apresentou baixo desempenho no arquivo.\n"
+        "     2. Criar um jogo de perguntas e respostas baseado nessa habilidade.\n"
+        "     3. Organizar uma competição saudável entre os alunos.\n"
+        "     4. Premiar os melhores desempenhos com recompensas simbólicas.\n"
+        "     5. Revisar os erros cometidos e reforçar os pontos fracos.\n\n"
+
+        "-**Sequência 3: Resolução de Problemas**\n"
+        "   - **Objetivo:** Ensinar os alunos a pensarem criticamente e resolverem desafios reais.\n"
+        "   - **Passos:**\n"
+        "     1. Apresentar um problema real vinculado às dificuldades observadas no arquivo.\n"
+        "     2. Dividir os alunos em grupos para encontrarem soluções.\n"
+        "     3. Cada grupo apresenta suas ideias.\n"
+        "     4. O professor orienta a solução correta e faz a conexão com o conteúdo teórico.\n\n"
+
+        "-**Sequência 4: Projetos Interdisciplinares**\n"
+        "   - **Objetivo:** Integrar diferentes disciplinas em um projeto único.\n"
+        "   - **Passos:**\n"
+        "     1. Escolher um tema que contemple habilidades críticas identificadas nos dados.\n"
+        "     2. Envolver diferentes matérias para fortalecer o aprendizado.\n"
+        "     3. Realizar pesquisas e criar um produto final (cartazes, vídeos, apresentações).\n"
+        "     4. Expor os trabalhos para a escola e comunidade.\n\n"
+
+        "### **Base de conhecimento:**\n"
+        f"{base_conhecimento}\n\n"
+
+        "### **Dados utilizados na análise:**\n"
+        f"{compactar(dados, codigos=codigos)}"
+    )
+    return prompt
+
+
+def dados_analise(edicao, municipio, etapa, componente):
+    """ Dados enviados à IA para uma visão do painel: indicadores e habilidades de todos os ciclos """
+    indicadores = consultar_indicadores(edicao, municipio, etapa, componente)
+    por_ciclo = consultar_habilidades_por_ciclo(edicao, municipio, etapa, componente)
+    habilidades = [
+        por_ciclo[ciclo][
+            ['Descritor', 'Descrição da Habilidade ', 'Habilidades', 'Percentual de acertos']
+        ].assign(Ciclos=ciclo)
+        for ciclo in sorted(int(ciclo) for ciclo in indicadores['Ciclos'].unique())
+        if ciclo in por_ciclo
+    ]
+    return pd.concat([indicadores] + habilidades, ignore_index=True)
+
+
+def montar_payload(dados, stream=True):
+    """ Payload enviado à API para os dados de uma visão do painel """
+    return {
+        "model": MODELO,
+        "messages": [
+            {"role": "system", "content": SISTEMA},
+            {"role": "user", "content": montar_prompt(dados)}
+        ],
+        **PARAMETROS,
+        "stream": stream
+    }
+
+
+def versao_prompt():
+    """ Impressão digital das instruções (muda quando o texto do prompt ou o base.txt mudam) """
+    modelo_prompt = SISTEMA + montar_prompt(pd.DataFrame()) + VERSAO_FORMATO + str(ORCAMENTO_TOKENS)
+    modelo_prompt += dcrc.VERSAO_INDICE + str((HABILIDADES_CONTEXTO, TRECHOS_DCRC))
+    return hashlib.sha256(modelo_prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def chave_analise(dados):
+    """ Chave do cache: dados canônicos, modelo, versão do prompt e parâmetros """
+    return cache_analises.chave(cache_analises.registros_canonicos(dados), MODELO, versao_prompt(), PARAMETROS)
+
+
+def chave_payload(payload):
+    """ Identificador estável de um payload """
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _espera_indicada(resposta, espera):
+    """ Usa o cabeçalho Retry-After quando a API indicar quanto esperar """
+    try:
+        return max(espera, float(resposta.headers.get("Retry-After", 0)))
+    except ValueError:
+        return espera
+
+
+#-------------------
+# CLIENTE COMPARTILHADO (CONEXÕES, FILA E LIMITE DE TAXA)
+#-------------------
+
+class FilaCheia(ErroAnalise):
+    """ Pedido recusado porque a fila de espera do cliente está cheia """
+
+
+class ClienteGroq:
+    """ Cliente da API compartilhado por todas as sessões do processo.
+
+    Reaproveita as conexões (requests.Session), limita os pedidos em andamento
+    a 'simultaneos' e os pedidos por minuto a 'por_minuto' (balde de fichas que
+    permite rajadas de até 'simultaneos' pedidos). Quem chega sem vaga espera
+    em uma fila de até 'max_fila' pedidos, por ordem de chegada; uma resposta
+    429 com Retry-After pausa todos os pedidos do cliente.
+    """
+
+    def __init__(self, url=None, simultaneos=SIMULTANEOS, por_minuto=POR_MINUTO, max_fila=MAX_FILA):
+        self.url = url
+        self.simultaneos = max(1, simultaneos)
+        self.intervalo = 60.0 / por_minuto if por_minuto else 0.0
+        self.max_fila = max_fila
+        self.sessao = requests.Session()
+        adaptador = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.simultaneos)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.mount("http://", adaptador)
+        self._condicao = threading.Condition()
+        self._fila = []
+        self._ativos = 0
+        self._fichas = float(self.simultaneos)
+        self._reposicao = time.monotonic()
+        self._pausa_ate = 0.0
+
+    def estado(self):
+        """ Pedidos em andamento e na fila """
+        with self._condicao:
+            return {"ativos": self._ativos, "fila": len(self._fila)}
+
+    @contextmanager
+    def vaga(self, ao_mudar_posicao=None):
+        """ Ocupa uma das vagas de pedido simultâneo, esperando na fila se preciso.
+
+        Enquanto espera, ao_mudar_posicao(posicao) é chamado a cada mudança de
+        posição na fila (1 = o próximo) e ao_mudar_posicao(None) quando a vaga
+        é obtida.
+        """
+        senha = object()
+        with self._condicao:
+            if self.max_fila is not None and len(self._fila) >= self.max_fila:
+                raise FilaCheia("Muitos pedidos de análise em espera. Tente novamente em alguns minutos.")
+            self._fila.append(senha)
+            try:
+                ultima = None
+                while not (self._fila[0] is senha and self._ativos < self.simultaneos):
+                    posicao = self._fila.index(senha) + 1
+                    if ao_mudar_posicao is not None and posicao != ultima:
+                        ao_mudar_posicao(posicao)
+                        ultima = posicao
+                    self._condicao.wait()
+            finally:
+                self._fila.remove(senha)
+                self._condicao.notify_all()
+            self._ativos += 1
+        if ao_mudar_posicao is not None:
+            ao_mudar_posicao(None)
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._ativos -= 1
+                self._condicao.notify_all()
+
+    def pausar(self, segundos):
+        """ Adia todos os próximos pedidos (Retry-After) """
+        with self._condicao:
+            self._pausa_ate = max(self._pausa_ate, time.monotonic() + segundos)
+
+    def _aguardar_ficha(self):
+        """ Espera a pausa em vigor e uma ficha do balde de pedidos por minuto """
+        while True:
+            with self._condicao:
+                agora = time.monotonic()
+                espera = self._pausa_ate - agora
+                if espera <= 0:
+                    if not self.intervalo:
+                        return
+                    self._fichas = min(float(self.simultaneos),
+                                       self._fichas + (agora - self._reposicao) / self.intervalo)
+                    self._reposicao = agora
+                    if self._fichas >= 1:
+                        self._fichas -= 1
+                        return
+                    espera = (1 - self._fichas) * self.intervalo
+            time.sleep(espera)
+
+    def _enviar(self, payload, api_key, stream):
+        """ Envia o pedido, repetindo falhas temporárias """
+        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        espera = ESPERA_INICIAL
+        for tentativa in range(1, TENTATIVAS + 1):
+            pausa = espera
+            self._aguardar_ficha()
+            try:
+                resposta = self.sessao.post(self.url or GROQ_API_URL, headers=headers, json=payload, stream=stream,
+                                            timeout=(TEMPO_CONEXAO, TEMPO_LEITURA))
+            except (requests.ConnectionError, requests.Timeout) as erro:
+                falha = f"falha de conexão: {erro}"
+            else:
+                if resposta.status_code == 200:
+                    return resposta
+                falha = f"{resposta.status_code} - {resposta.text[:500]}"
+                resposta.close()
+                if resposta.status_code not in STATUS_TEMPORARIOS:
+                    raise ErroAnalise(f"Erro na API: {falha}")
+                pausa = _espera_indicada(resposta, espera)
+                if resposta.status_code == 429:
+                    # O limite é da conta: todos os pedidos do processo esperam
+                    self.pausar(pausa)
+                    pausa = 0
+            _log.warning("Erro na API (tentativa %d/%d): %s", tentativa, TENTATIVAS, falha)
+            if tentativa < TENTATIVAS:
+                time.sleep(pausa)
+                espera *= 2
+        raise ErroAnalise(f"Erro na API após {TENTATIVAS} tentativas: {falha}")
+
+    @contextmanager
+    def pedido(self, payload, api_key, stream=True, ao_mudar_posicao=None):
+        """ Resposta HTTP do pedido; a vaga fica ocupada até o fim do bloco """
+        with self.vaga(ao_mudar_posicao):
+            resposta = self._enviar(payload, api_key, stream)
+            try:
+                yield resposta
+            finally:
+                resposta.close()
+
+
+_cliente = None
+_trava_cliente = threading.Lock()
+
+
+def cliente_compartilhado():
+    """ Cliente único do processo, criado no primeiro uso """
+    global _cliente
+    with _trava_cliente:
+        if _cliente is None:
+            _cliente = ClienteGroq()
+        return _cliente
+
+
+def gerar(payload, api_key, cliente=None):
+    """ Pedido sem streaming: retorna (texto, tokens consumidos) """
+    with (cliente or cliente_compartilhado()).pedido(dict(payload, stream=False), api_key, stream=False) as resposta:
+        try:
+            corpo = resposta.json()
+        except ValueError as erro:
+            raise ErroAnalise(f"Resposta inválida da API: {erro}") from erro
+    if "error" in corpo:
+        raise ErroAnalise(f"Erro na API: {corpo['error']}")
+    texto = "".join(escolha.get("message", {}).get("content") or "" for escolha in corpo.get("choices", []))
+    return texto, corpo.get("usage", {}).get("total_tokens", 0)
+
+
+def transmitir(payload, api_key, cliente=None, ao_mudar_posicao=None):
+    """ Gera os trechos de texto da resposta à medida que chegam (eventos SSE) """
+    with (cliente or cliente_compartilhado()).pedido(payload, api_key, ao_mudar_posicao=ao_mudar_posicao) as resposta:
+        try:
+            for linha in resposta.iter_lines(decode_unicode=True):
+                if not linha or not linha.startswith("data:"):
+                    continue
+                dado = linha[len("data:"):].strip()
+                if dado == "[DONE]":
+                    break
+                evento = json.loads(dado)
+                if "error" in evento:
+                    raise ErroAnalise(f"Erro na API: {evento['error']}")
+                for escolha in evento.get("choices", []):
+                    texto = escolha.get("delta", {}).get("content")
+                    if texto:
+                        yield texto
+        except requests.RequestException as erro:
+            raise ErroAnalise(f"Conexão interrompida durante a resposta: {erro}") from erro
+
+
+class AnaliseEmAndamento:
+    """ Executa o pedido em uma thread e guarda os trechos recebidos.
+
+    A página acompanha a resposta com acompanhar(), que pode ser chamado de
+    novo após um rerun: os trechos já recebidos são repetidos e a leitura
+    continua de onde a thread estiver. Enquanto o pedido espera vaga no
+    cliente compartilhado, 'posicao' é a sua posição na fila.
+    """
+
+    def __init__(self, payload, api_key, ao_concluir=None, chave=None):
+        self.chave = chave or chave_payload(payload)
+        self.partes = []
+        self.concluida = False
+        self.erro = None
+        self.posicao = None
+        self._com_vaga = False
+        self.inicio = time.perf_counter()
+        self.primeiro_trecho = None
+        self._condicao = threading.Condition()
+        self._ao_concluir = ao_concluir
+        self._thread = threading.Thread(target=self._executar, args=(payload, api_key), daemon=True)
+        self._thread.start()
+
+    def _executar(self, payload, api_key):
+        try:
+            for parte in transmitir(payload, api_key, ao_mudar_posicao=self._mudar_posicao):
+                with self._condicao:
+                    if self.primeiro_trecho is None:
+                        self.primeiro_trecho = time.perf_counter() - self.inicio
+                    self.partes.append(parte)
+                    self._condicao.notify_all()
+            if not self.texto.strip():
+                raise ErroAnalise("A API não retornou texto")
+            if self._ao_concluir is not None:
+                self._ao_concluir(self.texto)
+        except Exception as erro:
+            _log.warning("Análise não gerada: %s", erro)
+            self.erro = erro
+        finally:
+            with self._condicao:
+                self.concluida = True
+                self._condicao.notify_all()
+
+    def _mudar_posicao(self, posicao):
+        with self._condicao:
+            self.posicao = posicao
+            self._com_vaga = posicao is None
+            self._condicao.notify_all()
+
+    @property
+    def texto(self):
+        return "".join(self.partes)
+
+    def posicoes_na_fila(self):
+        """ Gera a posição na fila a cada mudança, até o pedido obter vaga (ou terminar) """
+        ultima = None
+        while True:
+            with self._condicao:
+                while not (self.concluida or self._com_vaga or self.posicao not in (None, ultima)):
+                    self._condicao.wait()
+                if self.concluida or self._com_vaga:
+                    return
+                ultima = self.posicao
+            yield ultima
+
+    def acompanhar(self):
+        """ Gera os trechos da resposta, esperando pelos que ainda não chegaram """
+        posicao = 0
+        while True:
+            with self._condicao:
+                while posicao >= len(self.partes) and not self.concluida:
+                    self._condicao.wait()
+                novas = self.partes[posicao:]
+                terminou = self.concluida
+            posicao += len(novas)
+            yield from novas
+            if terminou and posicao >= len(self.partes):
+                return
+
+
+#-------------------
+# UM PEDIDO POR ANÁLISE NO PROCESSO
+#-------------------
+
+# Pedidos em andamento por chave de análise (ver chave_analise)
+_em_andamento = {}
+_trava_andamento = threading.Lock()
+_compartilhados = 0
+
+
+def analise_compartilhada(chave, payload, api_key, ao_concluir=None):
+    """ Pedido da análise 'chave', compartilhado por todas as sessões do processo.
+
+    Se a mesma análise já estiver sendo gerada (outra sessão ou outra aba
+    abriu a mesma visão antes de a resposta terminar), devolve esse pedido: as
+    duas páginas acompanham os mesmos trechos e a API recebe um único pedido.
+    Um pedido concluído (com a análise já no cache ou com erro) não é
+    reaproveitado.
+    """
+    global _compartilhados
+    with _trava_andamento:
+        for antiga in [c for c, analise in _em_andamento.items() if analise.concluida]:
+            del _em_andamento[antiga]
+        analise = _em_andamento.get(chave)
+        if analise is None:
+            analise = AnaliseEmAndamento(payload, api_key, ao_concluir=ao_concluir, chave=chave)
+            _em_andamento[chave] = analise
+        else:
+            _compartilhados += 1
+    return analise
+
+
+def estatisticas_pedidos():
+    """ Pedidos à API em andamento, na fila e reaproveitados por outras sessões desde o início do processo """
+    with _trava_andamento:
+        em_andamento = sum(1 for analise in _em_andamento.values() if not analise.concluida)
+        compartilhados = _compartilhados
+    return {"em_andamento": em_andamento, "fila": cliente_compartilhado().estado()["fila"],
+            "compartilhados": compartilhados}
@@ -0,0 +1,200 @@
+#-------------------
+# MEDIÇÃO DO TEMPO DE CADA ETAPA DO APP
+#-------------------
+
+# Registra, para cada etapa de uma execução do app (consulta ao cubo,
+# agregação por ciclo, montagem e envio de cada gráfico, análise da IA), o
+# tempo gasto, as linhas processadas e se o cache foi aproveitado. As medições
+# ficam em dois lugares:
+#   - a execução atual (uma lista por thread, reiniciada a cada rerun), que o
+#     painel de desempenho do app mostra;
+#   - o acumulado do processo por etapa (execuções, tempo total e máximo,
+#     linhas, acertos e falhas de cache), exportável no formato do Prometheus.
+#
+# Opcionalmente (variáveis de ambiente):
+#   METRICAS_LOG=arquivo.jsonl   uma linha JSON por execução, com todas as etapas
+#   METRICAS_PROMETHEUS=arquivo  métricas acumuladas, regravadas a cada execução
+#                                (para o coletor de arquivos de texto do node_exporter)
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import cache_analises
+import dados
+import graficos
+
+ARQUIVO_LOG = os.getenv("METRICAS_LOG")
+ARQUIVO_PROMETHEUS = os.getenv("METRICAS_PROMETHEUS")
+
+_acumulado = {}
+_trava = threading.Lock()
+_local = threading.local()
+
+
+class Medicao:
+    """ Uma etapa medida: tempo (segundos), linhas processadas e resultado do cache """
+
+    def __init__(self, etapa):
+        self.etapa = etapa
+        self.segundos = 0.0
+        self.linhas = None
+        self.cache = None
+
+    def registro(self):
+        return {"etapa": self.etapa, "ms": round(1000 * self.segundos, 2), "linhas": self.linhas, "cache": self.cache}
+
+
+#-------------------
+# MEDIÇÃO
+#-------------------
+
+def contadores_figuras(nome):
+    """ (acertos, falhas) do cache de um tipo de gráfico (ver graficos.estatisticas) """
+    def contadores():
+        info = graficos.estatisticas()[nome]
+        return info["hits"], info["misses"]
+    return contadores
+
+
+def contadores_dados():
+    """ (acertos, falhas) do cache de partições do cubo (ver dados.estatisticas) """
+    info = dados.estatisticas()
+    return info["acertos"], info["falhas"]
+
+
+@contextmanager
+def medir(etapa, contadores=None):
+    """ Mede o bloco como uma etapa da execução atual.
+
+    'contadores' é uma função que retorna (acertos, falhas) de um cache: a
+    diferença entre o início e o fim do bloco define se houve acerto ou falha.
+    Os contadores são do processo; com várias sessões ao mesmo tempo, o
+    resultado de uma etapa pode incluir consultas de outra sessão. O bloco pode
+    preencher 'linhas' e 'cache' no objeto devolvido.
+    """
+    medicao = Medicao(etapa)
+    antes = contadores() if contadores else None
+    inicio = time.perf_counter()
+    try:
+        yield medicao
+    finally:
+        medicao.segundos = time.perf_counter() - inicio
+        if antes is not None and medicao.cache is None:
+            acertos, falhas = contadores()
+            if falhas > antes[1]:
+                medicao.cache = "falha"
+            elif acertos > antes[0]:
+                medicao.cache = "acerto"
+        _registrar(medicao)
+
+
+def _registrar(medicao):
+    execucao = getattr(_local, "execucao", None)
+    if execucao is not None:
+        execucao.append(medicao)
+    with _trava:
+        total = _acumulado.setdefault(medicao.etapa, {"execucoes": 0, "segundos": 0.0, "maximo": 0.0,
+                                                      "linhas": 0, "acertos": 0, "falhas": 0})
+        total["execucoes"] += 1
+        total["segundos"] += medicao.segundos
+        total["maximo"] = max(total["maximo"], medicao.segundos)
+        total["linhas"] += medicao.linhas or 0
+        if medicao.cache == "acerto":
+            total["acertos"] += 1
+        elif medicao.cache == "falha":
+            total["falhas"] += 1
+
+
+#-------------------
+# EXECUÇÃO ATUAL (RERUN)
+#-------------------
+
+def iniciar_execucao():
+    """ Começa uma nova execução nesta thread (chamado no início de cada rerun) """
+    _local.execucao = []
+    _local.inicio = time.perf_counter()
+
+
+def execucao():
+    """ Medições da execução atual, na ordem em que ocorreram """
+    return list(getattr(_local, "execucao", []))
+
+
+def finalizar_execucao(**contexto):
+    """ Registra o tempo total da execução e grava o log e as métricas, se configurados """
+    if getattr(_local, "execucao", None) is None:
+        return None
+    total = Medicao("total")
+    total.segundos = time.perf_counter() - _local.inicio
+    _registrar(total)
+
+    if ARQUIVO_LOG:
+        registro = {"momento": time.strftime("%Y-%m-%dT%H:%M:%S"), **contexto,
+                    "etapas": [medicao.registro() for medicao in _local.execucao]}
+        with open(ARQUIVO_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+    if ARQUIVO_PROMETHEUS:
+        temporario = f"{ARQUIVO_PROMETHEUS}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(prometheus())
+        os.replace(temporario, ARQUIVO_PROMETHEUS)
+    return total
+
+
+#-------------------
+# ACUMULADO DO PROCESSO
+#-------------------
+
+def acumulado():
+    """ Totais por etapa desde o início do processo: {etapa: {execucoes, segundos, maximo, ...}} """
+    with _trava:
+        return {etapa: dict(total) for etapa, total in _acumulado.items()}
+
+
+def _rotulo(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus():
+    """ Métricas acumuladas no formato de texto do Prometheus """
+    linhas = []
+
+    def metrica(nome, tipo, ajuda, valores):
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+        for rotulos, valor in valores:
+            texto = ",".join(f'{chave}="{_rotulo(v)}"' for chave, v in rotulos.items())
+            linhas.append(f"{nome}{{{texto}}} {valor}" if texto else f"{nome} {valor}")
+
+    totais = acumulado()
+    metrica("cnca_etapa_execucoes_total", "counter", "Execuções de cada etapa do app",
+            [({"etapa": e}, t["execucoes"]) for e, t in totais.items()])
+    metrica("cnca_etapa_segundos_total", "counter", "Tempo acumulado de cada etapa do app",
+            [({"etapa": e}, round(t["segundos"], 6)) for e, t in totais.items()])
+    metrica("cnca_etapa_segundos_max", "gauge", "Maior tempo de uma execução da etapa",
+            [({"etapa": e}, round(t["maximo"], 6)) for e, t in totais.items()])
+    metrica("cnca_etapa_linhas_total", "counter", "Linhas processadas pela etapa",
+            [({"etapa": e}, t["linhas"]) for e, t in totais.items()])
+    metrica("cnca_etapa_cache_total", "counter", "Acertos e falhas de cache por etapa",
+            [({"etapa": e, "resultado": r}, t[r]) for e, t in totais.items() for r in ("acertos", "falhas")])
+
+    figuras = graficos.estatisticas()
+    metrica("cnca_figuras_cache_total", "counter", "Acertos e falhas do cache de figuras",
+            [({"grafico": g, "resultado": r}, info[c]) for g, info in figuras.items()
+             for r, c in (("acertos", "hits"), ("falhas", "misses"))])
+    metrica("cnca_figuras_cache_entradas", "gauge", "Figuras guardadas no cache",
+            [({"grafico": g}, info["currsize"]) for g, info in figuras.items()])
+
+    particoes = dados.estatisticas()
+    metrica("cnca_particoes_cache_total", "counter", "Acertos e falhas do cache de partições do cubo",
+            [({"resultado": r}, particoes[r]) for r in ("acertos", "falhas")])
+
+    analises = cache_analises.estatisticas()
+    metrica("cnca_analises_cache_total", "counter", "Acertos, falhas e descartes do cache de análises da IA",
+            [({"resultado": r}, analises[r]) for r in ("acertos", "falhas", "descartes")])
+    metrica("cnca_analises_cache_entradas", "gauge", "Análises guardadas no cache", [({}, analises["entradas"])])
+    metrica("cnca_analises_cache_bytes", "gauge", "Tamanho das análises guardadas", [({}, analises["bytes"])])
+    return "\n".join(linhas) + "\n"
@@ -0,0 +1,170 @@
+#-------------------
+# DADOS COMPACTOS PARA O PROMPT DA IA
+#-------------------
+
+# Converte os dados de uma visão do painel (indicadores e habilidades de todos
+# os ciclos, ver ia.dados_analise) em um texto curto: uma linha por indicador
+# e uma por habilidade, com os valores dos ciclos lado a lado e cada descrição
+# uma única vez. Se o texto passar do orçamento de tokens, as descrições são
+# encurtadas e, por fim, as habilidades de desempenho intermediário omitidas.
+
+import math
+
+import pandas as pd
+
+# Versão do formato (faz parte da chave do cache de análises)
+VERSAO_FORMATO = "2"
+
+# Orçamento de tokens para os dados da visão
+ORCAMENTO_TOKENS = 2500
+
+# Estimativa de caracteres por token (texto em português com números)
+CARACTERES_POR_TOKEN = 3.5
+
+# Tamanhos máximos das descrições tentados, do maior ao menor (None = completa)
+LIMITES_DESCRICAO = [None, 120, 70, 40, 0]
+
+# Indicadores na ordem de exibição; os percentuais recebem o sufixo %
+INDICADORES = ["Previstos", "Avaliados", "Participação", "Acerto Total",
+               "Defasagem", "Aprendizado intermediário", "Aprendizado adequado"]
+PERCENTUAIS = {"Participação", "Acerto Total", "Defasagem", "Aprendizado intermediário", "Aprendizado adequado"}
+
+CONTEXTO = ["Município", "Etapa", "Componente Curricular"]
+
+# Códigos do DCRC citados por habilidade
+CODIGOS_POR_HABILIDADE = 2
+
+# Mínimo de habilidades mantidas em cada extremo (piores e melhores) ao cortar
+MINIMO_EXTREMOS = 3
+
+
+def contar_tokens(texto):
+    """ Estimativa do número de tokens do texto """
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+
+def _valor(valor):
+    if pd.isna(valor):
+        return "-"
+    return f"{valor:.0f}" if float(valor).is_integer() else f"{valor:.1f}"
+
+
+def _serie(valores, ciclos):
+    return "/".join(_valor(valores.get(ciclo)) for ciclo in ciclos)
+
+
+def _descricao(texto, limite):
+    if limite == 0:
+        return ""
+    texto = " ".join(str(texto).split())
+    if limite is None or len(texto) <= limite:
+        return texto
+    return texto[:limite - 1].rstrip() + "…"
+
+
+def _separar(dados):
+    """ (indicadores, habilidades) a partir do DataFrame da visão """
+    if "Descritor" not in dados.columns:
+        return dados, dados.iloc[0:0]
+    eh_habilidade = dados["Descritor"].notna()
+    return dados[~eh_habilidade], dados[eh_habilidade]
+
+
+def _linhas_indicadores(indicadores, ciclos):
+    linhas = []
+    por_ciclo = indicadores.groupby("Ciclos").first()
+    for coluna in INDICADORES:
+        if coluna not in por_ciclo.columns or por_ciclo[coluna].isna().all():
+            continue
+        sufixo = " (%)" if coluna in PERCENTUAIS else ""
+        linhas.append(f"- {coluna}{sufixo}: {_serie(por_ciclo[coluna], ciclos)}")
+    return linhas
+
+
+def _tabela_habilidades(habilidades, ciclos):
+    """ Uma linha por descritor, com o percentual de cada ciclo e a descrição """
+    if habilidades.empty:
+        return pd.DataFrame(columns=["Descritor", "Descrição", "Valores", "Referência"])
+    descricoes = habilidades.groupby("Descritor", observed=True)["Descrição da Habilidade "].first()
+    percentuais = habilidades.pivot_table(index="Descritor", columns="Ciclos", values="Percentual de acertos",
+                                          aggfunc="mean", observed=True)
+    percentuais = percentuais.reindex(index=descricoes.index, columns=ciclos)
+    # Habilidades sem resultado em nenhum ciclo não informam nada
+    percentuais = percentuais[percentuais.notna().any(axis=1)]
+    descricoes = descricoes[percentuais.index]
+    tabela = pd.DataFrame({
+        "Descrição": descricoes,
+        "Valores": [_serie(linha, ciclos) for _, linha in percentuais.iterrows()],
+        # Ordena pelo ciclo mais recente com resultado
+        "Referência": percentuais.ffill(axis=1).iloc[:, -1],
+    })
+    return tabela.rename_axis("Descritor").reset_index()
+
+
+def _texto(cabecalho, linhas_indicadores, tabela, limite, omitidas, rotulo_ciclos, codigos):
+    partes = [cabecalho, f"Indicadores ({rotulo_ciclos}):"] + linhas_indicadores
+    partes.append(f"Percentual de acertos por habilidade ({rotulo_ciclos}):")
+    for linha in tabela.itertuples(index=False):
+        texto = f"- {linha.Descritor}: {linha.Valores}"
+        descricao = _descricao(linha.Descrição, limite)
+        if descricao:
+            texto += f" | {descricao}"
+        if codigos.get(str(linha.Descritor)):
+            texto += f" | DCRC: {', '.join(codigos[str(linha.Descritor)][:CODIGOS_POR_HABILIDADE])}"
+        partes.append(texto)
+    if omitidas:
+        partes.append(f"({omitidas} habilidades de desempenho intermediário omitidas)")
+    return "\n".join(partes)
+
+
+def piores_descritores(dados, n):
+    """ Descritores das n habilidades com menor percentual de acertos no ciclo mais recente """
+    if dados.empty:
+        return []
+    _, habilidades = _separar(dados)
+    ciclos = sorted(int(ciclo) for ciclo in dados["Ciclos"].dropna().unique())
+    tabela = _tabela_habilidades(habilidades, ciclos).sort_values("Referência", kind="stable")
+    return [str(descritor) for descritor in tabela["Descritor"].head(n)]
+
+
+def contexto_visao(dados):
+    """ Etapa e componente curricular da visão (None se ausentes) """
+    return tuple(
+        dados[coluna].dropna().iloc[0] if coluna in dados.columns and dados[coluna].notna().any() else None
+        for coluna in ["Etapa", "Componente Curricular"]
+    )
+
+
+def compactar(dados, orcamento=ORCAMENTO_TOKENS, codigos=None):
+    """ Texto compacto dos dados da visão, dentro do orçamento de tokens.
+
+    codigos: {descritor: [códigos DCRC]} (ver dcrc.codigos_por_descritor),
+    citados ao lado de cada habilidade.
+    """
+    codigos = codigos or {}
+    if dados.empty:
+        return "Sem dados para esta visão."
+    indicadores, habilidades = _separar(dados)
+    ciclos = sorted(int(ciclo) for ciclo in dados["Ciclos"].dropna().unique())
+    rotulo_ciclos = "ciclos " + "/".join(f"C{ciclo}" for ciclo in ciclos) + "; '-' = sem resultado"
+
+    contexto = [f"{coluna}: {indicadores[coluna].dropna().iloc[0]}"
+                for coluna in CONTEXTO if coluna in indicadores.columns and indicadores[coluna].notna().any()]
+    cabecalho = " | ".join(contexto)
+    linhas_indicadores = _linhas_indicadores(indicadores, ciclos)
+    tabela = _tabela_habilidades(habilidades, ciclos)
+
+    for limite in LIMITES_DESCRICAO:
+        texto = _texto(cabecalho, linhas_indicadores, tabela, limite, 0, rotulo_ciclos, codigos)
+        if contar_tokens(texto) <= orcamento:
+            return texto
+
+    # Sem descrições e ainda acima do orçamento: mantém as piores e as melhores habilidades
+    ordenada = tabela.sort_values("Referência", kind="stable").reset_index(drop=True)
+    while len(ordenada) > 2 * MINIMO_EXTREMOS:
+        ordenada = ordenada.drop(index=len(ordenada) // 2).reset_index(drop=True)
+        omitidas = len(tabela) - len(ordenada)
+        texto = _texto(cabecalho, linhas_indicadores, ordenada, 0, omitidas, rotulo_ciclos, codigos)
+        if contar_tokens(texto) <= orcamento:
+            break
+    return texto
@@ -0,0 +1,98 @@
+#-------------------
+# SERVIDOR LOCAL QUE IMITA A API DA GROQ (TESTES)
+#-------------------
+
+# Responde a POST /v1/chat/completions com um texto fixo, com ou sem
+# streaming (SSE), informando o uso de tokens. Permite simular latência e
+# respostas 429 para testar o app e a pré-geração sem gastar a cota da API.
+#
+# Uso:
+#   python servidor_mock_groq.py --porta 8765 --atraso 0.5 --falhas 0.3
+#   GROQ_API_URL=http://127.0.0.1:8765/v1/chat/completions streamlit run app.py
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRECHOS = ["## Análise de teste\n\n", "Texto gerado pelo ", "servidor local ", "(sem chamada à API)."]
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    atraso = 0.0
+    falhas = 0.0
+    pedidos = 0
+    _trava = threading.Lock()
+
+    def _json(self, status, corpo, cabecalhos=None):
+        conteudo = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(conteudo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    def _pedaco(self, dados):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(dados), dados))
+        self.wfile.flush()
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("Content-Length", 0))
+        pedido = json.loads(self.rfile.read(tamanho) or b"{}")
+        with _Manipulador._trava:
+            _Manipulador.pedidos += 1
+
+        if random.random() < self.falhas:
+            self._json(429, {"error": {"message": "Rate limit reached"}}, {"Retry-After": "1"})
+            return
+
+        prompt = sum(len(m.get("content", "")) for m in pedido.get("messages", [])) // 4
+        uso = {"prompt_tokens": prompt, "completion_tokens": len(TRECHOS), "total_tokens": prompt + len(TRECHOS)}
+
+        if not pedido.get("stream"):
+            time.sleep(self.atraso)
+            self._json(200, {"model": pedido.get("model"), "usage": uso,
+                             "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(TRECHOS)}}]})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for trecho in TRECHOS:
+            time.sleep(self.atraso / len(TRECHOS))
+            evento = {"choices": [{"index": 0, "delta": {"content": trecho}}]}
+            self._pedaco(f"data: {json.dumps(evento, ensure_ascii=False)}\n\n".encode("utf-8"))
+        final = {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": uso}}
+        self._pedaco(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+        self._pedaco(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API de chat da Groq")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--atraso", type=float, default=0.5, help="segundos até a resposta completa")
+    parser.add_argument("--falhas", type=float, default=0.0, help="fração dos pedidos respondidos com 429")
+    args = parser.parse_args(argv)
+
+    _Manipulador.atraso = args.atraso
+    _Manipulador.falhas = args.falhas
+    servidor = ThreadingHTTPServer(("127.0.0.1", args.porta), _Manipulador)
+    print(f"Servidor em http://127.0.0.1:{args.porta}/v1/chat/completions")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()